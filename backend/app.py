@@ -1,38 +1,145 @@
 import json
 import uuid
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, send_file
 from flask_cors import CORS
 
-from src import database
-from src.docx_generator import save_order_as_docx
+from src import database, exports, print_spooler, reports, search
+from src import kitchen_feed
+from src.compression import init_compression
+from src.fast_json import FastJSONProvider
+from src.http_cache import conditional, make_etag
+from src.idempotency import idempotent
+from src.events import EventBus, StreamLimit, stream
+from src.journal_store import JournalStore
+from src.prefix_index import PrefixIndex
+from src.pricing import PricingCache, recalculate_invoices
+from src.order_import import FORMATS, ImportFileError, import_orders
+from src.sync import changes_since
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+app.config['DRAINING'] = False
 CORS(app)
+init_compression(app)
 
 # --- JSON File Paths ---
 CUSTOMERS_FILE = 'customers.json'
 MENU_ITEMS_FILE = 'menu_items.json'
 
-# --- JSON Helper Functions ---
-def read_json(file_path):
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+# Journal-backed stores: each mutation appends one line instead of rewriting the file.
+# Puts take their row_version from the database's sync counter (see /api/sync).
+customer_store = JournalStore(CUSTOMERS_FILE, clock=database.next_sync_version)
+menu_store = JournalStore(MENU_ITEMS_FILE, clock=database.next_sync_version)
+
+# Mirror store writes into the full-text search tables.
+customer_store.subscribe(lambda op, value: search.index_record('customers', op, value))
+menu_store.subscribe(lambda op, value: search.index_record('menu_items', op, value))
+
+# Typeahead index over customer names for /api/customers/suggest.
+customer_index = PrefixIndex()
+customer_index.attach(customer_store)
+
+# Parsed, per-customer price tables; dropped when a customer is edited.
+pricing = PricingCache(customer_store)
+
+# Kitchen docket spooler; its worker thread is started per process by wsgi.init_worker().
+spooler = print_spooler.PrintSpooler(
+    print_spooler.sink_from_env(),
+    customer_name=lambda customer_id: (customer_store.get(customer_id) or {}).get('name'),
+    menu_categories=lambda: {item.get('name'): item.get('category') for item in menu_store.all()},
+)
+
+def customer_names():
+    return {str(c.get('id')): c.get('name') for c in customer_store.all()}
 
-def write_json(file_path, data):
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=4)
+def requested_ids():
+    """Ids from ?ids=a,b,c (repeatable) or a JSON body {"ids": [...]}, de-duplicated in order."""
+    if request.method == 'POST':
+        ids = (request.get_json(silent=True) or {}).get('ids') or []
+    else:
+        ids = [part for value in request.args.getlist('ids') for part in value.split(',')]
+    return list(dict.fromkeys(str(i).strip() for i in ids if str(i).strip()))
+
+MAX_BATCH_IDS = 1000
+
+def table_state(name):
+    """(version, updated_at) of a versioned SQLite table, or None."""
+    conn = database.get_connection()
+    state = database.collection_state(conn, name)
+    conn.close()
+    return state
+
+def latest(*timestamps):
+    present = [t for t in timestamps if t is not None]
+    return max(present) if present else None
+
+# --- Change Feed ---
+events = EventBus()
+
+# SSE streams and long polls each hold a worker thread; wsgi.init_worker() caps
+# them per worker so ordinary requests always have threads left.
+open_streams = StreamLimit()
+
+def streams_busy():
+    response = jsonify({'message': 'Too many open streams on this worker; try again shortly.'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '10'
+    return response
+
+def publish_change(entity, entity_id, action):
+    """Announce a mutation on /api/events with the collection's new version."""
+    if entity == 'customer':
+        version = customer_store.state()[0]
+    elif entity == 'menu_item':
+        version = menu_store.state()[0]
+    else:
+        state = table_state('orders' if entity == 'order' else entity)
+        version = state[0] if state else None
+    events.publish(entity, entity_id, action, version)
+
+# Live per-service kitchen view, kept current from the change feed.
+kitchen = kitchen_feed.KitchenFeed(
+    customer_name=spooler.customer_name,
+    menu_categories=spooler.menu_categories,
+    db_version=lambda: (table_state('orders') or (None,))[0],
+    slot_minutes=int(os.environ.get('KITCHEN_SLOT_MINUTES', '15')),
+)
+kitchen.attach(events)
+
+# --- Outgoing Mail Server ---
+SMTP_HOST = os.environ.get('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', '1') != '0'
+
+# --- Lazily Loaded Document and Email Stacks ---
+# python-docx and smtplib/email.mime make up most of the import time, and most
+# requests never touch them. They are imported on first use, or ahead of time
+# in the background by warm_imports() once the server is up.
+DEFERRED_IMPORTS = ('src.docx_generator', 'smtplib', 'email.mime.multipart',
+                    'email.mime.text', 'email.mime.application')
+
+def warm_imports():
+    def load():
+        import importlib
+        for name in DEFERRED_IMPORTS:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"Pre-loading {name} failed:", e)
+    threading.Thread(target=load, name='warm-imports', daemon=True).start()
 
 # --- Email Sending Logic (adapted from order_manager.py) ---
 def send_order_email(order_data, customer_email, docx_path):
+    import smtplib
+    from email.mime.application import MIMEApplication
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     conn = database.get_connection()
     settings = conn.cursor().execute("SELECT * FROM settings WHERE id = 1").fetchone()
     conn.close()
@@ -59,38 +166,164 @@ def send_order_email(order_data, customer_email, docx_path):
         attach.add_header('Content-Disposition', 'attachment', filename=os.path.basename(docx_path))
         msg.attach(attach)
 
-    server = smtplib.SMTP("smtp.gmail.com", 587)
-    server.starttls()
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    if SMTP_STARTTLS:
+        server.starttls()
     server.login(sender_email, app_password)
     server.send_message(msg)
     server.quit()
 
+# The order fields a document is rendered from. Rendering always goes through
+# order_document_data(), so a new order, an imported one and a stored one all
+# hash the same way in the render cache.
+ORDER_DOCUMENT_FIELDS = ('customer_id', 'order_number', 'service_type', 'adults', 'kids',
+                         'arrival_time', 'order_date', 'order_data')
+
+def order_document_data(order, invoice_number, customer):
+    data = {field: order.get(field) for field in ORDER_DOCUMENT_FIELDS}
+    for field in ('adults', 'kids'):
+        try:
+            data[field] = int(data[field])
+        except (TypeError, ValueError):
+            pass
+    if isinstance(data['order_data'], str):
+        try:
+            data['order_data'] = json.loads(data['order_data'])
+        except json.JSONDecodeError:
+            pass
+    document = {**data, "customer_name": customer.get('name'), "invoice_number": invoice_number}
+    # Head the document with the service date rather than the time it was rendered.
+    try:
+        served = datetime.strptime(f"{data['order_date']} {data['arrival_time']}", '%Y-%m-%d %H:%M')
+        document['date'] = served.strftime('%A, %d %b %Y @ %I:%M%p')
+    except (TypeError, ValueError):
+        pass
+    return document
+
+def render_order_docx(order, invoice_number):
+    """(DOCX path, customer) for an order, rendered or taken from the render cache."""
+    from src.docx_generator import save_order_as_docx
+
+    customer = customer_store.get(order['customer_id'])
+    if not customer:
+        raise ValueError("Customer not found for email processing.")
+
+    full_order_data = order_document_data(order, invoice_number, customer)
+    output_folder = os.path.join(os.getcwd(), "invoices") # Save to a dedicated invoices folder
+    os.makedirs(output_folder, exist_ok=True)
+    return save_order_as_docx(full_order_data, output_folder), full_order_data, customer
+
+def process_order_documents(order, invoice_number):
+    """Generate the order DOCX and email it to the customer. Returns the DOCX path."""
+    docx_path, full_order_data, customer = render_order_docx(order, invoice_number)
+    send_order_email(full_order_data, customer.get('email'), docx_path)
+    return docx_path
+
+# --- Bulk Import Post-Processing ---
+def process_import_batch(orders):
+    """Document and email work for imported orders, run off the request thread."""
+    failures = 0
+    for order in orders:
+        try:
+            process_order_documents(order, order['invoice_number'])
+        except Exception as e:
+            failures += 1
+            print(f"Import: documents for order {order['id']} failed:", e)
+    print(f"Import: processed documents for {len(orders) - failures}/{len(orders)} orders.")
+
+# One worker, so a large import is worked through in order and never floods the mail server.
+import_batches = ThreadPoolExecutor(max_workers=1, thread_name_prefix='import-batch')
+
+# --- Health Endpoints ---
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({'status': 'ok', 'pid': os.getpid()})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: the database answers and the worker is not draining."""
+    if app.config['DRAINING']:
+        return jsonify({'status': 'draining'}), 503
+    try:
+        conn = database.get_connection()
+        conn.execute("SELECT 1").fetchone()
+        conn.close()
+    except Exception as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+    return jsonify({'status': 'ready'})
+
 # --- Customer API Endpoints (JSON-based) ---
 @app.route('/api/customers', methods=['GET'])
 def get_customers():
-    customers = read_json(CUSTOMERS_FILE)
-    return jsonify(customers)
+    version, last_modified = customer_store.state()
+    return conditional(make_etag('customers', version), last_modified,
+                       lambda: jsonify(customer_store.all()))
+
+@app.route('/api/customers/batch', methods=['GET', 'POST'])
+def get_customers_batch():
+    """Several customers by id in one call, keyed by id, with unknown ids listed."""
+    ids = requested_ids()
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({'message': f'At most {MAX_BATCH_IDS} ids per request.'}), 400
+    found = customer_store.get_many(ids)
+    return jsonify({'records': found, 'missing': [i for i in ids if i not in found]})
+
+@app.route('/api/customers/suggest', methods=['GET'])
+def suggest_customers():
+    """Top matches for a customer picker: ?q=prefix&limit=10, only id and name."""
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        return jsonify({'message': 'limit must be a number.'}), 400
+    return jsonify(customer_index.suggest(request.args.get('q', ''), limit))
+
+@app.route('/api/customers/<customer_id>', methods=['GET'])
+def get_customer(customer_id):
+    customer = customer_store.get(customer_id)
+    if customer is None:
+        return jsonify({'message': 'Customer not found.'}), 404
+    return jsonify(customer)
 
 @app.route('/api/customers', methods=['POST'])
 def add_customer():
-    customers = read_json(CUSTOMERS_FILE)
     new_customer = request.json
     new_customer['id'] = str(uuid.uuid4())
-    customers.append(new_customer)
-    write_json(CUSTOMERS_FILE, customers)
+    customer_store.put(new_customer)
+    publish_change('customer', new_customer['id'], 'created')
     return jsonify(new_customer), 201
 
-# ... (other customer endpoints remain the same) ...
+@app.route('/api/customers/<customer_id>', methods=['PUT'])
+def update_customer(customer_id):
+    payload = request.json or {}
+    with customer_store.locked():
+        customer = customer_store.get(customer_id)
+        if customer is None:
+            return jsonify({'message': 'Customer not found.'}), 404
+        customer.update(payload)
+        customer['id'] = customer_id
+        customer_store.put(customer)
+    publish_change('customer', customer_id, 'updated')
+    return jsonify(customer)
+
+@app.route('/api/customers/<customer_id>', methods=['DELETE'])
+def delete_customer(customer_id):
+    with customer_store.locked():
+        if not customer_store.delete(customer_id):
+            return jsonify({'message': 'Customer not found.'}), 404
+        database.record_tombstone('customer', customer_id)
+    publish_change('customer', customer_id, 'deleted')
+    return jsonify({'message': 'Customer deleted.'})
 
 # --- Menu Item API Endpoints (JSON-based) ---
 @app.route('/api/menu-items', methods=['GET'])
 def get_menu_items():
-    menu_items = read_json(MENU_ITEMS_FILE)
-    return jsonify(menu_items)
+    version, last_modified = menu_store.state()
+    return conditional(make_etag('menu-items', version), last_modified,
+                       lambda: jsonify(menu_store.all()))
 
 @app.route('/api/menu-items', methods=['POST'])
 def add_menu_item():
-    menu_items = read_json(MENU_ITEMS_FILE)
     payload = request.json or {}
     name = (payload.get('name') or '').strip()
     category = (payload.get('category') or '').strip().upper()
@@ -105,94 +338,125 @@ def add_menu_item():
         'name': name,
         'category': category
     }
-    menu_items.append(new_item)
-    write_json(MENU_ITEMS_FILE, menu_items)
+    menu_store.put(new_item)
+    publish_change('menu_item', new_item['id'], 'created')
     return jsonify(new_item), 201
 
 @app.route('/api/menu-items/<item_id>', methods=['PUT'])
 def update_menu_item(item_id):
-    menu_items = read_json(MENU_ITEMS_FILE)
     payload = request.json or {}
-    updated = None
-    for item in menu_items:
-        if str(item.get('id')) == str(item_id):
-            if 'name' in payload:
-                item['name'] = (payload['name'] or '').strip()
-            if 'category' in payload:
-                item['category'] = (payload['category'] or '').strip().upper()
-            updated = item
-            break
-
-    if updated is None:
-        return jsonify({'message': 'Menu item not found.'}), 404
-
-    write_json(MENU_ITEMS_FILE, menu_items)
-    return jsonify(updated)
+    with menu_store.locked():
+        item = menu_store.get(item_id)
+        if item is None:
+            return jsonify({'message': 'Menu item not found.'}), 404
+        if 'name' in payload:
+            item['name'] = (payload['name'] or '').strip()
+        if 'category' in payload:
+            item['category'] = (payload['category'] or '').strip().upper()
+        menu_store.put(item)
+    publish_change('menu_item', item_id, 'updated')
+    return jsonify(item)
 
 @app.route('/api/menu-items/<item_id>', methods=['DELETE'])
 def delete_menu_item(item_id):
-    menu_items = read_json(MENU_ITEMS_FILE)
-    remaining = [item for item in menu_items if str(item.get('id')) != str(item_id)]
-    if len(remaining) == len(menu_items):
-        return jsonify({'message': 'Menu item not found.'}), 404
-    write_json(MENU_ITEMS_FILE, remaining)
+    with menu_store.locked():
+        if not menu_store.delete(item_id):
+            return jsonify({'message': 'Menu item not found.'}), 404
+        database.record_tombstone('menu_item', item_id)
+    publish_change('menu_item', item_id, 'deleted')
     return jsonify({'message': 'Menu item deleted.'})
 
 # --- Order API Endpoints (SQLite-based) ---
 @app.route('/api/orders', methods=['GET'])
 def get_orders():
-    customers = read_json(CUSTOMERS_FILE)
-    customer_map = {str(c.get('id')): c.get('name') for c in customers}
+    # Orders embed customer names, so the validator covers both collections.
+    orders_state = table_state('orders')
+    customers_version, customers_modified = customer_store.state()
+    etag = last_modified = None
+    if orders_state:
+        etag = make_etag('orders', orders_state[0], customers_version)
+        last_modified = latest(orders_state[1], customers_modified)
+
+    def build():
+        customer_map = customer_names()
+        conn = database.get_connection()
+        db_orders = conn.cursor().execute("SELECT * FROM orders").fetchall()
+        conn.close()
+        orders = [dict(row) for row in db_orders]
+        for order in orders:
+            order['customer_name'] = customer_map.get(str(order['customer_id']), 'Unknown')
+        return jsonify(orders)
+
+    return conditional(etag, last_modified, build)
+
+@app.route('/api/orders/batch', methods=['GET', 'POST'])
+def get_orders_batch():
+    """Several orders by id in one call, keyed by id, with unknown ids listed."""
+    ids = requested_ids()
+    if len(ids) > MAX_BATCH_IDS:
+        return jsonify({'message': f'At most {MAX_BATCH_IDS} ids per request.'}), 400
+    numeric = sorted({int(i) for i in ids if i.isdigit()})
     conn = database.get_connection()
-    db_orders = conn.cursor().execute("SELECT * FROM orders").fetchall()
+    rows = database.fetch_by_ids(conn, 'orders', numeric)
     conn.close()
-    orders = [dict(row) for row in db_orders]
-    for order in orders:
-        order['customer_name'] = customer_map.get(str(order['customer_id']), 'Unknown')
-    return jsonify(orders)
+
+    customer_map = customer_names() if rows else {}
+    found = {}
+    for order_id in ids:
+        row = rows.get(int(order_id)) if order_id.isdigit() else None
+        if row is not None:
+            order = dict(row)
+            order['customer_name'] = customer_map.get(str(order['customer_id']), 'Unknown')
+            found[order_id] = order
+    return jsonify({'records': found, 'missing': [i for i in ids if i not in found]})
 
 @app.route('/api/orders', methods=['POST'])
+@idempotent('orders.create')
 def add_order_and_process():
-    data = request.json
-    conn = database.get_connection()
-    cursor = conn.cursor()
+    data = request.json or {}
+    head_counts = {}
+    for name in ('adults', 'kids'):
+        try:
+            head_counts[name] = int(data.get(name) or 0)
+        except (TypeError, ValueError):
+            return jsonify({'message': f'{name} must be a whole number.'}), 400
+        if head_counts[name] < 0:
+            return jsonify({'message': f'{name} cannot be negative.'}), 400
+    data = {**data, **head_counts}
+    totals = pricing.totals([data])[0]
 
-    # 1. Save the Order
-    cursor.execute("""
-        INSERT INTO orders (customer_id, order_number, service_type, adults, kids, arrival_time, order_date, order_data)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        data['customer_id'], data['order_number'], data['service_type'], 
-        data['adults'], data['kids'], data['arrival_time'], 
-        data['order_date'], json.dumps(data['order_data'])
-    ))
-    new_order_id = cursor.lastrowid
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
 
-    # 2. Create the Invoice
-    cursor.execute("INSERT INTO invoices (order_id, invoice_number) VALUES (?, ?)", (new_order_id, 'temp'))
-    new_invoice_id = cursor.lastrowid
-    invoice_number = f"INV-{new_invoice_id:05d}"
-    cursor.execute("UPDATE invoices SET invoice_number = ? WHERE id = ?", (invoice_number, new_invoice_id))
-    conn.commit()
-    conn.close()
+        # 1. Save the Order
+        cursor.execute("""
+            INSERT INTO orders (customer_id, order_number, service_type, adults, kids, arrival_time, order_date, order_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            data['customer_id'], data['order_number'], data['service_type'],
+            data['adults'], data['kids'], data['arrival_time'],
+            data['order_date'], json.dumps(data['order_data'])
+        ))
+        new_order_id = cursor.lastrowid
+
+        # 2. Create the Invoice
+        cursor.execute("INSERT INTO invoices (order_id, invoice_number, gst_breakdown, final_total) VALUES (?, ?, ?, ?)",
+                       (new_order_id, 'temp', float(totals.gst), float(totals.total)))
+        new_invoice_id = cursor.lastrowid
+        invoice_number = f"INV-{new_invoice_id:05d}"
+        cursor.execute("UPDATE invoices SET invoice_number = ? WHERE id = ?", (invoice_number, new_invoice_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    publish_change('order', new_order_id, 'created')
 
     # --- Post-Save Processing ---
     try:
-        # Prepare data for document generation and email
-        customers = read_json(CUSTOMERS_FILE)
-        customer = next((c for c in customers if str(c.get('id')) == str(data['customer_id'])), None)
-        if not customer:
-            raise ValueError("Customer not found for email processing.")
-
-        full_order_data = {**data, "customer_name": customer.get('name'), "invoice_number": invoice_number}
-
-        # 3. Generate DOCX
-        output_folder = os.path.join(os.getcwd(), "invoices") # Save to a dedicated invoices folder
-        os.makedirs(output_folder, exist_ok=True)
-        docx_path = save_order_as_docx(full_order_data, output_folder)
-
-        # 4. Send Email
-        send_order_email(full_order_data, customer.get('email'), docx_path)
+        docx_path = process_order_documents(data, invoice_number)
 
         return jsonify({
             'id': new_order_id,
@@ -210,6 +474,39 @@ def add_order_and_process():
             'error': str(e)
         }), 207 # 207 Multi-Status
 
+@app.route('/api/orders/import', methods=['POST'])
+def import_orders_batch():
+    """
+    Bulk import from CSV or JSON lines (?format=csv|jsonl, or a text/csv body).
+    The file may be the raw body or a multipart "file" field. Valid rows are
+    saved in one transaction; documents and emails follow in the background
+    unless ?documents=0.
+    """
+    upload = request.files.get('file')
+    text = upload.read().decode('utf-8-sig') if upload else request.get_data(as_text=True)
+    fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'jsonl')
+    if fmt not in FORMATS:
+        return jsonify({'message': f"format must be one of: {', '.join(FORMATS)}."}), 400
+
+    try:
+        report = import_orders(text, fmt, {str(c.get('id')) for c in customer_store.all()}, pricing)
+    except ImportFileError as e:
+        return jsonify({'message': str(e)}), 400
+
+    imported = report['imported']
+    if imported:
+        publish_change('order', None, 'imported')
+        if request.args.get('documents', '1') != '0':
+            import_batches.submit(process_import_batch, imported)
+
+    status = 201 if not report['errors'] else (207 if imported else 400)
+    return jsonify({
+        'message': f"Imported {len(imported)} orders, {len(report['errors'])} rows rejected.",
+        'imported': [{'line': o['line'], 'id': o['id'], 'invoice_number': o['invoice_number']} for o in imported],
+        'errors': report['errors'],
+        'documents': 'queued' if imported and request.args.get('documents', '1') != '0' else 'skipped',
+    }), status
+
 @app.route('/api/orders/<int:order_id>', methods=['PUT'])
 def update_order(order_id):
     data = request.json or {}
@@ -255,35 +552,279 @@ def update_order(order_id):
         update_fields['order_data'],
         order_id
     ))
+    totals = pricing.totals([{**dict(existing), **update_fields}])[0]
+    cursor.execute("UPDATE invoices SET final_total = ?, gst_breakdown = ? WHERE order_id = ?",
+                   (float(totals.total), float(totals.gst), order_id))
     conn.commit()
     updated_row = cursor.execute("SELECT * FROM orders WHERE id = ?", (order_id,)).fetchone()
     conn.close()
+    publish_change('order', order_id, 'updated')
 
     if updated_row:
         orders_dict = dict(updated_row)
-        customers = read_json(CUSTOMERS_FILE)
-        customer_map = {str(c.get('id')): c.get('name') for c in customers}
-        orders_dict['customer_name'] = customer_map.get(str(orders_dict['customer_id']), 'Unknown')
+        customer = customer_store.get(orders_dict['customer_id'])
+        orders_dict['customer_name'] = customer.get('name') if customer else 'Unknown'
         return jsonify(orders_dict)
 
     return jsonify({'message': 'Unable to retrieve updated order.'}), 500
 
-# --- Settings API Endpoints ---
-@app.route('/api/settings', methods=['GET'])
-def get_settings():
+@app.route('/api/orders/<int:order_id>/document', methods=['GET'])
+def get_order_document(order_id):
+    """The order's DOCX, re-rendered only if the order changed since it was last rendered."""
     conn = database.get_connection()
-    settings = conn.cursor().execute("SELECT * FROM settings WHERE id = 1").fetchone()
+    row = conn.execute("""
+        SELECT o.*, i.invoice_number FROM orders o LEFT JOIN invoices i ON i.order_id = o.id
+        WHERE o.id = ?
+    """, (order_id,)).fetchone()
     conn.close()
-    if settings:
-        return jsonify(dict(settings))
-    # If no settings, return a default structure
-    return jsonify({
-        'sender_email': '',
-        'google_app_password': '',
-        'email_subject_template': '',
-        'email_body_template': ''
+    if not row:
+        return jsonify({'message': 'Order not found.'}), 404
+    try:
+        docx_path, _, _ = render_order_docx(dict(row), row['invoice_number'] or row['order_number'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 404
+    return send_file(docx_path, as_attachment=True, download_name=os.path.basename(docx_path),
+                     mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+
+# --- Export Endpoints ---
+@app.route('/api/exports/<entity>', methods=['GET'])
+def export_data(entity):
+    """
+    Stream all orders or invoices as NDJSON (default) or CSV, optionally
+    filtered by ?from=&to= (order date, YYYY-MM-DD) and ?customer_id=.
+    """
+    if entity not in exports.QUERIES:
+        return jsonify({'message': 'Unknown export.'}), 404
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in exports.FORMATS:
+        return jsonify({'message': f"format must be one of: {', '.join(exports.FORMATS)}."}), 400
+    filters = {
+        'date_from': request.args.get('from'),
+        'date_to': request.args.get('to'),
+        'customer_id': request.args.get('customer_id'),
+    }
+    for key in ('date_from', 'date_to'):
+        if filters[key]:
+            try:
+                datetime.strptime(filters[key], '%Y-%m-%d')
+            except ValueError:
+                return jsonify({'message': 'from and to must be YYYY-MM-DD dates.'}), 400
+
+    body = exports.export(entity, fmt, customer_names(), **filters)
+    return Response(body, mimetype=exports.FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{entity}.{"csv" if fmt == "csv" else "ndjson"}"',
+        'X-Accel-Buffering': 'no',
     })
 
+# --- Search Endpoint ---
+search_reconciled = False
+
+@app.route('/api/search', methods=['GET'])
+def search_all():
+    """
+    Ranked prefix search: ?q=text, optional ?types=orders,customers,menu_items
+    and ?limit= (per type, default 20, max 1000).
+    """
+    global search_reconciled
+    conn = database.get_connection()
+    enabled = search.available(conn)
+    conn.close()
+    if not enabled:
+        return jsonify({'message': 'Search is not available on this database.'}), 503
+    if not search_reconciled:
+        # Pick up store changes made while no server process was running.
+        search.reconcile('customers', customer_store.all())
+        search.reconcile('menu_items', menu_store.all())
+        search_reconciled = True
+
+    kinds = tuple(k for k in request.args.get('types', 'orders,customers,menu_items').split(',')
+                  if k in ('orders', 'customers', 'menu_items'))
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 1000)
+    except ValueError:
+        return jsonify({'message': 'limit must be a number.'}), 400
+    query = request.args.get('q', '')
+    return jsonify({'query': query, 'results': search.search(query, kinds or ('orders',), limit)})
+
+# --- Reports ---
+@app.route('/api/reports/revenue', methods=['GET'])
+def revenue_report():
+    """Revenue and GST for order dates in ?from=&to= (inclusive), optionally for one ?customer_id=."""
+    try:
+        start = datetime.strptime(request.args.get('from', ''), '%Y-%m-%d').date()
+        end = datetime.strptime(request.args.get('to', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'message': 'from and to are required YYYY-MM-DD dates.'}), 400
+    if start > end:
+        return jsonify({'message': 'from must not be after to.'}), 400
+    report = reports.revenue(start, end, request.args.get('customer_id'))
+    names = customer_names()
+    for row in report['breakdown']:
+        row['customer_name'] = names.get(str(row['customer_id']), 'Unknown')
+    return jsonify(report)
+
+# --- Invoice Totals ---
+@app.route('/api/invoices/recalculate', methods=['POST'])
+def recalculate_invoice_totals():
+    """Recompute final_total and GST for all invoices, or those with order dates in ?from=&to=."""
+    date_from, date_to = request.args.get('from'), request.args.get('to')
+    for value in (date_from, date_to):
+        if value:
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                return jsonify({'message': 'from and to must be YYYY-MM-DD dates.'}), 400
+    updated = recalculate_invoices(pricing, date_from, date_to)
+    if updated:
+        publish_change('invoices', None, 'recalculated')
+    return jsonify({'message': f'Recalculated {updated} invoices.', 'updated': updated})
+
+# --- Change Feed Endpoint ---
+@app.route('/api/events', methods=['GET'])
+def event_stream():
+    """Server-Sent Events stream of change events; resumes from Last-Event-ID."""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if not open_streams.acquire():
+        return streams_busy()
+    return Response(
+        open_streams.wrap(stream(events, last_event_id, lambda: app.config['DRAINING'])),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+# --- Kitchen Display Feed ---
+KITCHEN_MAX_WAIT = 30
+
+def kitchen_window():
+    """(date, service_type, error response) from ?date=YYYY-MM-DD&service=Lunch."""
+    date, service = request.args.get('date'), (request.args.get('service') or '').strip()
+    try:
+        datetime.strptime(date or '', '%Y-%m-%d')
+    except ValueError:
+        return None, None, (jsonify({'message': 'date must be YYYY-MM-DD.'}), 400)
+    if not service:
+        return None, None, (jsonify({'message': 'service is required (e.g. Lunch).'}), 400)
+    return date, service, None
+
+@app.route('/api/kitchen/feed', methods=['GET'])
+def kitchen_feed_snapshot():
+    """
+    Orders of one service bucketed by arrival slot, with per-course totals.
+    With ?since=<version> the request long-polls for up to ?wait= seconds
+    (default and maximum 30) and answers 304 if nothing changed.
+    """
+    date, service, error = kitchen_window()
+    if error:
+        return error
+    if request.args.get('since') is not None:
+        try:
+            since = int(request.args['since'])
+            wait = min(max(float(request.args.get('wait', KITCHEN_MAX_WAIT)), 0), KITCHEN_MAX_WAIT)
+        except ValueError:
+            return jsonify({'message': 'since and wait must be numbers.'}), 400
+        if not open_streams.acquire():
+            return streams_busy()
+        try:
+            changed = kitchen.wait(date, service, since, wait)
+        finally:
+            open_streams.release()
+        if not changed:
+            return Response(status=304)
+    else:
+        kitchen.refresh_if_stale()
+    version, body = kitchen.snapshot(date, service)
+    return conditional(make_etag('kitchen', kitchen.epoch, date, service.lower(), version), None,
+                       lambda: Response(body, mimetype='application/json'))
+
+@app.route('/api/kitchen/feed/stream', methods=['GET'])
+def kitchen_feed_stream():
+    """Server-Sent Events: the same snapshot, re-sent whenever the service changes."""
+    date, service, error = kitchen_window()
+    if error:
+        return error
+    if not open_streams.acquire():
+        return streams_busy()
+    return Response(
+        open_streams.wrap(kitchen_feed.stream(kitchen, date, service, lambda: app.config['DRAINING'])),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+# --- Kitchen Docket Printing ---
+@app.route('/api/print-jobs', methods=['POST'])
+def queue_print_jobs():
+    """
+    Queue kitchen dockets for {"order_ids": [...]}, or for a whole service
+    window with {"date": "YYYY-MM-DD", "service_type": "Lunch"} (service_type
+    optional). Each window is printed as one combined document.
+    """
+    data = request.get_json(silent=True) or {}
+    if data.get('order_ids'):
+        try:
+            order_ids = [int(i) for i in data['order_ids']]
+        except (TypeError, ValueError):
+            return jsonify({'message': 'order_ids must be integers.'}), 400
+    elif data.get('date'):
+        try:
+            datetime.strptime(data['date'], '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return jsonify({'message': 'date must be YYYY-MM-DD.'}), 400
+        order_ids = print_spooler.window_order_ids(data['date'], data.get('service_type'))
+    else:
+        return jsonify({'message': 'Provide order_ids or date.'}), 400
+
+    queued = print_spooler.enqueue(order_ids)
+    spooler.wake()
+    return jsonify({'queued': queued, 'already_queued_or_missing': len(set(order_ids)) - queued}), 202
+
+@app.route('/api/print-jobs', methods=['GET'])
+def list_print_jobs():
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+    except ValueError:
+        return jsonify({'message': 'limit must be an integer.'}), 400
+    return jsonify(print_spooler.list_jobs(request.args.get('status'), limit))
+
+@app.route('/api/print-jobs/metrics', methods=['GET'])
+def print_job_metrics():
+    try:
+        window = max(int(request.args.get('window', 3600)), 60)
+    except ValueError:
+        return jsonify({'message': 'window must be a number of seconds.'}), 400
+    return jsonify(print_spooler.metrics(window))
+
+# --- Incremental Sync ---
+@app.route('/api/sync', methods=['GET'])
+def sync():
+    """Records changed and deleted after ?since=<version>, in one response."""
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'message': 'since must be an integer version.'}), 400
+    return jsonify(changes_since(max(since, 0), customer_store, menu_store))
+
+# --- Settings API Endpoints ---
+@app.route('/api/settings', methods=['GET'])
+def get_settings():
+    state = table_state('settings')
+    etag = make_etag('settings', state[0]) if state else None
+
+    def build():
+        conn = database.get_connection()
+        settings = conn.cursor().execute("SELECT * FROM settings WHERE id = 1").fetchone()
+        conn.close()
+        if settings:
+            return jsonify(dict(settings))
+        # If no settings, return a default structure
+        return jsonify({
+            'sender_email': '',
+            'google_app_password': '',
+            'email_subject_template': '',
+            'email_body_template': ''
+        })
+
+    return conditional(etag, state[1] if state else None, build)
+
 @app.route('/api/settings', methods=['PUT'])
 def update_settings():
     data = request.json
@@ -306,9 +847,12 @@ def update_settings():
     
     conn.commit()
     conn.close()
+    publish_change('settings', 1, 'updated')
     return jsonify({'message': 'Settings updated successfully'})
 
 
 if __name__ == '__main__':
+    warm_imports()
+    spooler.start()
     # Ensure the main app runs from the project root for correct cwd
     app.run(debug=True)
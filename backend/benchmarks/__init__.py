@@ -0,0 +1,8 @@
+"""
+Benchmark suite for the restaurant backend.
+
+Every benchmark runs inside a throw-away workspace (a temporary directory that
+becomes the current working directory) so the real tour_group.db and JSON
+stores are never touched. Results are written as JSON artifacts that can be
+compared against a stored baseline with --baseline.
+"""
@@ -0,0 +1,344 @@
+"""
+Load-testing benchmark for the REST API in app.py.
+
+Generates a synthetic dataset in a temporary workspace, points the backend at a
+local SMTP sink and drives the Flask app through scripted request mixes, once
+through Flask's test client and once through a real threaded WSGI server over
+HTTP. Reports throughput, p50/p95/p99 latency and peak RSS as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.api_load --output bench-results/api.json
+    python -m benchmarks.api_load --baseline bench-results/api.json --output /tmp/api.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from benchmarks import harness
+from benchmarks.datagen import generate
+from benchmarks.smtp_stub import SMTPStub
+
+# Request mixes: operation name -> relative weight.
+MIXES = {
+    "browse": {"get_orders": 6, "get_customers": 2, "get_menu_items": 2},
+    "service_rush": {"create_order": 4, "get_orders": 3, "update_order": 3},
+    "menu_admin": {"get_menu_items": 4, "create_menu_item": 2, "update_menu_item": 2, "delete_menu_item": 2},
+    "mixed": {
+        "get_orders": 4, "create_order": 2, "update_order": 2, "get_customers": 1,
+        "get_menu_items": 1, "create_menu_item": 1, "update_menu_item": 1, "delete_menu_item": 1,
+    },
+}
+
+COMPARE_METRICS = {
+    "throughput_rps": "higher",
+    "p50_ms": "lower",
+    "p95_ms": "lower",
+    "p99_ms": "lower",
+}
+
+
+# --- Drivers ---
+class TestClientSession:
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, body=None):
+        response = self._client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class HTTPSession:
+    """One persistent HTTP/1.1 connection to the WSGI server."""
+
+    def __init__(self, host, port):
+        self._host = host
+        self._port = port
+        self._conn = http.client.HTTPConnection(host, port, timeout=60)
+
+    def request(self, method, path, body=None):
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        for attempt in range(2):
+            try:
+                self._conn.request(method, path, body=payload, headers=headers)
+                response = self._conn.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, ConnectionError):
+                self._conn.close()
+                self._conn = http.client.HTTPConnection(self._host, self._port, timeout=60)
+                if attempt:
+                    raise
+
+    def close(self):
+        self._conn.close()
+
+
+class TestClientDriver:
+    name = "test_client"
+
+    def __init__(self, app):
+        self._app = app
+
+    def start(self):
+        return self
+
+    def session(self):
+        return TestClientSession(self._app)
+
+    def stop(self):
+        pass
+
+
+class WSGIServerDriver:
+    name = "wsgi_server"
+
+    def __init__(self, app):
+        self._app = app
+        self._server = None
+
+    def start(self):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                return
+
+        self._server = make_server("127.0.0.1", 0, self._app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="bench-wsgi").start()
+        return self
+
+    def session(self):
+        return HTTPSession("127.0.0.1", self._server.server_port)
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# --- Workload ---
+class Workload:
+    """
+    Builds request payloads from the generated dataset. Shared state (ids of
+    orders and menu items created during the run) is guarded by a lock so
+    several worker threads can draw from it.
+    """
+
+    def __init__(self, customers, menu_items, order_ids):
+        self.customers = customers
+        self.menu_items = list(menu_items)
+        self.order_ids = list(order_ids)
+        self.created_menu_ids = []
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def _next_sequence(self):
+        with self._lock:
+            self._sequence += 1
+            return self._sequence
+
+    def get_orders(self, session, rng):
+        return session.request("GET", "/api/orders")
+
+    def get_customers(self, session, rng):
+        return session.request("GET", "/api/customers")
+
+    def get_menu_items(self, session, rng):
+        return session.request("GET", "/api/menu-items")
+
+    def create_order(self, session, rng):
+        customer = rng.choice(self.customers)
+        picks = rng.sample(self.menu_items, k=min(5, len(self.menu_items)))
+        body = {
+            "customer_id": customer["id"],
+            "order_number": f"BENCH{self._next_sequence():06d}",
+            "service_type": rng.choice(("Lunch", "Dinner")),
+            "adults": rng.randint(4, 40),
+            "kids": rng.randint(0, 6),
+            "arrival_time": "12:30",
+            "order_date": time.strftime("%Y-%m-%d"),
+            "order_data": {item["name"]: {"quantity": rng.randint(1, 20)} for item in picks},
+        }
+        return session.request("POST", "/api/orders", body)
+
+    def update_order(self, session, rng):
+        order_id = rng.choice(self.order_ids)
+        body = {"adults": rng.randint(4, 40), "arrival_time": rng.choice(("12:00", "12:30", "18:30"))}
+        return session.request("PUT", f"/api/orders/{order_id}", body)
+
+    def create_menu_item(self, session, rng):
+        body = {"name": f"Bench dish {self._next_sequence()}", "category": rng.choice(("ENTREE", "MAIN", "DESSERT"))}
+        return session.request("POST", "/api/menu-items", body)
+
+    def update_menu_item(self, session, rng):
+        with self._lock:
+            item = rng.choice(self.menu_items)
+        return session.request("PUT", f"/api/menu-items/{item['id']}", {"name": item["name"]})
+
+    def delete_menu_item(self, session, rng):
+        with self._lock:
+            target = self.created_menu_ids.pop() if self.created_menu_ids else None
+        if target is None:
+            return session.request("GET", "/api/menu-items")
+        return session.request("DELETE", f"/api/menu-items/{target}")
+
+    def refresh_created_menu_ids(self, app):
+        """Remember benchmark-created menu items so delete_menu_item has targets."""
+        with app.test_client() as client:
+            items = client.get("/api/menu-items").get_json()
+        known = {item["id"] for item in self.menu_items}
+        with self._lock:
+            self.created_menu_ids = [item["id"] for item in items if item["id"] not in known]
+
+
+def run_case(driver, workload, app, mix, operations, concurrency, seed):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    per_thread = max(1, operations // concurrency)
+    latencies = {name: [] for name in names}
+    statuses = Counter()
+    errors = []
+    lock = threading.Lock()
+
+    # Pre-create menu items so deletes have something to remove.
+    if "delete_menu_item" in mix:
+        session = driver.session()
+        rng = random.Random(seed)
+        for _ in range(per_thread * concurrency // 4 + 1):
+            workload.create_menu_item(session, rng)
+        session.close()
+        workload.refresh_created_menu_ids(app)
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        session = driver.session()
+        local = {name: [] for name in names}
+        local_status = Counter()
+        try:
+            for _ in range(per_thread):
+                name = rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                status = getattr(workload, name)(session, rng)
+                local[name].append(time.perf_counter() - start)
+                local_status[f"{name}:{status}"] += 1
+        except Exception as exc:
+            with lock:
+                errors.append(repr(exc))
+        finally:
+            session.close()
+        with lock:
+            for name, samples in local.items():
+                latencies[name].extend(samples)
+            statuses.update(local_status)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    with harness.Timer() as timer:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    result = harness.summarize(all_samples)
+    result["throughput_rps"] = len(all_samples) / timer.elapsed if timer.elapsed else 0.0
+    result["wall_s"] = timer.elapsed
+    result["concurrency"] = concurrency
+    result["peak_rss_kb"] = harness.peak_rss_kb()
+    result["statuses"] = dict(sorted(statuses.items()))
+    result["errors"] = errors
+    result["operations"] = {name: harness.summarize(samples) for name, samples in latencies.items() if samples}
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the REST API with synthetic data.")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--menu-items", type=int, default=60)
+    parser.add_argument("--orders", type=int, default=2000, help="Orders generated before the run.")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--operations", type=int, default=300, help="Requests per case.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--mix", action="append", choices=sorted(MIXES), help="Mix to run (repeatable).")
+    parser.add_argument("--driver", action="append", choices=("test_client", "wsgi_server"),
+                        help="Driver to use (repeatable, default: both).")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default="bench-results/api_load.json")
+    parser.add_argument("--baseline", help="Earlier report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative regression before failing (default: %(default)s).")
+    parser.add_argument("--keep-workspace", action="store_true")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    mixes = args.mix or list(MIXES)
+    driver_names = args.driver or ["test_client", "wsgi_server"]
+
+    smtp = SMTPStub().start()
+    os.environ["SMTP_HOST"] = "127.0.0.1"
+    os.environ["SMTP_PORT"] = str(smtp.port)
+    os.environ["SMTP_STARTTLS"] = "0"
+
+    results = {}
+    try:
+        with harness.workspace(keep=args.keep_workspace):
+            with harness.Timer() as gen_timer:
+                customers, menu_items = generate(args.customers, args.menu_items, args.orders, args.years, args.seed)
+            print(f"Generated dataset in {gen_timer.elapsed:.2f}s")
+
+            from app import app  # imported after the workspace and SMTP settings exist
+            from src import database
+
+            conn = database.get_connection()
+            order_ids = [row["id"] for row in conn.execute("SELECT id FROM orders")]
+            conn.close()
+
+            workload = Workload(customers, menu_items, order_ids)
+            drivers = {"test_client": TestClientDriver, "wsgi_server": WSGIServerDriver}
+            for driver_name in driver_names:
+                driver = drivers[driver_name](app).start()
+                try:
+                    for mix_name in mixes:
+                        case = f"{driver_name}/{mix_name}"
+                        print(f"Running {case}...", flush=True)
+                        results[case] = run_case(
+                            driver, workload, app, MIXES[mix_name],
+                            args.operations, args.concurrency, args.seed,
+                        )
+                        r = results[case]
+                        print(f"  {r['throughput_rps']:.1f} req/s  p50 {r['p50_ms']:.1f}ms  "
+                              f"p95 {r['p95_ms']:.1f}ms  p99 {r['p99_ms']:.1f}ms")
+                finally:
+                    driver.stop()
+    finally:
+        smtp.stop()
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    params["emails_received"] = smtp.messages
+    params["peak_rss_kb"] = harness.peak_rss_kb()
+    harness.write_report(output, "api_load", params, results)
+    print("Report written to:", output)
+
+    if baseline:
+        rows, regressions = harness.compare(results, harness.load_report(baseline)["results"],
+                                            COMPARE_METRICS, args.tolerance)
+        harness.print_comparison(rows, regressions)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Synthetic data generator for benchmarks.
+
+Writes customers.json and menu_items.json in the current working directory and
+fills tour_group.db with orders (and their invoices) spread over several
+years. Output is deterministic for a given seed.
+
+Usage (from backend/):
+    python -m benchmarks.datagen --output /tmp/bench-data --orders 20000
+"""
+import argparse
+import json
+import os
+import random
+import uuid
+from datetime import date, timedelta
+
+from src import database
+
+CATEGORIES = ("ENTREE", "MAIN", "DESSERT")
+SERVICE_TYPES = ("Lunch", "Dinner")
+ARRIVAL_SLOTS = ("11:30", "12:00", "12:15", "12:30", "13:00", "17:30", "18:00", "18:30", "19:00", "19:30")
+DISH_WORDS = (
+    "Snails", "Beef", "Duck", "Salmon", "Lamb", "Soup", "Tart", "Salad", "Pate",
+    "Souffle", "Mousse", "Creme caramel", "Gratin", "Risotto", "Terrine", "Crepe",
+)
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def make_customers(count, rng):
+    customers = []
+    for i in range(count):
+        lunch = rng.randint(25, 70)
+        customers.append({
+            "name": f"Tour Operator {i:05d}",
+            "email": f"bookings{i}@example.com",
+            "price_lunch": str(lunch),
+            "price_dinner": str(lunch + rng.randint(0, 20)),
+            "price_kids": str(rng.randint(10, 25)),
+            "phone": f"04{rng.randint(0, 99999999):08d}",
+            "address": f"{rng.randint(1, 400)} George St, Sydney NSW",
+            "additional_info": "",
+            "id": _uuid(rng),
+        })
+    return customers
+
+
+def make_menu_items(count, rng):
+    items = []
+    for i in range(count):
+        items.append({
+            "id": _uuid(rng),
+            "name": f"{rng.choice(DISH_WORDS)} {i}",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+        })
+    return items
+
+
+def make_order(customer, menu_items, order_date, rng, sequence):
+    adults = rng.randint(4, 60)
+    kids = rng.randint(0, 10)
+    picks = rng.sample(menu_items, k=min(len(menu_items), 6))
+    order_data = {item["name"]: {"quantity": rng.randint(1, adults + kids)} for item in picks}
+    return {
+        "customer_id": customer["id"],
+        "order_number": f"TG{sequence:07d}",
+        "service_type": rng.choice(SERVICE_TYPES),
+        "adults": adults,
+        "kids": kids,
+        "arrival_time": rng.choice(ARRIVAL_SLOTS),
+        "order_date": order_date.isoformat(),
+        "order_data": order_data,
+    }
+
+
+def write_json_stores(customers, menu_items):
+    with open("customers.json", "w") as f:
+        json.dump(customers, f, indent=4)
+    with open("menu_items.json", "w") as f:
+        json.dump(menu_items, f, indent=4)
+
+
+def populate_database(customers, menu_items, order_count, years, rng):
+    database.init_db()
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT OR REPLACE INTO settings (id, sender_email, google_app_password, email_subject_template, email_body_template)
+        VALUES (1, ?, ?, ?, ?)
+    """, ("bench@example.com", "bench-password", "Order [order number]", "Thanks [customer name]"))
+
+    start = date.today() - timedelta(days=365 * years)
+    span_days = 365 * years
+    rows = []
+    for i in range(order_count):
+        order_date = start + timedelta(days=rng.randrange(span_days))
+        order = make_order(rng.choice(customers), menu_items, order_date, rng, i)
+        rows.append((
+            order["customer_id"], order["order_number"], order["service_type"],
+            order["adults"], order["kids"], order["arrival_time"],
+            order["order_date"], json.dumps(order["order_data"]),
+        ))
+    cursor.executemany("""
+        INSERT INTO orders (customer_id, order_number, service_type, adults, kids, arrival_time, order_date, order_data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    cursor.execute("""
+        INSERT INTO invoices (order_id, invoice_number)
+        SELECT id, printf('INV-%05d', id) FROM orders
+    """)
+    conn.commit()
+    conn.close()
+
+
+def generate(customers=200, menu_items=60, orders=5000, years=3, seed=1234):
+    """
+    Generate a complete dataset in the current working directory and return
+    (customers, menu_items) so callers can build request payloads from them.
+    """
+    rng = random.Random(seed)
+    customer_rows = make_customers(customers, rng)
+    menu_rows = make_menu_items(menu_items, rng)
+    write_json_stores(customer_rows, menu_rows)
+    populate_database(customer_rows, menu_rows, orders, years, rng)
+    return customer_rows, menu_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset in a separate directory.")
+    parser.add_argument("--output", required=True, help="Directory to write the dataset to (must not be backend/).")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--menu-items", type=int, default=60)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+    os.makedirs(args.output, exist_ok=True)
+    os.chdir(args.output)
+    generate(args.customers, args.menu_items, args.orders, args.years, args.seed)
+    print(f"Generated {args.customers} customers, {args.menu_items} menu items and {args.orders} orders.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Shared helpers for the benchmark scripts: workspaces, timing statistics,
+memory readings and JSON reports with baseline comparison.
+"""
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@contextlib.contextmanager
+def workspace(keep=False):
+    """
+    Create a temporary directory, make it the working directory for the
+    duration of the block and remove it afterwards (unless keep=True).
+    The backend resolves tour_group.db and the JSON stores relative to the
+    working directory, so this isolates a benchmark run completely.
+    """
+    previous = os.getcwd()
+    path = tempfile.mkdtemp(prefix="bench-")
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(previous)
+        if keep:
+            print("Workspace kept at:", path)
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * (pct / 100.0)
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(samples):
+    """
+    Summarize a list of durations in seconds. Latencies are reported in
+    milliseconds.
+    """
+    ordered = sorted(samples)
+    count = len(ordered)
+    total = sum(ordered)
+    return {
+        "count": count,
+        "mean_ms": (total / count) * 1000 if count else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": ordered[-1] * 1000 if count else 0.0,
+    }
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KiB, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes.
+    if sys.platform == "darwin":
+        peak //= 1024
+    return peak
+
+
+class Timer:
+    """Context manager recording the elapsed wall time in .elapsed."""
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self._start
+        return False
+
+
+def environment_info():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_report(path, benchmark, params, results):
+    report = {
+        "benchmark": benchmark,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment_info(),
+        "params": params,
+        "results": results,
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=4)
+    return report
+
+
+def load_report(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(current, baseline, metrics, tolerance):
+    """
+    Compare two result mappings of the shape {case: {metric: value}}.
+
+    metrics maps a metric name to its direction: "lower" when smaller is
+    better (latency, bytes) and "higher" when larger is better (throughput).
+    Returns a list of rows and a list of regressions beyond the tolerance
+    (a fraction, e.g. 0.10 for 10%).
+    """
+    rows = []
+    regressions = []
+    for case, values in current.items():
+        base_values = baseline.get(case)
+        if not base_values:
+            continue
+        for metric, direction in metrics.items():
+            new = values.get(metric)
+            old = base_values.get(metric)
+            if new is None or old is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            worse = change > tolerance if direction == "lower" else change < -tolerance
+            row = (case, metric, old, new, change)
+            rows.append(row)
+            if worse:
+                regressions.append(row)
+    return rows, regressions
+
+
+def print_comparison(rows, regressions):
+    print(f"{'case':<40} {'metric':<16} {'baseline':>12} {'current':>12} {'change':>9}")
+    for case, metric, old, new, change in rows:
+        flag = "  !" if (case, metric, old, new, change) in regressions else ""
+        print(f"{case:<40} {metric:<16} {old:>12.3f} {new:>12.3f} {change:>+8.1%}{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed beyond the tolerance.")
+    else:
+        print("\nNo regressions beyond the tolerance.")
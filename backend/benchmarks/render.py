@@ -0,0 +1,159 @@
+"""
+Micro-benchmarks for document rendering.
+
+Renders save_order_as_docx and generate_order_pdf for a grid of order shapes
+(line count per course, comment length and customer-name length) and records
+time per document, allocations via tracemalloc and output size.
+
+Usage (from backend/):
+    python -m benchmarks.render --output bench-results/render.json
+    python -m benchmarks.render --baseline bench-results/render.json --output /tmp/render.json
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+
+from benchmarks import harness
+
+COMPARE_METRICS = {
+    "mean_ms": "lower",
+    "p95_ms": "lower",
+    "alloc_peak_kb": "lower",
+    "output_bytes": "lower",
+}
+
+
+def make_order(lines, comment_length, name_length):
+    """Build an order in the shape the generators expect."""
+    comment = ("extra sauce, no garlic " * (comment_length // 23 + 1))[:comment_length]
+    name = ("Tour Operator Group " * (name_length // 20 + 1))[:name_length].strip() or "X"
+
+    def course(prefix):
+        return [(f"{prefix} dish {i}", (i % 7) + 1, comment) for i in range(lines)]
+
+    entree = course("Entree")
+    return {
+        "order_number": "TG0001234",
+        "customer_name": name,
+        "customer_phone": "0400 123 456",
+        "invoice_number": "INV-01234",
+        "date": "Sunday, 31 Mar 2025 @ 5PM",
+        "total_pax": sum(qty for _, qty, _ in entree),
+        "entree": entree,
+        "mains": course("Main"),
+        "desserts": course("Dessert"),
+        "adults": 24,
+        "kids": 6,
+        "adult_price": 48.0,
+        "kid_price": 15.0,
+    }
+
+
+def load_renderers(selected):
+    """
+    Return {name: callable(order, out_dir) -> path}. Renderers whose
+    dependencies are missing are reported and skipped.
+    """
+    renderers = {}
+    if "docx" in selected:
+        try:
+            from src.docx_generator import save_order_as_docx
+        except ImportError as exc:
+            print("Skipping docx:", exc)
+        else:
+            renderers["docx"] = lambda order, out_dir: save_order_as_docx(order, out_dir, use_cache=False)
+    if "pdf" in selected:
+        try:
+            from src.pdf_generator import generate_order_pdf
+        except ImportError as exc:
+            print("Skipping pdf:", exc)
+        else:
+            renderers["pdf"] = lambda order, out_dir: generate_order_pdf(
+                order, os.path.join(out_dir, "invoice.pdf"), use_cache=False)
+    return renderers
+
+
+def measure(render, order, out_dir, repeat):
+    # Warm-up render so one-time imports and font loading are not counted.
+    render(order, out_dir)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        path = render(order, out_dir)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    render(order, out_dir)
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size for stat in snapshot.statistics("filename"))
+
+    result = harness.summarize(samples)
+    result["alloc_peak_kb"] = peak / 1024
+    result["alloc_retained_kb"] = allocated / 1024
+    result["output_bytes"] = os.path.getsize(path)
+    return result
+
+
+def parse_int_list(value):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX and PDF order rendering.")
+    parser.add_argument("--renderer", action="append", choices=("docx", "pdf"),
+                        help="Renderer to benchmark (repeatable, default: both).")
+    parser.add_argument("--lines", type=parse_int_list, default=[3, 15, 60],
+                        help="Comma-separated line counts per course (default: 3,15,60).")
+    parser.add_argument("--comment-lengths", type=parse_int_list, default=[0, 40, 200],
+                        help="Comma-separated comment lengths (default: 0,40,200).")
+    parser.add_argument("--name-lengths", type=parse_int_list, default=[12, 80],
+                        help="Comma-separated customer-name lengths (default: 12,80).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed renders per shape.")
+    parser.add_argument("--output", default="bench-results/render.json")
+    parser.add_argument("--baseline", help="Earlier report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Allowed relative regression before failing (default: %(default)s).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    renderers = load_renderers(args.renderer or ["docx", "pdf"])
+    if not renderers:
+        sys.exit("No renderer available.")
+
+    results = {}
+    with harness.workspace() as out_dir:
+        shapes = itertools.product(args.lines, args.comment_lengths, args.name_lengths)
+        for lines, comment_length, name_length in shapes:
+            order = make_order(lines, comment_length, name_length)
+            for name, render in renderers.items():
+                case = f"{name}/lines={lines}/comment={comment_length}/name={name_length}"
+                results[case] = measure(render, order, out_dir, args.repeat)
+                r = results[case]
+                print(f"{case:<45} {r['mean_ms']:8.2f}ms  peak {r['alloc_peak_kb']:9.1f}KiB  "
+                      f"{r['output_bytes']:>8}B", flush=True)
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    params["renderers"] = list(renderers)
+    harness.write_report(output, "render", params, results)
+    print("Report written to:", output)
+
+    if baseline:
+        rows, regressions = harness.compare(results, harness.load_report(baseline)["results"],
+                                            COMPARE_METRICS, args.tolerance)
+        harness.print_comparison(rows, regressions)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Serialization and compression benchmark for the order list.
+
+Measures JSON encoding time for the stdlib and orjson encoders, and time and
+size for gzip / brotli at several levels, over order lists shaped like the
+GET /api/orders response. Also reports the actual bytes on the wire for
+GET /api/orders through the app for each Accept-Encoding.
+
+Usage (from backend/):
+    python -m benchmarks.serialization --orders 1000,10000
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+from benchmarks import harness
+from benchmarks.datagen import generate, make_customers, make_menu_items, make_order
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPARE_METRICS = {"mean_ms": "lower", "bytes": "lower"}
+
+
+def make_order_list(count, seed=1234):
+    rng = random.Random(seed)
+    customers = make_customers(100, rng)
+    menu_items = make_menu_items(40, rng)
+    orders = []
+    for i in range(count):
+        customer = rng.choice(customers)
+        order_date = date(2023, 1, 1) + timedelta(days=rng.randrange(3 * 365))
+        order = make_order(customer, menu_items, order_date, rng, i)
+        order["id"] = i + 1
+        order["order_data"] = json.dumps(order["order_data"])
+        order["order_docx_path"] = None
+        order["customer_name"] = customer["name"]
+        orders.append(order)
+    return orders
+
+
+def time_repeated(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        with harness.Timer() as timer:
+            result = fn()
+        samples.append(timer.elapsed)
+    return harness.summarize(samples), result
+
+
+def encoders():
+    from flask import Flask
+    from src.fast_json import FastJSONProvider, orjson
+
+    app = Flask("bench")
+    found = {"stdlib": FastJSONProvider(app, encoder="stdlib")}
+    if orjson is not None:
+        found["orjson"] = FastJSONProvider(app, encoder="orjson")
+    return found
+
+
+def compressors():
+    found = {f"gzip-{level}": (lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0))
+             for level in (1, 6, 9)}
+    if brotli is not None:
+        for quality in (1, 5, 9):
+            found[f"br-{quality}"] = lambda data, quality=quality: brotli.compress(data, quality=quality)
+    return found
+
+
+def wire_sizes(order_count):
+    """Bytes on the wire for GET /api/orders per Accept-Encoding."""
+    results = {}
+    with harness.workspace():
+        generate(customers=100, menu_items=40, orders=order_count, years=3)
+        from app import app
+        client = app.test_client()
+        for accept in ("identity", "gzip", "br"):
+            timing, response = time_repeated(
+                lambda: client.get("/api/orders", headers={"Accept-Encoding": accept}), 5)
+            timing["bytes"] = len(response.data)
+            timing["content_encoding"] = response.headers.get("Content-Encoding", "identity")
+            results[f"wire/{order_count}/{accept}"] = timing
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding and compression of the order list.")
+    parser.add_argument("--orders", type=lambda v: [int(p) for p in v.split(",")], default=[1000, 10000],
+                        help="Comma-separated order counts (default: 1000,10000).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--wire-orders", type=int, default=2000,
+                        help="Orders in the database for the end-to-end wire measurement (0 to skip).")
+    parser.add_argument("--output", default="bench-results/serialization.json")
+    parser.add_argument("--baseline", help="Earlier report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    results = {}
+
+    for count in args.orders:
+        orders = make_order_list(count)
+        payload = None
+        for name, provider in encoders().items():
+            timing, payload = time_repeated(lambda: provider.dumps_bytes(orders), args.repeat)
+            timing["bytes"] = len(payload)
+            results[f"encode/{count}/{name}"] = timing
+        for name, fn in compressors().items():
+            timing, compressed = time_repeated(lambda: fn(payload), args.repeat)
+            timing["bytes"] = len(compressed)
+            results[f"compress/{count}/{name}"] = timing
+
+    if args.wire_orders:
+        results.update(wire_sizes(args.wire_orders))
+
+    for case, r in results.items():
+        print(f"{case:<32} {r['mean_ms']:9.2f}ms  {r['bytes']:>10}B")
+
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    params["brotli"] = brotli is not None
+    harness.write_report(output, "serialization", params, results)
+    print("Report written to:", output)
+
+    if baseline:
+        rows, regressions = harness.compare(results, harness.load_report(baseline)["results"],
+                                            COMPARE_METRICS, args.tolerance)
+        harness.print_comparison(rows, regressions)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
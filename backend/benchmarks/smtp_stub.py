@@ -0,0 +1,74 @@
+"""
+Minimal local SMTP sink used so POST /api/orders can complete its email step
+without talking to Gmail. It accepts any login, swallows every message and
+only counts what it received. STARTTLS is not offered, so the backend must be
+pointed at it with SMTP_STARTTLS=0.
+"""
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self._reply("220 localhost benchmark SMTP sink")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode("utf-8", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250-localhost")
+                self._reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                self._reply("235 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b".\r\n", b".\n"):
+                        break
+                    size += len(line)
+                self.server.record_message(size)
+                self._reply("250 Queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _SMTPHandler)
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.bytes_received = 0
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def record_message(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes_received += size
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True, name="smtp-stub")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
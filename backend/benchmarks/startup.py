@@ -0,0 +1,105 @@
+"""
+Cold import-time profile of the backend.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters,
+parses the per-module timings and reports the cumulative import time of the
+target module and its heaviest dependencies. It also checks that modules
+which should load lazily (python-docx, reportlab, smtplib, email.mime) are
+not imported at startup.
+
+Exits with status 1 when the median import time exceeds --max-ms or a
+deferred module was imported, so it can gate a change like a test would.
+
+Usage (from backend/):
+    python -m benchmarks.startup --max-ms 400
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks import harness
+
+DEFERRED = ("docx", "reportlab", "smtplib", "email.mime", "src.docx_generator", "src.pdf_generator")
+COMPARE_METRICS = {"median_ms": "lower"}
+
+
+def profile(module):
+    """{module name: (self_us, cumulative_us)} for one cold import of module."""
+    with harness.workspace():
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True,
+            env={**os.environ, "PYTHONPATH": harness.BACKEND_DIR, "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Profile and bound the backend's cold import time.")
+    parser.add_argument("--module", default="app", help="Module to import (default: app).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, help="Fail if the median import time is above this.")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest dependencies to list.")
+    parser.add_argument("--output", default="bench-results/startup.json")
+    parser.add_argument("--baseline", help="Earlier report to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    runs = [profile(args.module) for _ in range(args.repeat)]
+    totals_ms = [run[args.module][1] / 1000 for run in runs]
+    last = runs[-1]
+    deferred_loaded = sorted(name for name in last
+                             if any(name == d or name.startswith(d + ".") for d in DEFERRED))
+
+    heaviest = sorted(((name, cumulative) for name, (_, cumulative) in last.items() if name != args.module),
+                      key=lambda item: item[1], reverse=True)[:args.top]
+    print(f"import {args.module}: median {statistics.median(totals_ms):.1f}ms "
+          f"(min {min(totals_ms):.1f}ms, max {max(totals_ms):.1f}ms, {args.repeat} runs)")
+    for name, cumulative in heaviest:
+        print(f"  {name:<40} {cumulative / 1000:8.1f}ms")
+
+    results = {f"import/{args.module}": {
+        "median_ms": statistics.median(totals_ms),
+        "min_ms": min(totals_ms),
+        "max_ms": max(totals_ms),
+        "modules": len(last),
+        "deferred_loaded": deferred_loaded,
+    }}
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    harness.write_report(output, "startup", params, results)
+    print("Report written to:", output)
+
+    failed = False
+    if deferred_loaded:
+        print("Loaded at startup but should be deferred:", ", ".join(deferred_loaded))
+        failed = True
+    if args.max_ms is not None and statistics.median(totals_ms) > args.max_ms:
+        print(f"Median import time is above the {args.max_ms:.0f}ms bound.")
+        failed = True
+    if baseline:
+        rows, regressions = harness.compare(results, harness.load_report(baseline)["results"],
+                                            COMPARE_METRICS, args.tolerance)
+        harness.print_comparison(rows, regressions)
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
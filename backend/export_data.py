@@ -0,0 +1,49 @@
+"""
+Export orders or invoices as NDJSON or CSV.
+
+    python export_data.py orders --format csv --from 2024-07-01 --to 2025-06-30 -o orders.csv
+    python export_data.py invoices --customer-id <id> > invoices.ndjson
+
+Rows are streamed from the database in chunks, so memory use does not grow
+with the size of the export.
+"""
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream an export of orders or invoices.")
+    parser.add_argument("entity", choices=("orders", "invoices"))
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--from", dest="date_from", help="First order date to include (YYYY-MM-DD).")
+    parser.add_argument("--to", dest="date_to", help="Last order date to include (YYYY-MM-DD).")
+    parser.add_argument("--customer-id", help="Only this customer's records.")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+
+    # The stores and database paths are relative to the backend directory.
+    os.chdir(BACKEND_DIR)
+    from app import customer_names
+    from src import exports
+
+    chunks = exports.export(args.entity, args.format, customer_names(), date_from=args.date_from,
+                            date_to=args.date_to, customer_id=args.customer_id)
+    out = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
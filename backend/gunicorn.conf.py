@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for serving the backend in production.
+
+All values can be overridden with environment variables:
+WSGI_BIND, WSGI_WORKERS, WSGI_THREADS, WSGI_GRACEFUL_TIMEOUT.
+
+Thread sizing: every open SSE stream (/api/events, /api/kitchen/feed/stream)
+and every long poll (/api/kitchen/feed?since=) holds one gthread thread for as
+long as it lasts. Each worker admits at most WSGI_MAX_STREAMS of them
+(default: half its threads) and answers 503 with Retry-After beyond that, so
+the rest of its threads stay free for the REST API. Threads are cheap while
+they wait, so for N kitchen screens raise the thread count rather than the
+worker count, e.g. WSGI_THREADS=N/workers + 4 and WSGI_MAX_STREAMS=N/workers.
+"""
+import os
+
+bind = os.environ.get('WSGI_BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('WSGI_WORKERS', '2'))
+threads = int(os.environ.get('WSGI_THREADS', '4'))
+worker_class = 'gthread'
+# POST /api/orders renders a DOCX and talks to SMTP before it answers.
+timeout = 120
+graceful_timeout = int(os.environ.get('WSGI_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+
+def on_starting(server):
+    # Create the schema once in the arbiter, before any worker exists.
+    from src import database
+    database.init_db()
+
+
+def post_fork(server, worker):
+    import wsgi
+    wsgi.init_worker(server.cfg.threads)
+
+
+def worker_exit(server, worker):
+    # Runs on every worker exit, SIGINT included, so there is no worker_int hook.
+    import wsgi
+    wsgi.shutdown_worker()
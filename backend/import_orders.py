@@ -0,0 +1,58 @@
+"""
+Bulk-import orders from a CSV or JSON-lines booking sheet.
+
+    python import_orders.py bookings.csv
+    python import_orders.py bookings.jsonl --no-documents
+
+All valid rows are saved in one transaction and rejected rows are listed
+with their line numbers. Afterwards the order documents are generated and
+emailed one by one, unless --no-documents is given.
+"""
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import a batch of orders from CSV or JSON lines.")
+    parser.add_argument("path", help="Booking sheet to import.")
+    parser.add_argument("--format", choices=("csv", "jsonl"),
+                        help="File format (default: from the file extension).")
+    parser.add_argument("--no-documents", action="store_true",
+                        help="Save the orders only; skip DOCX generation and email.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    path = os.path.abspath(args.path)
+    fmt = args.format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, encoding="utf-8-sig") as f:
+        text = f.read()
+
+    # The stores and database paths are relative to the backend directory.
+    os.chdir(BACKEND_DIR)
+    from app import customer_store, pricing, process_import_batch
+    from src import database
+    from src.order_import import ImportFileError, import_orders
+
+    database.init_db()
+    try:
+        report = import_orders(text, fmt, {str(c.get('id')) for c in customer_store.all()}, pricing)
+    except ImportFileError as e:
+        sys.exit(f"Import failed: {e}")
+
+    for error in report["errors"]:
+        print(f"line {error['line']}: {'; '.join(error['errors'])}")
+    print(f"Imported {len(report['imported'])} orders, {len(report['errors'])} rows rejected.")
+
+    if report["imported"] and not args.no_documents:
+        process_import_batch(report["imported"])
+    if report["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
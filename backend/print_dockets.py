@@ -0,0 +1,61 @@
+"""
+Queue kitchen dockets and print everything pending, one combined document
+per service window.
+
+    python print_dockets.py --date 2025-03-31 --service Lunch
+    python print_dockets.py --order-id 12 --order-id 13 --sink file --output dockets/
+
+Without --sink the PRINT_SINK environment variable decides (lp when CUPS is
+installed, otherwise files in PRINT_OUTPUT_DIR). Throughput metrics for the
+last hour are printed at the end.
+"""
+import argparse
+import json
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Print kitchen dockets through the print spooler.")
+    parser.add_argument("--date", help="Queue every order on this date (YYYY-MM-DD).")
+    parser.add_argument("--service", help="With --date, only this service type (e.g. Lunch).")
+    parser.add_argument("--order-id", type=int, action="append", default=[], help="Queue this order (repeatable).")
+    parser.add_argument("--sink", choices=("lp", "file"), help="Where batches go (default: PRINT_SINK).")
+    parser.add_argument("--printer", help="CUPS destination for --sink lp.")
+    parser.add_argument("--output", default="printed_dockets", help="Folder for --sink file (default: %(default)s).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    output = os.path.abspath(args.output)
+
+    # The stores and database paths are relative to the backend directory.
+    os.chdir(BACKEND_DIR)
+    from app import spooler
+    from src import database, print_spooler
+
+    database.init_db()
+    if args.sink == "lp":
+        spooler.sink = print_spooler.LpSink(args.printer)
+    elif args.sink == "file":
+        spooler.sink = print_spooler.FileSink(output)
+
+    order_ids = list(args.order_id)
+    if args.date:
+        order_ids += print_spooler.window_order_ids(args.date, args.service)
+    if order_ids:
+        print(f"Queued {print_spooler.enqueue(order_ids)} of {len(set(order_ids))} dockets.")
+
+    printed = spooler.drain()
+    print(f"Printed {printed} dockets.")
+    metrics = print_spooler.metrics()
+    print(json.dumps(metrics, indent=2))
+    if metrics['queue']['pending']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
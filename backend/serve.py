@@ -0,0 +1,134 @@
+"""
+Production launcher for the backend.
+
+Uses gunicorn (multiple worker processes, each with a thread pool) when it is
+installed. On Windows, or without gunicorn, it falls back to a single process
+serving requests from a fixed-size thread pool. Either way, open SSE streams
+and long polls are capped per worker (see gunicorn.conf.py for sizing).
+
+    python serve.py --workers 4 --threads 8 --bind 0.0.0.0:5000
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from gunicorn.app.base import Application as GunicornApplication
+except ImportError:  # Windows or gunicorn not installed
+    GunicornApplication = None
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the backend API for production use.")
+    parser.add_argument("--bind", default=os.environ.get("WSGI_BIND", "127.0.0.1:5000"),
+                        help="host:port to listen on (default: %(default)s).")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WSGI_WORKERS", "2")),
+                        help="Worker processes (default: %(default)s).")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("WSGI_THREADS", "4")),
+                        help="Threads per worker (default: %(default)s).")
+    parser.add_argument("--graceful-timeout", type=int,
+                        default=int(os.environ.get("WSGI_GRACEFUL_TIMEOUT", "30")),
+                        help="Seconds in-flight requests get to finish on shutdown (default: %(default)s).")
+    return parser.parse_args()
+
+
+def serve_gunicorn(args):
+    class Application(GunicornApplication):
+        def init(self, parser, opts, args):
+            return None
+
+        def load_config(self):
+            self.cfg.set("config", os.path.join(BACKEND_DIR, "gunicorn.conf.py"))
+            config_file = self.load_config_from_file(self.cfg.config)
+            config_file.update({
+                "bind": [args.bind],
+                "workers": args.workers,
+                "threads": args.threads,
+                "graceful_timeout": args.graceful_timeout,
+            })
+            for key, value in config_file.items():
+                if key in self.cfg.settings and value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from wsgi import application
+            return application
+
+    Application().run()
+
+
+def serve_threaded(args):
+    from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+    import wsgi
+    from src import database
+
+    class Handler(WSGIRequestHandler):
+        # One request per connection, so idle keep-alive clients can't pin pool threads.
+        protocol_version = "HTTP/1.0"
+
+    class PooledWSGIServer(BaseWSGIServer):
+        multithread = True
+
+        def __init__(self, host, port, app, threads):
+            super().__init__(host, port, app, handler=Handler)
+            self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+        def process_request(self, request, client_address):
+            self._executor.submit(self._process, request, client_address)
+
+        def _process(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+        def drain(self):
+            self._executor.shutdown(wait=True)
+
+    if args.workers > 1:
+        print("gunicorn is not available; serving from a single process.", flush=True)
+
+    host, _, port = args.bind.rpartition(":")
+    database.init_db()
+    wsgi.init_worker(args.threads)
+    server = PooledWSGIServer(host or "127.0.0.1", int(port), wsgi.application, args.threads)
+
+    def request_shutdown(signum, frame):
+        wsgi.application.config['DRAINING'] = True
+        # shutdown() blocks until serve_forever returns, so call it from another thread.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, request_shutdown)
+    signal.signal(signal.SIGTERM, request_shutdown)
+
+    print(f"Serving on http://{host or '127.0.0.1'}:{port} with {args.threads} threads", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        drainer = threading.Thread(target=server.drain, daemon=True)
+        drainer.start()
+        drainer.join(args.graceful_timeout)
+        server.server_close()
+        wsgi.shutdown_worker()
+
+
+def main():
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    args = parse_args()
+    if GunicornApplication is not None and not sys.platform.startswith("win"):
+        serve_gunicorn(args)
+    else:
+        serve_threaded(args)
+
+
+if __name__ == "__main__":
+    main()
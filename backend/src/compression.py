@@ -0,0 +1,68 @@
+"""
+Negotiated response compression for the Flask app.
+
+Responses that are large enough and of a compressible type are encoded with
+brotli (when the brotli package is installed and the client accepts "br") or
+gzip. Small bodies, streamed responses and 304s are left alone.
+
+COMPRESS_MIN_SIZE sets the threshold in bytes (default 1024).
+"""
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '1024'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compressible(response):
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    mimetype = response.mimetype or ''
+    return any(mimetype.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def compress_response(response):
+    response.vary.add('Accept-Encoding')
+    if not _compressible(response):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    encoding = request.accept_encodings.best_match(available_encodings())
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    # A compressed body is a different representation: demote a strong ETag to
+    # weak (as nginx does) so If-None-Match still matches via weak comparison.
+    # ETags from http_cache.conditional are weak already, on 200s and 304s alike.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
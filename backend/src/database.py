@@ -1,16 +1,140 @@
+import os
+import queue
 import sqlite3
+import threading
 
 DB_NAME = "tour_group.db"
 
+# Version of the last migration in src/migrations.py. Applied migrations are
+# listed in schema_version and the highest is mirrored in PRAGMA user_version,
+# so checking whether anything is pending costs a single header read.
+SCHEMA_VERSION = 9
+
+# Rows per transaction when a migration backfills existing data.
+BACKFILL_CHUNK_SIZE = 1000
+
+# Tables whose changes are counted in collection_versions.
+VERSIONED_TABLES = ('orders', 'invoices', 'settings')
+
+# Tables carrying row_version / updated_at for /api/sync, with their entity names.
+SYNC_TABLES = {'orders': 'order', 'invoices': 'invoice'}
+
+# Process-wide connection pool, only set up by production workers (see
+# init_pool). Without it every get_connection() opens a fresh connection.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PooledConnection(sqlite3.Connection):
+    """Connection whose close() hands it back to its pool instead of closing it."""
+    pool = None
+
+    def close(self):
+        pool = self.pool
+        if pool is None:
+            return super().close()
+        try:
+            self.rollback()  # never hand out a connection mid-transaction
+        except sqlite3.Error:
+            return super().close()
+        pool.release(self)
+
+
+class ConnectionPool:
+    def __init__(self, size, db_name):
+        self.size = size
+        self.db_name = db_name
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, timeout=30, check_same_thread=False, factory=PooledConnection)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout = 30000")
+        conn.pool = self
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.pool = None
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.pool = None
+            conn.close()
+
+
+def init_pool(size=4):
+    """
+    Create this process's connection pool. Call it once per worker process
+    after fork, never before: SQLite connections must not cross a fork.
+    Also switches the database to WAL so readers in other workers don't block
+    behind a writer.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(size, DB_NAME)
+    conn = get_connection()
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.close()
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
 def get_connection():
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool.acquire()
     conn = sqlite3.connect(DB_NAME)
     conn.row_factory = sqlite3.Row
     return conn
 
 def init_db():
+    """
+    Bring the database up to date. The backend applies the versioned
+    migrations in src/migrations.py, which return at once when nothing is
+    pending.
+    """
+    if __package__:
+        from . import migrations
+        migrations.migrate()
+        return
+
+    # The legacy Qt app imports this module top-level and has no search,
+    # reports or migrations; it just creates the core schema unversioned.
     conn = get_connection()
     cursor = conn.cursor()
+    create_tables(cursor)
+    init_collection_versions(cursor)
+    create_lookup_indexes(cursor)
+    init_sync_schema(cursor)
+    conn.commit()
+    for table in SYNC_TABLES:
+        backfill(conn, table, sync_backfill_sql(table))
+    conn.close()
 
+def create_tables(cursor):
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS orders (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -62,8 +186,186 @@ def init_db():
         )
     ''')
 
-    conn.commit()
-    conn.close()
+def init_collection_versions(cursor):
+    # Per-collection change counters, used for HTTP validators (ETag /
+    # Last-Modified). Bumped by triggers so every writer is covered.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS collection_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at INTEGER
+        )
+    ''')
+    for table in VERSIONED_TABLES:
+        cursor.execute(
+            "INSERT OR IGNORE INTO collection_versions (name, version, updated_at) "
+            "VALUES (?, 0, CAST(strftime('%s', 'now') AS INTEGER))",
+            (table,)
+        )
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE collection_versions
+                    SET version = version + 1, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+                    WHERE name = '{table}';
+                END
+            ''')
+
+def create_lookup_indexes(cursor):
+    # Filters used by exports and batch lookups.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders(order_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_customer_id ON orders(customer_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invoices_order_id ON invoices(order_id)")
+
+def schema_is_current():
+    """True if every migration known to this version of the code has been applied."""
+    if not os.path.exists(DB_NAME):
+        return False
+    conn = get_connection()
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION
+    finally:
+        conn.close()
+
+def _ensure_column(cursor, table, column, definition):
+    columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def init_sync_schema(cursor):
+    """
+    Row versions for incremental sync. sync_state holds one global counter;
+    every insert or update of a SYNC_TABLES row takes the next value as its
+    row_version, and every delete leaves a tombstone with the next value.
+    The JSON stores draw from the same counter via next_sync_version().
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO sync_state (id, version) VALUES (1, 1)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tombstones (
+            entity TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            row_version INTEGER NOT NULL,
+            deleted_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (entity, entity_id)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tombstones_row_version ON tombstones(row_version)")
+
+    for table, entity in SYNC_TABLES.items():
+        _ensure_column(cursor, table, 'row_version', 'INTEGER')
+        _ensure_column(cursor, table, 'updated_at', 'TEXT')
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_row_version ON {table}(row_version)")
+
+        data_columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")
+                        if row[1] not in ('id', 'row_version', 'updated_at')]
+        stamp_row = f'''
+            UPDATE sync_state SET version = version + 1 WHERE id = 1;
+            UPDATE {table}
+            SET row_version = (SELECT version FROM sync_state WHERE id = 1), updated_at = CURRENT_TIMESTAMP
+            WHERE id = NEW.id;
+        '''
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_sync_insert AFTER INSERT ON {table} BEGIN {stamp_row} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_sync_update AFTER UPDATE OF {', '.join(data_columns)} "
+                       f"ON {table} BEGIN {stamp_row} END")
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_sync_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE sync_state SET version = version + 1 WHERE id = 1;
+                INSERT OR REPLACE INTO tombstones (entity, entity_id, row_version)
+                VALUES ('{entity}', CAST(OLD.id AS TEXT), (SELECT version FROM sync_state WHERE id = 1));
+            END
+        ''')
+
+def sync_backfill_sql(table):
+    """Backfill statement for backfill(): rows that existed before versioning count as version 1."""
+    return (f"UPDATE {table} SET row_version = 1, updated_at = CURRENT_TIMESTAMP "
+            f"WHERE id BETWEEN ? AND ? AND row_version IS NULL")
+
+def current_sync_version(conn):
+    return conn.execute("SELECT version FROM sync_state WHERE id = 1").fetchone()[0]
+
+def next_sync_version():
+    """Allocate the next value of the global sync counter."""
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE sync_state SET version = version + 1 WHERE id = 1")
+        version = current_sync_version(conn)
+        conn.commit()
+    finally:
+        conn.close()
+    return version
+
+def record_tombstone(entity, entity_id):
+    """Remember a deleted JSON-store record so /api/sync can report it."""
+    conn = get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE sync_state SET version = version + 1 WHERE id = 1")
+        conn.execute(
+            "INSERT OR REPLACE INTO tombstones (entity, entity_id, row_version) VALUES (?, ?, ?)",
+            (entity, str(entity_id), current_sync_version(conn))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def collection_state(conn, name):
+    """
+    (version, updated_at) for a table listed in VERSIONED_TABLES, or None if
+    the database predates the collection_versions table.
+    """
+    try:
+        row = conn.execute(
+            "SELECT version, updated_at FROM collection_versions WHERE name = ?", (name,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if row is None:
+        return None
+    return row['version'], row['updated_at']
+
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER (999 on older builds).
+IN_CHUNK_SIZE = 500
+
+def fetch_by_ids(conn, table, ids):
+    """{id: row} for the given integer ids, resolved with primary-key IN queries."""
+    rows = {}
+    for start in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[start:start + IN_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        for row in conn.execute(f"SELECT * FROM {table} WHERE id IN ({placeholders})", chunk):
+            rows[row['id']] = row
+    return rows
+
+def backfill(conn, table, statement, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Run statement over table's rows in id order, chunk_size rows at a time,
+    each chunk in its own short write transaction so other writers get in
+    between. statement receives the chunk's first and last id as its two
+    parameters and must skip rows it has already handled: an interrupted
+    backfill is then simply run again. Returns the number of rows changed.
+    """
+    changed, last_id = 0, 0
+    while True:
+        first, last = conn.execute(
+            f"SELECT MIN(id), MAX(id) FROM (SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)",
+            (last_id, chunk_size)
+        ).fetchone()
+        if first is None:
+            return changed
+        conn.execute("BEGIN IMMEDIATE")
+        changed += conn.execute(statement, (first, last)).rowcount
+        conn.commit()
+        last_id = last
 
 if __name__ == '__main__':
     init_db()
@@ -4,6 +4,11 @@ from docx import Document
 from docx.shared import Pt, RGBColor
 from datetime import datetime
 
+try:
+    from . import render_cache
+except ImportError:  # imported top-level by the Qt app
+    import render_cache
+
 def generate_order_docx(order_data, filename):
     """
     Generate a DOCX for an order/invoice with the following layout:
@@ -83,10 +88,12 @@ def generate_order_docx(order_data, filename):
     doc.save(filename)
     return filename
 
-def save_order_as_docx(order_data, output_folder):
+def save_order_as_docx(order_data, output_folder, use_cache=True):
     """
     Create a DOCX file for the given order using the naming convention:
       ordernumber_customername_invoicenumber.docx
+    The document comes from the render cache unless the order's content
+    changed since it was last rendered (use_cache=False always renders).
     """
     os.makedirs(output_folder, exist_ok=True)
     cust_name = order_data.get("customer_name", "Unknown")
@@ -95,7 +102,12 @@ def save_order_as_docx(order_data, output_folder):
     invoice_num = order_data.get("invoice_number", order_num)
     filename = f"{order_num}_{sanitized_name}_{invoice_num}.docx"
     full_path = os.path.join(output_folder, filename)
-    return generate_order_docx(order_data, full_path)
+    if not use_cache:
+        return generate_order_docx(order_data, full_path)
+    # Fix the header date in the cached content instead of stamping the render time.
+    order_data = {**order_data, "date": order_data.get("date") or datetime.now().strftime("%A, %d %b %Y @ %I%p")}
+    return render_cache.default_cache().materialize(
+        'docx', order_data, lambda path: generate_order_docx(order_data, path), full_path)
 
 # For testing purposes:
 if __name__ == "__main__":
@@ -2,9 +2,6 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QTextEdit, QPushButton, QMessageBox, QDialog, QDialogButtonBox, QLabel
 )
 from PyQt6.QtCore import Qt
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import database
 
 
@@ -226,6 +223,10 @@ class EmailManager(QWidget):
         Send a test email using the provided settings to verify connectivity.
         The test email is sent to 'your email' and is marked as important.
         """
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+
         if not self.sender_email or not self.app_password:
             QMessageBox.warning(self, "Missing Information", "Please provide both sender email and app password by clicking 'Change Email Settings'.")
             return
@@ -0,0 +1,197 @@
+"""
+Change feed for the REST API, shared by every worker process.
+
+Mutating endpoints publish small change events (entity, id, action, version).
+Each event is a row in the change_events table, so all workers serving the
+same tour_group.db see the same feed with the same ids; /api/events streams
+them to clients as Server-Sent Events. A client that reconnects with
+Last-Event-ID gets everything it missed, as long as it is still among the
+last `capacity` events. Otherwise it gets a "reset" event and should refetch.
+
+A publish wakes this worker's streams at once; streams notice events written
+by other workers within poll_interval seconds. Listeners (subscribe) are only
+called for events published in this process.
+
+An open stream (or a long poll) occupies a worker thread for as long as it
+lasts, so StreamLimit caps how many a worker holds at once and keeps the
+remaining threads free for ordinary requests.
+"""
+import json
+import threading
+import time
+
+from . import database
+
+
+def init_events_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity TEXT NOT NULL,
+            entity_id TEXT,
+            action TEXT NOT NULL,
+            version INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _last_id(conn):
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_events'").fetchone()
+    return row[0] if row else 0
+
+
+def _event(row):
+    return {'id': row['id'], 'entity': row['entity'], 'entity_id': row['entity_id'],
+            'action': row['action'], 'version': row['version']}
+
+
+class EventBus:
+    def __init__(self, capacity=1000, poll_interval=1.0):
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._published = 0
+        self._listeners = []
+
+    @property
+    def last_id(self):
+        conn = database.get_connection()
+        try:
+            return _last_id(conn)
+        finally:
+            conn.close()
+
+    def subscribe(self, listener):
+        """Call listener(event) synchronously for every event published by this process."""
+        self._listeners.append(listener)
+
+    def publish(self, entity, entity_id, action='updated', version=None):
+        entity_id = str(entity_id) if entity_id is not None else None
+        conn = database.get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                "INSERT INTO change_events (entity, entity_id, action, version) VALUES (?, ?, ?, ?)",
+                (entity, entity_id, action, version)
+            )
+            event_id = cursor.lastrowid
+            conn.execute("DELETE FROM change_events WHERE id <= ?", (event_id - self.capacity,))
+            conn.commit()
+        finally:
+            conn.close()
+        event = {'id': event_id, 'entity': entity, 'entity_id': entity_id, 'action': action, 'version': version}
+        with self._cond:
+            self._published += 1
+            self._cond.notify_all()
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                print("Event listener failed:", e)
+        return event
+
+    def since(self, last_id):
+        """
+        Events after last_id as (events, complete). complete is False when
+        last_id is older than the kept events or unknown, so events were lost.
+        """
+        conn = database.get_connection()
+        try:
+            newest = _last_id(conn)
+            if last_id > newest:
+                return [], False
+            if last_id == newest:
+                return [], True
+            rows = conn.execute("SELECT * FROM change_events WHERE id > ? ORDER BY id", (last_id,)).fetchall()
+        finally:
+            conn.close()
+        if not rows or rows[0]['id'] != last_id + 1:
+            return [], False
+        return [_event(row) for row in rows], True
+
+    def wait(self, last_id, timeout):
+        """Block up to timeout seconds for events after last_id."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                published = self._published
+            events, complete = self.since(last_id)
+            remaining = deadline - time.monotonic()
+            if events or not complete or remaining <= 0:
+                return events, complete
+            with self._cond:
+                self._cond.wait_for(lambda: self._published != published, timeout=min(remaining, self.poll_interval))
+
+
+class StreamLimit:
+    """Counts requests that hold a thread open (SSE streams, long polls) against a limit (None: no limit)."""
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self._active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        with self._lock:
+            return self._active
+
+    def acquire(self):
+        """Take a slot; False when the worker already holds its limit."""
+        with self._lock:
+            if self.limit is not None and self._active >= self.limit:
+                return False
+            self._active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+
+    def wrap(self, frames):
+        """Yield from an acquired stream's frames and give the slot back when the client goes away."""
+        try:
+            yield from frames
+        finally:
+            self.release()
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: change\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+def stream(bus, last_event_id, is_stopping, heartbeat=15.0):
+    """
+    Generator of SSE frames. Replays from last_event_id when given, then
+    follows the bus until is_stopping() returns true.
+    """
+    yield 'retry: 3000\n\n'
+    try:
+        cursor = int(last_event_id) if last_event_id else None
+    except ValueError:
+        cursor = None
+
+    if cursor is None:
+        cursor = bus.last_id
+    else:
+        events, complete = bus.since(cursor)
+        if not complete:
+            cursor = bus.last_id
+            yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n"
+        for event in events:
+            cursor = event['id']
+            yield format_sse(event)
+
+    while not is_stopping():
+        events, complete = bus.wait(cursor, heartbeat)
+        if not complete:
+            cursor = bus.last_id
+            yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n"
+            continue
+        if not events:
+            yield ': keep-alive\n\n'
+            continue
+        for event in events:
+            cursor = event['id']
+            yield format_sse(event)
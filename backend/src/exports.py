@@ -0,0 +1,99 @@
+"""
+Streaming exports of orders and invoices as NDJSON or CSV.
+
+Rows are read from the cursor in chunks of CHUNK_SIZE with fetchmany() and
+encoded one at a time, so memory use stays flat however large the tables
+are. The generators hold their own connection until they are exhausted or
+closed (Werkzeug closes them when the client goes away).
+
+Filters: order_date range (inclusive, YYYY-MM-DD) and customer_id. Invoices
+are filtered through their order.
+"""
+import csv
+import io
+import json
+
+from . import database
+
+CHUNK_SIZE = 500
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+ORDER_COLUMNS = ('id', 'customer_id', 'customer_name', 'order_number', 'service_type', 'adults', 'kids',
+                 'arrival_time', 'order_date', 'order_data', 'order_docx_path', 'row_version', 'updated_at')
+INVOICE_COLUMNS = ('id', 'order_id', 'invoice_number', 'invoice_data', 'gst_breakdown', 'final_total',
+                   'created_at', 'order_number', 'order_date', 'customer_id', 'customer_name')
+
+QUERIES = {
+    'orders': (ORDER_COLUMNS, "SELECT o.* FROM orders o"),
+    'invoices': (INVOICE_COLUMNS,
+                 "SELECT i.id, i.order_id, i.invoice_number, i.invoice_data, i.gst_breakdown, i.final_total, "
+                 "i.created_at, o.order_number, o.order_date, o.customer_id "
+                 "FROM invoices i JOIN orders o ON o.id = i.order_id"),
+}
+
+
+def _query(entity, date_from=None, date_to=None, customer_id=None):
+    columns, sql = QUERIES[entity]
+    clauses, params = [], []
+    if date_from:
+        clauses.append("o.order_date >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("o.order_date <= ?")
+        params.append(date_to)
+    if customer_id:
+        clauses.append("o.customer_id = ?")
+        params.append(str(customer_id))
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY " + ("o.id" if entity == 'orders' else "i.id")
+    return columns, sql, params
+
+
+def iter_rows(entity, customer_names, chunk_size=CHUNK_SIZE, **filters):
+    """Yield export rows as dicts, chunk_size rows per fetch."""
+    columns, sql, params = _query(entity, **filters)
+    conn = database.get_connection()
+    try:
+        cursor = conn.execute(sql, params)
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                break
+            for row in chunk:
+                record = dict(row)
+                record['customer_name'] = customer_names.get(str(record['customer_id']), 'Unknown')
+                yield {column: record.get(column) for column in columns}
+    finally:
+        conn.close()
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, separators=(',', ':')) + '\n'
+
+
+def iter_csv(rows, columns):
+    # One reusable buffer: each row is written, taken and the buffer reset.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(row[column] for column in columns)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export(entity, fmt, customer_names, **filters):
+    """Generator of encoded export chunks for entity ('orders'/'invoices') in fmt."""
+    if entity not in QUERIES:
+        raise ValueError(f"Unknown export '{entity}'.")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}.")
+    rows = iter_rows(entity, customer_names, **filters)
+    if fmt == 'csv':
+        return iter_csv(rows, QUERIES[entity][0])
+    return iter_ndjson(rows)
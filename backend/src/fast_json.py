@@ -0,0 +1,57 @@
+"""
+Pluggable JSON encoder for the Flask app.
+
+With orjson installed (pip install orjson) responses are serialized by it,
+which is several times faster than the stdlib encoder on large order lists.
+JSON_ENCODER selects the encoder: "auto" (default, orjson when available),
+"orjson" or "stdlib". Output matches Flask's default provider: sorted keys,
+compact separators, and the same handling of dates, decimals and UUIDs.
+"""
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def __init__(self, app, encoder=JSON_ENCODER):
+        super().__init__(app)
+        if encoder == 'orjson' and orjson is None:
+            raise RuntimeError("JSON_ENCODER=orjson but orjson is not installed.")
+        self.use_orjson = orjson is not None and encoder in ('auto', 'orjson')
+        # Dates go through Flask's default() so they come out as HTTP dates, like the stdlib path.
+        self._orjson_options = (
+            orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        ) if self.use_orjson else 0
+
+    @property
+    def encoder_name(self):
+        return 'orjson' if self.use_orjson else 'stdlib'
+
+    def dumps_bytes(self, obj):
+        if self.use_orjson:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_options)
+        return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        # Pretty-printing and other stdlib-only options keep the stdlib path.
+        if self.use_orjson and not kwargs.keys() - {'separators'}:
+            return self.dumps_bytes(obj).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson or self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
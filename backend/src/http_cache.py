@@ -0,0 +1,55 @@
+"""
+Conditional GET support for the JSON API.
+
+Endpoints describe their current data with a cheap validator (a version
+counter or file signature) and pass a callable that builds the real response.
+When the client's If-None-Match / If-Modified-Since still match, a bodiless
+304 is returned and the collection is never loaded or serialized.
+"""
+from datetime import datetime, timezone
+
+from flask import make_response, request
+
+
+def make_etag(*parts):
+    """Join version parts into an ETag value (without quotes or W/)."""
+    return '-'.join(str(part) for part in parts)
+
+
+def _http_date(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc)
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+        return request.if_none_match.contains_weak(etag) or request.if_none_match.star_tag
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(etag, last_modified, build):
+    """
+    Answer a GET with 304 if the client's copy is current, otherwise return
+    build() with ETag, Last-Modified and Cache-Control: no-cache set so the
+    browser revalidates on every use.
+
+    etag is the unquoted ETag value (or None to skip validation) and
+    last_modified a POSIX timestamp or None. The ETag is sent weak: the 200
+    may be compressed (see compression.py) while the 304 never is, and both
+    must carry the same validator.
+    """
+    modified = _http_date(last_modified)
+    if etag is not None and _not_modified(etag, modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    if modified is not None:
+        response.last_modified = modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
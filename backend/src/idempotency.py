@@ -0,0 +1,202 @@
+"""
+Idempotency keys for POST endpoints.
+
+A client that may retry a request sends an Idempotency-Key header with a
+value it generated for that one operation. The first request with a key
+claims it in the idempotency_keys table and runs; its response is stored
+with the key for DEFAULT_TTL seconds. A repeat of the key is answered from
+the stored response without running the endpoint again (marked with an
+Idempotent-Replayed header). A repeat that arrives while the first is still
+running, from this or another worker process, waits for it to finish.
+
+A key reused with a different request body is rejected with 422. Server
+errors (5xx) are not stored, so the client can retry them. While the
+request runs, a background thread renews its claim every RENEW_SECONDS; a
+claim whose request died without finishing stops being renewed and is taken
+over once LEASE_SECONDS have passed, however long a live request takes.
+"""
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import jsonify, make_response, request
+
+from . import database
+
+DEFAULT_TTL = 24 * 3600
+LEASE_SECONDS = 60
+RENEW_SECONDS = LEASE_SECONDS / 4
+WAIT_SECONDS = 60
+MAX_KEY_LENGTH = 255
+
+
+def init_idempotency_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            response_status INTEGER,
+            response_body TEXT,
+            response_type TEXT,
+            locked_until INTEGER,
+            expires_at INTEGER NOT NULL,
+            PRIMARY KEY (scope, key)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at)")
+
+
+def claim(scope, key, fingerprint, ttl=DEFAULT_TTL):
+    """
+    Try to claim a key. Returns (state, row): 'claimed' (run the request),
+    'done' (row holds the stored response), 'pending' (another request is
+    running) or 'mismatch' (the key belongs to a different request).
+    """
+    now = int(time.time())
+    conn = database.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM idempotency_keys WHERE expires_at < ?", (now,))
+        row = conn.execute("SELECT * FROM idempotency_keys WHERE scope = ? AND key = ?", (scope, key)).fetchone()
+        if row is None:
+            conn.execute(
+                "INSERT INTO idempotency_keys (scope, key, fingerprint, locked_until, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (scope, key, fingerprint, now + LEASE_SECONDS, now + ttl)
+            )
+            state = 'claimed'
+        elif row['fingerprint'] != fingerprint:
+            state = 'mismatch'
+        elif row['status'] == 'done':
+            state = 'done'
+        elif row['locked_until'] < now:
+            conn.execute("UPDATE idempotency_keys SET locked_until = ? WHERE scope = ? AND key = ?",
+                         (now + LEASE_SECONDS, scope, key))
+            state = 'claimed'
+        else:
+            state = 'pending'
+        conn.commit()
+    finally:
+        conn.close()
+    return state, row
+
+
+def renew(scope, key):
+    """Push back the lease of a claim whose request is still running."""
+    conn = database.get_connection()
+    try:
+        conn.execute("UPDATE idempotency_keys SET locked_until = ? WHERE scope = ? AND key = ? AND status = 'pending'",
+                     (int(time.time()) + LEASE_SECONDS, scope, key))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _leased(scope, key):
+    """Keep renewing the claim's lease until the block exits."""
+    stop = threading.Event()
+
+    def keep_renewing():
+        while not stop.wait(RENEW_SECONDS):
+            try:
+                renew(scope, key)
+            except Exception as e:
+                print("Idempotency lease renewal failed:", e)
+
+    renewer = threading.Thread(target=keep_renewing, daemon=True, name='idempotency-lease')
+    renewer.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        renewer.join()
+
+
+def complete(scope, key, response):
+    """Store a finished response for the key."""
+    conn = database.get_connection()
+    try:
+        conn.execute(
+            "UPDATE idempotency_keys SET status = 'done', response_status = ?, response_body = ?, "
+            "response_type = ?, locked_until = NULL WHERE scope = ? AND key = ?",
+            (response.status_code, response.get_data(as_text=True), response.content_type, scope, key)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def release(scope, key):
+    """Forget an unfinished claim so the request can be retried."""
+    conn = database.get_connection()
+    try:
+        conn.execute("DELETE FROM idempotency_keys WHERE scope = ? AND key = ? AND status = 'pending'", (scope, key))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _fingerprint():
+    digest = hashlib.sha256()
+    for part in (request.method, request.path, request.query_string, request.get_data()):
+        digest.update(part if isinstance(part, bytes) else part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _replay(row):
+    response = make_response(row['response_body'], row['response_status'])
+    if row['response_type']:
+        response.content_type = row['response_type']
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(scope, ttl=DEFAULT_TTL):
+    """Decorator making a Flask view honour the Idempotency-Key header."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.headers.get('Idempotency-Key')
+            if not key:
+                return view(*args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return jsonify({'message': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters.'}), 400
+
+            fingerprint = _fingerprint()
+            deadline = time.monotonic() + WAIT_SECONDS
+            delay = 0.05
+            while True:
+                state, row = claim(scope, key, fingerprint, ttl)
+                if state == 'claimed':
+                    break
+                if state == 'mismatch':
+                    return jsonify({'message': 'Idempotency-Key was already used for a different request.'}), 422
+                if state == 'done':
+                    return _replay(row)
+                if time.monotonic() >= deadline:
+                    response = jsonify({'message': 'A request with this Idempotency-Key is still in progress.'})
+                    response.status_code = 409
+                    response.headers['Retry-After'] = '5'
+                    return response
+                time.sleep(delay)
+                delay = min(delay * 2, 0.5)
+
+            try:
+                with _leased(scope, key):
+                    response = make_response(view(*args, **kwargs))
+            except Exception:
+                release(scope, key)
+                raise
+            if response.status_code >= 500:
+                release(scope, key)
+            else:
+                complete(scope, key, response)
+            return response
+        return wrapper
+    return decorator
@@ -7,11 +7,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import QSortFilterProxyModel, QDate, QTime, Qt, QEvent
 from PyQt6.QtGui import QFont, QStandardItemModel, QStandardItem, QShortcut, QKeySequence, QCursor
 import database
-from docx_generator import save_order_as_docx
-from pdf_generator import generate_order_pdf  # for invoice generation
-
-from docx_generator import save_order_as_docx
-from pdf_generator import generate_order_pdf  # Function with signature (order_data, output_pdf_path)
+# pdf_generator (reportlab) is imported when an invoice is regenerated.
 
 # Folder where invoice files (PDF, DOCX, plain text) are stored.
 OUTPUT_FOLDER = os.path.join(os.getcwd(), "data", "Tour_Group_Orders")
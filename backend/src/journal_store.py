@@ -0,0 +1,266 @@
+"""
+Journal-backed record store for the customer and menu JSON files.
+
+The snapshot (customers.json / menu_items.json) stays a plain JSON list of
+records with an "id" key. Every mutation is appended as one small line to
+"<snapshot>.journal" instead of rewriting the whole snapshot, so a write
+costs O(1) regardless of how many records exist:
+
+    {"op": "put", "record": {...}}
+    {"op": "delete", "id": "..."}
+
+The in-memory state is the snapshot plus the replayed journal. Before every
+read or write the store checks the snapshot and journal on disk and replays
+only the new tail, which keeps worker processes sharing the files in sync.
+
+A background compactor folds the journal into a new snapshot once it grows
+past compact_after entries. Replaying puts and deletes is idempotent, so a
+crash between writing the snapshot and truncating the journal is harmless.
+
+With a clock (a callable returning increasing integers) every put stamps the
+record with row_version and updated_at, so clients can sync incrementally.
+"""
+import json
+import os
+import threading
+import time
+
+from . import json_store
+
+
+class JournalStore:
+    def __init__(self, snapshot_path, compact_after=500, compact_interval=30.0, fsync=True, clock=None):
+        self.snapshot_path = snapshot_path
+        self.clock = clock
+        self.journal_path = snapshot_path + '.journal'
+        self.compact_after = compact_after
+        self.compact_interval = compact_interval
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._records = {}
+        self._generation = 0
+        self._snapshot_signature = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._compactor = None
+        self._stop = threading.Event()
+        self._listeners = []
+
+    # --- Loading ---
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _load_snapshot(self):
+        self._records = {}
+        self._generation += 1
+        for record in json_store.read_json(self.snapshot_path):
+            if isinstance(record, dict) and 'id' in record:
+                self._records[str(record['id'])] = record
+        self._snapshot_signature = self._signature(self.snapshot_path)
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def _apply(self, entry):
+        self._generation += 1
+        op = entry.get('op')
+        if op == 'put':
+            record = entry['record']
+            self._records[str(record['id'])] = record
+        elif op == 'delete':
+            self._records.pop(str(entry['id']), None)
+
+    def _replay_tail(self):
+        try:
+            size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            size = 0
+        if size < self._journal_offset:
+            # Journal was truncated by a compaction we haven't seen yet.
+            self._load_snapshot()
+        if size == self._journal_offset:
+            return
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # a writer is mid-append; pick it up next time
+                self._journal_offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping unreadable entry in {self.journal_path}.")
+                    continue
+                self._apply(entry)
+                self._journal_entries += 1
+
+    def refresh(self):
+        """Bring the in-memory state up to date with the files on disk."""
+        with self._lock:
+            if self._snapshot_signature is None or self._signature(self.snapshot_path) != self._snapshot_signature:
+                self._load_snapshot()
+            self._replay_tail()
+
+    # --- Reads ---
+    def all(self):
+        with self._lock:
+            self.refresh()
+            return [dict(record) for record in self._records.values()]
+
+    def get(self, record_id):
+        with self._lock:
+            self.refresh()
+            record = self._records.get(str(record_id))
+            return dict(record) if record is not None else None
+
+    def get_many(self, record_ids):
+        """{id: record} for the ids that exist, with a single refresh."""
+        with self._lock:
+            self.refresh()
+            found = {}
+            for record_id in record_ids:
+                record = self._records.get(str(record_id))
+                if record is not None:
+                    found[str(record_id)] = dict(record)
+            return found
+
+    def state(self):
+        """
+        (version, last_modified) of the current contents. The version is
+        derived from the files on disk, so every process sharing them reports
+        the same value; last_modified is a POSIX timestamp or None.
+        """
+        with self._lock:
+            self.refresh()
+            ino, mtime_ns, size = self._snapshot_signature or (0, 0, 0)
+            version = f"{ino:x}.{mtime_ns:x}.{self._journal_offset:x}"
+            times = [mtime_ns / 1e9] if self._snapshot_signature else []
+        try:
+            times.append(os.path.getmtime(self.journal_path))
+        except FileNotFoundError:
+            pass
+        return version, max(times) if times else None
+
+    @property
+    def generation(self):
+        """
+        Counter bumped by every change to the in-memory state, including ones
+        replayed from other processes, for caches derived from the records.
+        """
+        with self._lock:
+            self.refresh()
+            return self._generation
+
+    def __len__(self):
+        with self._lock:
+            self.refresh()
+            return len(self._records)
+
+    # --- Writes ---
+    def locked(self):
+        """Cross-process lock for a read-modify-write on this store."""
+        return json_store.locked(self.snapshot_path)
+
+    def subscribe(self, listener):
+        """
+        Call listener(op, value) after every write made through this store:
+        ('put', record) or ('delete', id). It runs under the store's file
+        lock, so listeners see writes in the order they happened.
+        """
+        self._listeners.append(listener)
+
+    def _append(self, entry):
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+        with self.locked():
+            with self._lock:
+                self.refresh()
+                with open(self.journal_path, 'ab') as f:
+                    # Under the file lock no one else is appending, so bytes past the
+                    # last complete line are a torn write from a crash; drop them.
+                    if f.tell() > self._journal_offset:
+                        f.truncate(self._journal_offset)
+                    f.write(line)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                self._journal_offset += len(line)
+                self._journal_entries += 1
+                self._apply(entry)
+            value = entry['record'] if entry['op'] == 'put' else entry['id']
+            for listener in list(self._listeners):
+                try:
+                    listener(entry['op'], value)
+                except Exception as e:
+                    print("Journal store listener failed:", e)
+        self._ensure_compactor()
+
+    def put(self, record):
+        """Insert or replace a record (it must carry an "id")."""
+        with self.locked():
+            if self.clock is not None:
+                record['row_version'] = self.clock()
+                record['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+            self._append({'op': 'put', 'record': record})
+        return record
+
+    def delete(self, record_id):
+        """Remove a record. Returns False if it did not exist."""
+        with self.locked():
+            if self.get(record_id) is None:
+                return False
+            self._append({'op': 'delete', 'id': str(record_id)})
+        return True
+
+    # --- Compaction ---
+    def compact(self):
+        """Fold the journal into a fresh snapshot and truncate the journal."""
+        with self.locked(), self._lock:
+            self.refresh()
+            if not self._journal_entries:
+                return False
+            records = list(self._records.values())
+            json_store.atomic_write(self.snapshot_path, json_store.dumps(records))
+            with open(self.journal_path, 'wb') as f:
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._snapshot_signature = self._signature(self.snapshot_path)
+            self._journal_offset = 0
+            self._journal_entries = 0
+            return True
+
+    def _ensure_compactor(self):
+        if self._compactor is not None or self.compact_interval <= 0:
+            return
+        with self._lock:
+            if self._compactor is not None:
+                return
+            self._compactor = threading.Thread(
+                target=self._compact_loop, daemon=True,
+                name=f"compactor-{os.path.basename(self.snapshot_path)}",
+            )
+            self._compactor.start()
+
+    def _compact_loop(self):
+        while not self._stop.wait(self.compact_interval):
+            try:
+                with self._lock:
+                    self.refresh()
+                    due = self._journal_entries >= self.compact_after
+                if due:
+                    self.compact()
+            except Exception as e:
+                print("Journal compaction failed:", e)
+
+    def close(self):
+        """Stop the compactor and fold any outstanding journal entries."""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join(timeout=5)
+            self._compactor = None
+        self.compact()
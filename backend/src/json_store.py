@@ -0,0 +1,133 @@
+"""
+Helpers for the JSON file stores (customers.json and menu_items.json).
+
+Access is serialized with an advisory lock on a sidecar "<file>.lock" file so
+several worker processes can share the same store. The lock is re-entrant
+within a thread: a store can hold it around a whole read-modify-write cycle
+while the helpers take it again internally.
+
+Writes are atomic: the document goes to a temporary file in the same
+directory, is fsynced and then renamed over the original, so a crash or a
+concurrent reader never sees a half-written file.
+
+There is no write coalescing any more: the customer and menu stores append
+to a journal (journal_store.py) and only rewrite the snapshot when they
+compact, which already turns a burst of edits into a few small appends.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Documents with more records than this are written without indentation.
+COMPACT_THRESHOLD = int(os.environ.get('JSON_COMPACT_THRESHOLD', '1000'))
+
+_registry_lock = threading.Lock()
+_thread_locks = {}
+_held = threading.local()
+
+
+def _thread_lock(key):
+    with _registry_lock:
+        lock = _thread_locks.get(key)
+        if lock is None:
+            lock = _thread_locks[key] = threading.Lock()
+        return lock
+
+
+def _lock_file(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        return
+    handle.seek(0)
+    while True:
+        try:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            time.sleep(0.05)
+
+
+def _unlock_file(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        return
+    handle.seek(0)
+    msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def locked(file_path):
+    """Hold the cross-process lock for file_path for the duration of the block."""
+    key = os.path.abspath(file_path)
+    depth = getattr(_held, 'depth', None)
+    if depth is None:
+        depth = _held.depth = {}
+
+    if depth.get(key):
+        depth[key] += 1
+        try:
+            yield
+        finally:
+            depth[key] -= 1
+        return
+
+    with _thread_lock(key):
+        with open(key + '.lock', 'a+') as handle:
+            _lock_file(handle)
+            depth[key] = 1
+            try:
+                yield
+            finally:
+                depth[key] = 0
+                _unlock_file(handle)
+
+
+def dumps(data):
+    if isinstance(data, list) and len(data) > COMPACT_THRESHOLD:
+        return json.dumps(data, separators=(',', ':'))
+    return json.dumps(data, indent=4)
+
+
+def _fsync_directory(directory):
+    if not hasattr(os, 'O_DIRECTORY'):  # Windows can't fsync a directory
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(file_path, text):
+    """Replace file_path with text via temp file, fsync and rename."""
+    path = os.path.abspath(file_path)
+    directory = os.path.dirname(path)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def read_json(file_path):
+    # No lock needed: writers replace the file atomically.
+    try:
+        with open(file_path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
@@ -0,0 +1,336 @@
+"""
+Live kitchen view of one service: orders for a date and service type,
+bucketed into arrival-time slots, with item totals per course.
+
+Each requested (date, service) window is loaded from SQLite once and then
+kept up to date in memory: the feed follows the EventBus, and an order
+create or update re-reads just that row and moves its counts out of the old
+slot and into the new one. Imports and customer / menu changes (names,
+course categories) only mark the loaded windows stale; each is reloaded by
+the next reader, outside the lock, so writers never wait on it.
+
+Every change bumps the window's version, and the JSON snapshot is built once
+per version, so any number of screens polling or streaming the same window
+share one serialization. Writes the bus does not see (another worker, the Qt
+app) are caught by comparing the orders collection version, at most every
+STALE_CHECK_SECONDS while clients wait.
+
+Course splitting reuses the kitchen docket rules of print_spooler.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from . import database
+from .print_spooler import COURSES, course_of, order_lines
+
+STALE_CHECK_SECONDS = 5.0
+UNKNOWN_SLOT = '--:--'
+
+
+def slot_of(arrival_time, slot_minutes):
+    """'HH:MM' start of the slot arrival_time falls in, or UNKNOWN_SLOT."""
+    try:
+        hours, minutes = (int(part) for part in str(arrival_time).split(':')[:2])
+    except (TypeError, ValueError):
+        return UNKNOWN_SLOT
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        return UNKNOWN_SLOT
+    start = (hours * 60 + minutes) // slot_minutes * slot_minutes
+    return f"{start // 60:02d}:{start % 60:02d}"
+
+
+class _Slot:
+    def __init__(self):
+        self.order_ids = set()
+        self.adults = 0
+        self.kids = 0
+        self.courses = {course: Counter() for course, _ in COURSES}
+
+
+class _Window:
+    def __init__(self, date, service):
+        self.date = date
+        self.service = service
+        self.orders = {}
+        self.slots = {}
+        self.version = 0
+        self.stale = False
+        self._snapshot = None
+
+    def add(self, entry):
+        self.orders[entry['id']] = entry
+        slot = self.slots.setdefault(entry['slot'], _Slot())
+        slot.order_ids.add(entry['id'])
+        slot.adults += entry['adults']
+        slot.kids += entry['kids']
+        for course, items in entry['items'].items():
+            for item in items:
+                slot.courses[course][item['name']] += item['quantity']
+
+    def remove(self, order_id):
+        entry = self.orders.pop(order_id, None)
+        if entry is None:
+            return
+        slot = self.slots[entry['slot']]
+        slot.order_ids.discard(order_id)
+        slot.adults -= entry['adults']
+        slot.kids -= entry['kids']
+        for course, items in entry['items'].items():
+            for item in items:
+                slot.courses[course][item['name']] -= item['quantity']
+            slot.courses[course] += Counter()  # drop zero counts
+        if not slot.order_ids:
+            del self.slots[entry['slot']]
+
+    def snapshot(self, slot_minutes):
+        """(version, JSON text), rebuilt only when the version changed."""
+        if self._snapshot is not None and self._snapshot[0] == self.version:
+            return self._snapshot
+        slots, totals = [], {course: Counter() for course, _ in COURSES}
+        for name in sorted(self.slots, key=lambda s: (s == UNKNOWN_SLOT, s)):
+            slot = self.slots[name]
+            orders = sorted((self.orders[i] for i in slot.order_ids),
+                            key=lambda o: (o['arrival_time'] or '', o['id']))
+            for course, counts in slot.courses.items():
+                totals[course].update(counts)
+            slots.append({
+                'slot': name,
+                'orders': [{k: v for k, v in o.items() if k != 'slot'} for o in orders],
+                'totals': {'orders': len(orders), 'adults': slot.adults, 'kids': slot.kids,
+                           'courses': {c: dict(sorted(n.items())) for c, n in slot.courses.items() if n}},
+            })
+        body = {
+            'date': self.date,
+            'service_type': self.service,
+            'version': self.version,
+            'slot_minutes': slot_minutes,
+            'totals': {
+                'orders': len(self.orders),
+                'adults': sum(o['adults'] for o in self.orders.values()),
+                'kids': sum(o['kids'] for o in self.orders.values()),
+                'courses': {c: dict(sorted(n.items())) for c, n in totals.items() if n},
+            },
+            'slots': slots,
+        }
+        self._snapshot = (self.version, json.dumps(body, separators=(',', ':'), ensure_ascii=False))
+        return self._snapshot
+
+
+class KitchenFeed:
+    def __init__(self, customer_name, menu_categories, db_version, slot_minutes=15, max_windows=32):
+        """
+        customer_name(customer_id) and menu_categories() resolve names and
+        course categories; db_version() returns the orders collection version.
+        """
+        self.customer_name = customer_name
+        self.menu_categories = menu_categories
+        self.db_version = db_version
+        self.slot_minutes = slot_minutes
+        self.max_windows = max_windows
+        self._cond = threading.Condition()
+        self._load_lock = threading.Lock()
+        self._writes = 0
+        self._windows = OrderedDict()
+        self._window_of = {}
+        self._version = 0
+        self._seen_db_version = None
+        self._checked_at = 0.0
+        # Versions restart with the process; the epoch keeps ETags from matching across restarts.
+        self.epoch = os.urandom(4).hex()
+
+    def attach(self, bus):
+        bus.subscribe(self._on_event)
+
+    # --- Building entries ---
+    def _entry(self, row, categories):
+        items = {course: [] for course, _ in COURSES}
+        for name, quantity, comment in order_lines(row['order_data']):
+            items[course_of(categories.get(name))].append({'name': name, 'quantity': quantity, 'comment': comment})
+        return {
+            'id': row['id'],
+            'order_number': row['order_number'],
+            'customer_id': row['customer_id'],
+            'customer_name': self.customer_name(row['customer_id']),
+            'arrival_time': row['arrival_time'],
+            'slot': slot_of(row['arrival_time'], self.slot_minutes),
+            'adults': int(row['adults'] or 0),
+            'kids': int(row['kids'] or 0),
+            'items': {course: lines for course, lines in items.items() if lines},
+        }
+
+    def _next_version(self):
+        self._version += 1
+        return self._version
+
+    def _read(self, key):
+        date, service = key
+        conn = database.get_connection()
+        try:
+            rows = conn.execute("SELECT * FROM orders WHERE order_date = ? AND lower(service_type) = ?",
+                                (date, service)).fetchall()
+        finally:
+            conn.close()
+        window = _Window(date, service)
+        categories = self.menu_categories()
+        for row in rows:
+            window.add(self._entry(row, categories))
+        return window
+
+    def _load(self, key):
+        """Read a window outside the lock and install it, retrying if an order write raced the read."""
+        with self._cond:
+            if self._seen_db_version is None:
+                self._seen_db_version = self.db_version()
+        while True:
+            with self._cond:
+                writes = self._writes
+            window = self._read(key)
+            with self._cond:
+                if self._writes != writes:
+                    continue
+                old = self._windows.pop(key, None)
+                if old is not None:
+                    for order_id in old.orders:
+                        if self._window_of.get(order_id) == key:
+                            del self._window_of[order_id]
+                for order_id in window.orders:
+                    self._window_of[order_id] = key
+                window.version = self._next_version()
+                self._windows[key] = window
+                while len(self._windows) > self.max_windows:
+                    evicted_key, evicted = self._windows.popitem(last=False)
+                    for order_id in evicted.orders:
+                        if self._window_of.get(order_id) == evicted_key:
+                            del self._window_of[order_id]
+                self._cond.notify_all()
+                return window
+
+    def _fresh(self, key):
+        window = self._windows.get(key)
+        if window is None or window.stale:
+            return None
+        self._windows.move_to_end(key)
+        return window
+
+    def _window(self, date, service):
+        """The up-to-date window, (re)loading it first if needed. Call without holding the lock."""
+        key = (date, service.lower())
+        with self._cond:
+            window = self._fresh(key)
+        if window is not None:
+            return window
+        # One load at a time, so many screens on a stale window cause one query, not one each.
+        with self._load_lock:
+            with self._cond:
+                window = self._fresh(key)
+            return window if window is not None else self._load(key)
+
+    # --- Following writes ---
+    def _on_event(self, event):
+        if event['entity'] == 'order' and event['entity_id'] is not None:
+            self.apply_order(int(event['entity_id']))
+        elif event['entity'] in ('order', 'customer', 'menu_item'):
+            self.reset()
+        if event['entity'] == 'order' and event.get('version') is not None:
+            with self._cond:
+                self._seen_db_version = max(self._seen_db_version or 0, event['version'])
+
+    def apply_order(self, order_id):
+        """Re-read one order and move it between the loaded windows."""
+        with self._cond:
+            if not self._windows:
+                return
+            self._writes += 1
+        conn = database.get_connection()
+        try:
+            row = conn.execute("SELECT * FROM orders WHERE id = ?", (order_id,)).fetchone()
+        finally:
+            conn.close()
+        categories = self.menu_categories()
+        entry = self._entry(row, categories) if row else None
+        with self._cond:
+            changed = []
+            old_key = self._window_of.pop(order_id, None)
+            old = self._windows.get(old_key)
+            if old is not None and not old.stale:
+                old.remove(order_id)
+                changed.append(old)
+            new_key = (row['order_date'], str(row['service_type']).lower()) if row else None
+            new = self._windows.get(new_key)
+            if new is not None and not new.stale:
+                new.add(entry)
+                self._window_of[order_id] = new_key
+                changed.append(new)
+            for window in changed:
+                window.version = self._next_version()
+            if changed:
+                self._cond.notify_all()
+
+    def reset(self):
+        """
+        Mark every loaded window stale (names, categories or many orders
+        changed). Each is reloaded by the next reader, not by the writer.
+        """
+        with self._cond:
+            self._writes += 1
+            for window in self._windows.values():
+                window.stale = True
+            self._window_of.clear()
+            self._cond.notify_all()
+
+    def refresh_if_stale(self):
+        """Reload if the orders table changed behind the bus's back (checked at most every few seconds)."""
+        now = time.monotonic()
+        with self._cond:
+            if now - self._checked_at < STALE_CHECK_SECONDS:
+                return
+            self._checked_at = now
+        current = self.db_version()
+        with self._cond:
+            seen = self._seen_db_version
+            self._seen_db_version = current
+        if seen is not None and current is not None and current > seen:
+            self.reset()
+
+    # --- Reading ---
+    def snapshot(self, date, service):
+        """(version, JSON text) for a window."""
+        while True:
+            window = self._window(date, service)
+            with self._cond:
+                if not window.stale:
+                    return window.snapshot(self.slot_minutes)
+
+    def wait(self, date, service, since, timeout):
+        """Block up to timeout seconds until the window's version is above since. Returns True if it is."""
+        deadline = time.monotonic() + timeout
+        while True:
+            self.refresh_if_stale()
+            window = self._window(date, service)
+            with self._cond:
+                if window.stale:
+                    continue
+                # A since beyond anything issued comes from before a restart.
+                if window.version > since or since > self._version:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, STALE_CHECK_SECONDS))
+
+
+def stream(feed, date, service, is_stopping, heartbeat=15.0):
+    """SSE frames: the window's snapshot now and after every change, keep-alives in between."""
+    yield 'retry: 3000\n\n'
+    version = None
+    while not is_stopping():
+        current, body = feed.snapshot(date, service)
+        if current != version:
+            version = current
+            yield f"id: {version}\nevent: feed\ndata: {body}\n\n"
+        else:
+            yield ': keep-alive\n\n'
+        feed.wait(date, service, version, heartbeat)
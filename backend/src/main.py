@@ -1,4 +1,4 @@
-geminimport sys
+import sys
 import os
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout,
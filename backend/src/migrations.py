@@ -0,0 +1,152 @@
+"""
+Versioned schema migrations for tour_group.db.
+
+MIGRATIONS lists every schema change in the order it was made. migrate()
+applies the ones missing from the schema_version table, each in its own
+BEGIN IMMEDIATE transaction together with its schema_version row, and
+mirrors the highest applied version into PRAGMA user_version. When that
+already equals database.SCHEMA_VERSION, migrate() returns after one pragma
+read, so it is cheap to call on every launch.
+
+The schema steps are written to be idempotent (IF NOT EXISTS, column checks)
+so databases created before versioning are adopted by simply running them.
+
+A migration may also name a backfill for existing rows. It runs after the
+schema step has committed, through database.backfill(), in short chunks so a
+large table never holds the write lock for long; the migration is recorded
+only once its backfill finished, and an interrupted one resumes on the next
+launch.
+
+Usage (from backend/):
+    python -m src.migrations            # apply pending migrations
+    python -m src.migrations --status   # list applied and pending ones
+"""
+import argparse
+import sqlite3
+from collections import namedtuple
+
+from . import database, events, idempotency, print_spooler, reports, search
+
+Migration = namedtuple('Migration', 'version name apply backfill')
+
+
+def _backfill_sync_versions(conn):
+    for table in database.SYNC_TABLES:
+        database.backfill(conn, table, database.sync_backfill_sql(table))
+
+
+def _backfill_order_search(conn):
+    if search.available(conn):
+        database.backfill(conn, 'orders', search.ORDERS_BACKFILL_SQL)
+
+
+MIGRATIONS = [
+    Migration(1, 'initial tables', database.create_tables, None),
+    Migration(2, 'collection versions', database.init_collection_versions, None),
+    Migration(3, 'lookup indexes', database.create_lookup_indexes, None),
+    Migration(4, 'row versions and tombstones', database.init_sync_schema, _backfill_sync_versions),
+    Migration(5, 'full-text search', search.init_search_schema, _backfill_order_search),
+    # The rollups are rebuilt inside the schema step: the triggers keep them
+    # exact only if no invoice changes between the rebuild and their creation.
+    Migration(6, 'revenue rollups', reports.init_report_schema, None),
+    Migration(7, 'idempotency keys', idempotency.init_idempotency_schema, None),
+    Migration(8, 'print spooler', print_spooler.init_print_schema, None),
+    Migration(9, 'shared change feed', events.init_events_schema, None),
+]
+
+if MIGRATIONS[-1].version != database.SCHEMA_VERSION:
+    raise RuntimeError("database.SCHEMA_VERSION must match the last migration")
+
+
+def _ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def applied_versions(conn):
+    try:
+        return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+    except sqlite3.OperationalError:
+        return set()
+
+
+def _record(conn, migration):
+    conn.execute("INSERT OR IGNORE INTO schema_version (version, name) VALUES (?, ?)",
+                 (migration.version, migration.name))
+    # user_version only claims a version once everything below it is applied.
+    applied = applied_versions(conn)
+    contiguous = 0
+    for m in MIGRATIONS:
+        if m.version not in applied:
+            break
+        contiguous = m.version
+    conn.execute(f"PRAGMA user_version = {contiguous}")
+
+
+def migrate():
+    """Apply every pending migration. Returns the (version, name) pairs applied."""
+    conn = database.get_connection()
+    applied = []
+    try:
+        conn.execute("PRAGMA busy_timeout = 30000")
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= database.SCHEMA_VERSION:
+            return applied
+        _ensure_version_table(conn)
+        conn.commit()
+
+        for migration in MIGRATIONS:
+            conn.execute("BEGIN IMMEDIATE")
+            # Re-checked under the write lock: another process may have got here first.
+            if migration.version in applied_versions(conn):
+                conn.rollback()
+                continue
+            migration.apply(conn.cursor())
+            if migration.backfill is None:
+                _record(conn, migration)
+            conn.commit()
+
+            if migration.backfill is not None:
+                migration.backfill(conn)
+                conn.execute("BEGIN IMMEDIATE")
+                _record(conn, migration)
+                conn.commit()
+            print(f"Applied migration {migration.version}: {migration.name}")
+            applied.append((migration.version, migration.name))
+    finally:
+        conn.close()
+    return applied
+
+
+def status():
+    """[(version, name, applied_at or None)] for every known migration."""
+    conn = database.get_connection()
+    try:
+        try:
+            applied = {row['version']: row['applied_at']
+                       for row in conn.execute("SELECT version, applied_at FROM schema_version")}
+        except sqlite3.OperationalError:
+            applied = {}
+    finally:
+        conn.close()
+    return [(m.version, m.name, applied.get(m.version)) for m in MIGRATIONS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or list schema migrations.")
+    parser.add_argument("--status", action="store_true", help="List migrations instead of applying them.")
+    args = parser.parse_args()
+    if args.status:
+        for version, name, applied_at in status():
+            print(f"{version:>3}  {name:<30} {applied_at or 'pending'}")
+        return
+    if not migrate():
+        print(f"Schema is up to date (version {database.SCHEMA_VERSION}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Bulk order import from CSV or JSON lines.
+
+Every row is validated first. The valid ones are then inserted together with
+their invoices in a single transaction using executemany, with order and
+invoice ids allocated up front so that each invoice number is known without
+the insert-then-update that POST /api/orders does. Invalid rows are reported
+with their line number and do not stop the rest of the batch.
+
+Document generation and email are not done here; the caller gets the
+imported orders back and decides when to run that work.
+
+CSV files need a header row with the ORDER_FIELDS columns. order_data holds
+the same JSON object the web UI sends ({"Item": {"quantity": 2}, ...}).
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from . import database
+
+ORDER_FIELDS = ('customer_id', 'order_number', 'service_type', 'adults', 'kids',
+                'arrival_time', 'order_date', 'order_data')
+FORMATS = ('csv', 'jsonl')
+
+
+class ImportFileError(ValueError):
+    """The import file as a whole could not be read."""
+
+
+def read_rows(text, fmt):
+    """Yield (line_number, row) pairs; row is None when the line cannot be parsed."""
+    if fmt == 'csv':
+        reader = csv.DictReader(io.StringIO(text))
+        missing = [f for f in ORDER_FIELDS if f not in (reader.fieldnames or [])]
+        if missing:
+            raise ImportFileError(f"CSV header is missing columns: {', '.join(missing)}")
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+    else:
+        raise ImportFileError(f"Unknown import format '{fmt}', expected one of {', '.join(FORMATS)}.")
+
+
+def _int_field(row, name, errors):
+    try:
+        value = int(row.get(name))
+    except (TypeError, ValueError):
+        errors.append(f"{name} must be a whole number")
+        return None
+    if value < 0:
+        errors.append(f"{name} cannot be negative")
+    return value
+
+
+def validate_row(row, customer_ids):
+    """Return (order, errors) for one parsed row. order is None when errors is non-empty."""
+    errors = []
+    customer_id = str(row.get('customer_id') or '').strip()
+    if not customer_id:
+        errors.append("customer_id is required")
+    elif customer_id not in customer_ids:
+        errors.append(f"unknown customer_id '{customer_id}'")
+
+    for name in ('order_number', 'service_type'):
+        if not str(row.get(name) or '').strip():
+            errors.append(f"{name} is required")
+
+    adults = _int_field(row, 'adults', errors)
+    kids = _int_field(row, 'kids', errors)
+
+    for name, fmt, label in (('arrival_time', '%H:%M', 'HH:MM'), ('order_date', '%Y-%m-%d', 'YYYY-MM-DD')):
+        try:
+            datetime.strptime(str(row.get(name) or ''), fmt)
+        except ValueError:
+            errors.append(f"{name} must be {label}")
+
+    order_data = row.get('order_data') or {}
+    if isinstance(order_data, str):
+        try:
+            order_data = json.loads(order_data)
+        except json.JSONDecodeError:
+            errors.append("order_data is not valid JSON")
+    if not isinstance(order_data, dict):
+        errors.append("order_data must be a JSON object")
+
+    if errors:
+        return None, errors
+    return {
+        'customer_id': customer_id,
+        'order_number': str(row['order_number']).strip(),
+        'service_type': str(row['service_type']).strip(),
+        'adults': adults,
+        'kids': kids,
+        'arrival_time': str(row['arrival_time']),
+        'order_date': str(row['order_date']),
+        'order_data': order_data,
+    }, []
+
+
+def _next_id(cursor, table):
+    # AUTOINCREMENT never reuses ids, so start after both the sequence and the current max.
+    row = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    seq = row[0] if row else 0
+    max_id = cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+    return max(seq, max_id) + 1
+
+
+def insert_orders(orders, pricing=None):
+    """
+    Insert validated orders and their invoices in one transaction. Sets
+    'id' and 'invoice_number' on each order dict and returns the list.
+    With a PricingCache the invoice totals and GST are filled in as well.
+    """
+    if not orders:
+        return orders
+    totals = pricing.totals(orders) if pricing is not None else [None] * len(orders)
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        order_id = _next_id(cursor, 'orders')
+        invoice_id = _next_id(cursor, 'invoices')
+        order_rows, invoice_rows = [], []
+        for offset, (order, total) in enumerate(zip(orders, totals)):
+            order['id'] = order_id + offset
+            order['invoice_number'] = f"INV-{invoice_id + offset:05d}"
+            order_rows.append((
+                order['id'], order['customer_id'], order['order_number'], order['service_type'],
+                order['adults'], order['kids'], order['arrival_time'], order['order_date'],
+                json.dumps(order['order_data'])
+            ))
+            invoice_rows.append((
+                invoice_id + offset, order['id'], order['invoice_number'],
+                float(total.gst) if total else None, float(total.total) if total else None
+            ))
+
+        cursor.executemany("""
+            INSERT INTO orders (id, customer_id, order_number, service_type, adults, kids, arrival_time, order_date, order_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, order_rows)
+        cursor.executemany("""
+            INSERT INTO invoices (id, order_id, invoice_number, gst_breakdown, final_total)
+            VALUES (?, ?, ?, ?, ?)
+        """, invoice_rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        for order in orders:
+            order.pop('id', None)
+            order.pop('invoice_number', None)
+        raise
+    finally:
+        conn.close()
+    return orders
+
+
+def import_orders(text, fmt, customer_ids, pricing=None):
+    """
+    Validate and insert every row of an import file. Returns a report:
+    {'imported': [order, ...], 'errors': [{'line': n, 'errors': [...]}, ...]}.
+    """
+    valid, errors = [], []
+    for line_number, row in read_rows(text, fmt):
+        if row is None:
+            errors.append({'line': line_number, 'errors': ["line is not a JSON object"]})
+            continue
+        order, row_errors = validate_row(row, customer_ids)
+        if row_errors:
+            errors.append({'line': line_number, 'errors': row_errors})
+        else:
+            order['line'] = line_number
+            valid.append(order)
+    return {'imported': insert_orders(valid, pricing), 'errors': errors}
@@ -1,7 +1,4 @@
-import sys, os, platform, json, smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
+import sys, os, platform, json
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QFormLayout, QHBoxLayout, QLabel, QComboBox,
@@ -11,8 +8,9 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import QDate, QTime, Qt, QEvent
 import database
-from docx_generator import save_order_as_docx
-from pdf_generator import generate_order_pdf  # (Not used for invoice now)
+import pricing
+# docx_generator (python-docx), pdf_generator (reportlab) and the email stack
+# are imported where they are used, so opening the app doesn't pay for them.
 
 
 def get_menu_items():
@@ -435,7 +433,8 @@ class OrderManager(QWidget):
             cursor.execute("""
                 INSERT INTO invoices (order_id, invoice_number, invoice_data, gst_breakdown, final_total)
                 VALUES (?, ?, ?, ?, ?)
-            """, (0, "", "Auto-generated invoice for order " + order_data["order_number"], 0.0, 0.0))
+            """, (0, "", "Auto-generated invoice for order " + order_data["order_number"],
+                  order_data.get("gst", 0.0), order_data.get("calculated_total", 0.0)))
             invoice_id = cursor.lastrowid
             formatted_invoice_num = f"INV-{invoice_id:05d}"
             cursor.execute("UPDATE invoices SET invoice_number = ? WHERE id = ?", (formatted_invoice_num, invoice_id))
@@ -482,6 +481,10 @@ class OrderManager(QWidget):
 
     # ---------- Email Sending Helper ----------
     def send_order_email(self, order_data, recipient_email, docx_path):
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.application import MIMEApplication
         try:
             conn = database.get_connection()
             cursor = conn.cursor()
@@ -581,6 +584,8 @@ class OrderManager(QWidget):
 
     # ---------- Main Print Order ----------
     def print_order(self):
+        from docx_generator import save_order_as_docx
+        from pdf_generator import generate_order_pdf
         if (self.customer_combo.currentText() == "Select Customer" or
                 not self.order_number_edit.text().strip() or
                 not self.date_edit.text().strip()):
@@ -620,33 +625,31 @@ class OrderManager(QWidget):
 
         overall_total = total_entree + total_mains + total_desserts
 
-        # Retrieve pricing information from the customer record
+        # Retrieve pricing information from the customer record; totals use the
+        # same cent arithmetic as the invoices the API stores.
         try:
             conn = database.get_connection()
             cursor = conn.cursor()
             cursor.execute("SELECT price_lunch, price_dinner, price_kids FROM customers WHERE id = ?",
                            (self.customer_combo.currentData(),))
-            pricing = cursor.fetchone()
+            customer_prices = cursor.fetchone()
             conn.close()
-            if pricing:
+            if customer_prices:
                 # Determine service type and corresponding unit price
-                if self.radio_lunch.isChecked():
-                    unit_price = pricing["price_lunch"]
-                else:
-                    unit_price = pricing["price_dinner"]
-                kids_price = pricing["price_kids"]
+                service = "Lunch" if self.radio_lunch.isChecked() else "Dinner"
+                unit_price, kids_price = pricing.unit_prices(pricing.price_table(dict(customer_prices)), service)
 
                 # Check that adult price is not 0
                 if unit_price == 0:
                     QMessageBox.warning(self, "Pricing Error",
                                         "The customer's price for lunch/dinner is 0. Please update the customer pricing.")
                     return
-
-                calculated_total = (adults * unit_price) + (kids * kids_price)
             else:
-                calculated_total = 0.0
-                unit_price = 0.0
-                kids_price = 0.0
+                unit_price = kids_price = pricing.parse_price(0)
+            totals = pricing.order_totals(adults, kids, unit_price, kids_price)
+            calculated_total = float(totals.total)
+            gst_amount = float(totals.gst)
+            unit_price, kids_price = float(unit_price), float(kids_price)
         except Exception as e:
             QMessageBox.warning(self, "Pricing Error", f"Failed to retrieve pricing information:\n{e}")
             return
@@ -668,7 +671,8 @@ class OrderManager(QWidget):
             "adult_price": unit_price,
             "kid_price": kids_price,
             "service_type": order_service,
-            "calculated_total": calculated_total
+            "calculated_total": calculated_total,
+            "gst": gst_amount
         }
 
         # Create invoice record and add invoice number to order_data.
@@ -5,7 +5,27 @@ from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor
 from datetime import datetime
 
-def generate_order_pdf(order_data, output_pdf_path):
+try:
+    from . import pricing, render_cache
+except ImportError:  # imported top-level by the Qt app
+    import pricing
+    import render_cache
+
+def generate_order_pdf(order_data, output_pdf_path, use_cache=True):
+    """
+    Write the invoice PDF for order_data to output_pdf_path, reusing the
+    cached render when the order's content is unchanged.
+    """
+    if not use_cache:
+        return _render_order_pdf(order_data, output_pdf_path)
+    # The header date is part of the cached content, so a cached invoice never
+    # shows the day it was first rendered instead of its invoice date.
+    order_data = {**order_data, "invoice_date": order_data.get("invoice_date") or datetime.now().strftime("%Y-%m-%d")}
+    return render_cache.default_cache().materialize(
+        'pdf', order_data, lambda path: _render_order_pdf(order_data, path), output_pdf_path)
+
+
+def _render_order_pdf(order_data, output_pdf_path):
 
     c = canvas.Canvas(output_pdf_path, pagesize=letter)
     width, height = letter
@@ -81,20 +101,19 @@ def generate_order_pdf(order_data, output_pdf_path):
         c.drawString(0.75 * inch, line_y, cust_other.strip())
         line_y -= 14
 
-    # --- Invoice number & current date/time at top-right ---
+    # --- Invoice number & invoice date (or current date/time) at top-right ---
     c.setFont("Helvetica", 10)
     invoice_num = order_data.get("invoice_number", "INV-XXXX")
     c.drawRightString(width - 0.75 * inch, bill_top, f"Invoice#: {invoice_num}")
-    current_dt = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    c.drawRightString(width - 0.75 * inch, bill_top - 14, f"Date: {current_dt}")
+    invoice_date = order_data.get("invoice_date") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    c.drawRightString(width - 0.75 * inch, bill_top - 14, f"Date: {invoice_date}")
 
-    # --- Bill Calculation ---
-    total_adults = order_data.get("adults", 0)
-    total_kids = order_data.get("kids", 0)
-    adult_price = order_data.get("adult_price", 0.0)
-    kid_price = order_data.get("kid_price", 0.0)
-    calculated_total = (total_adults * adult_price) + (total_kids * kid_price)
-    gst_amount = calculated_total * 0.1  # 10% GST
+    # --- Bill Calculation (same cent arithmetic as the stored invoice totals) ---
+    total_adults = int(order_data.get("adults") or 0)
+    total_kids = int(order_data.get("kids") or 0)
+    adult_price = pricing.parse_price(order_data.get("adult_price", 0))
+    kid_price = pricing.parse_price(order_data.get("kid_price", 0))
+    calculated_total, gst_amount = pricing.order_totals(total_adults, total_kids, adult_price, kid_price)
 
     # --- Items table ---
     table_top = bill_top - 60
@@ -148,7 +167,7 @@ if __name__ == "__main__":
         "customer_name": "john doe",
         "customer_phone": "0400 123 456",
         "invoice_number": "INV-01234",
-        "date": "2025-03-31",  # Not used in header; current datetime is used instead.
+        "date": "2025-03-31",  # Not used in header; invoice_date (default: today) is.
         "adults": 3,
         "kids": 2,
         "adult_price": 50.0,
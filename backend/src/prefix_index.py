@@ -0,0 +1,130 @@
+"""
+In-memory prefix index for typeahead lookups.
+
+Names are normalized (accents stripped, case folded, whitespace collapsed)
+and kept in sorted lists, so a lookup is a bisect to the first key with the
+query as prefix followed by a short forward scan. Every word of a name is
+indexed, so "smi" finds "John Smith"; matches on the start of the name rank
+first, then word matches, each in alphabetical order.
+
+attach() keeps the index in step with a JournalStore: writes made in this
+process are applied incrementally, and if the store changed in a way the
+index did not see (another worker wrote to the files) the next lookup
+rebuilds it.
+"""
+import bisect
+import threading
+import unicodedata
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', str(text or ''))
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+class PrefixIndex:
+    def __init__(self, field='name', summary_fields=('id', 'name')):
+        self.field = field
+        self.summary_fields = summary_fields
+        self._lock = threading.RLock()
+        self._starts = []   # (normalized name, id)
+        self._words = []    # (name from its second word on, id)
+        self._entries = {}  # id -> (start key, word keys, summary)
+        self._generation = None
+        self._store = None
+
+    def _keys(self, record):
+        name = normalize(record.get(self.field))
+        words = name.split(' ')
+        return name, [' '.join(words[i:]) for i in range(1, len(words))]
+
+    def _add(self, record):
+        record_id = str(record['id'])
+        start, words = self._keys(record)
+        summary = {field: record.get(field) for field in self.summary_fields}
+        self._entries[record_id] = (start, words, summary)
+        bisect.insort(self._starts, (start, record_id))
+        for word in words:
+            bisect.insort(self._words, (word, record_id))
+
+    def _discard(self, record_id):
+        entry = self._entries.pop(str(record_id), None)
+        if entry is None:
+            return
+        start, words, _ = entry
+        for keys, key in [(self._starts, start)] + [(self._words, word) for word in words]:
+            i = bisect.bisect_left(keys, (key, str(record_id)))
+            if i < len(keys) and keys[i] == (key, str(record_id)):
+                del keys[i]
+
+    def rebuild(self, records):
+        with self._lock:
+            self._entries = {}
+            self._starts = []
+            self._words = []
+            for record in records:
+                if record.get('id') is not None:
+                    self._add(record)
+
+    def put(self, record):
+        with self._lock:
+            self._discard(record['id'])
+            self._add(record)
+
+    def remove(self, record_id):
+        with self._lock:
+            self._discard(record_id)
+
+    # --- Keeping up with a store ---
+    def attach(self, store):
+        self._store = store
+        store.subscribe(self._on_store_write)
+
+    def _on_store_write(self, op, value):
+        with self._lock:
+            # Apply only if the index was current just before this write.
+            if self._generation is None or self._generation != self._store.generation - 1:
+                self._generation = None
+                return
+            if op == 'put':
+                self.put(value)
+            else:
+                self.remove(value)
+            self._generation += 1
+
+    def _ensure_current(self):
+        if self._store is None:
+            return
+        with self._lock:
+            generation = self._store.generation
+            if generation != self._generation:
+                self.rebuild(self._store.all())
+                self._generation = generation
+
+    # --- Lookups ---
+    def _scan(self, keys, prefix, seen, out, limit):
+        i = bisect.bisect_left(keys, (prefix, ''))
+        while i < len(keys) and len(out) < limit:
+            key, record_id = keys[i]
+            if not key.startswith(prefix):
+                break
+            if record_id not in seen:
+                seen.add(record_id)
+                out.append(self._entries[record_id][2])
+            i += 1
+
+    def suggest(self, query, limit=10):
+        """Up to limit summaries whose name (or a word in it) starts with query."""
+        self._ensure_current()
+        prefix = normalize(query)
+        with self._lock:
+            seen, out = set(), []
+            self._scan(self._starts, prefix, seen, out, limit)
+            if prefix:
+                self._scan(self._words, prefix, seen, out, limit)
+            return [dict(summary) for summary in out]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,178 @@
+"""
+Customer pricing and invoice totals.
+
+Customer records keep their prices as whatever the form sent ("43", 43,
+"43.50"), so they are parsed once into a PriceTable of Decimals and cached
+per customer. The cache follows the customer store: an edit or delete drops
+that customer's entry, and a change made by another process clears it all.
+
+Totals are computed in whole cents for a whole batch at once: the batch is
+grouped by customer and service type, each group's unit prices are looked up
+once, and the arithmetic runs over plain integer columns. Prices include
+GST; the GST figure is 10% of the total. order_totals() does the same sum
+for a single order, for the PDF invoice and the Qt app, so what is printed
+always matches the stored final_total / gst_breakdown.
+"""
+import threading
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+try:
+    from . import database
+except ImportError:  # imported top-level by the Qt app
+    import database
+
+GST_RATE = Decimal('0.10')
+CENT = Decimal('0.01')
+
+PriceTable = namedtuple('PriceTable', 'lunch dinner kids')
+Totals = namedtuple('Totals', 'total gst')
+
+
+def parse_price(value):
+    """A price as a Decimal rounded to cents; blank or invalid values are 0."""
+    try:
+        price = Decimal(str(value).strip() or '0')
+    except (InvalidOperation, ValueError):
+        return Decimal('0.00')
+    if not price.is_finite() or price < 0:
+        return Decimal('0.00')
+    return price.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def price_table(customer):
+    return PriceTable(
+        lunch=parse_price(customer.get('price_lunch')),
+        dinner=parse_price(customer.get('price_dinner')),
+        kids=parse_price(customer.get('price_kids')),
+    )
+
+
+def _cents(amount):
+    return int(amount * 100)
+
+
+def _to_decimal(cents):
+    return (Decimal(cents) / 100).quantize(CENT)
+
+
+def _gst_cents(total_cents):
+    return int((Decimal(total_cents) * GST_RATE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def unit_prices(table, service_type):
+    """(adult, kid) unit prices from a PriceTable for a service type."""
+    adult = table.dinner if str(service_type).lower() == 'dinner' else table.lunch
+    return adult, table.kids
+
+
+def order_totals(adults, kids, adult_price, kid_price):
+    """Totals(total, gst) for one order, with the same cent arithmetic as PricingCache.totals."""
+    total = int(adults or 0) * _cents(parse_price(adult_price)) + int(kids or 0) * _cents(parse_price(kid_price))
+    return Totals(_to_decimal(total), _to_decimal(_gst_cents(total)))
+
+
+class PricingCache:
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._generation = None
+        store.subscribe(self._on_customer_write)
+
+    def _on_customer_write(self, op, value):
+        record_id = str(value['id'] if op == 'put' else value)
+        with self._lock:
+            self._tables.pop(record_id, None)
+            if self._generation is not None:
+                self._generation += 1
+
+    def _check_generation(self):
+        generation = self._store.generation
+        with self._lock:
+            if generation != self._generation:
+                # Another process edited customers; we can't tell which.
+                self._tables.clear()
+                self._generation = generation
+
+    def prices_for(self, customer_id):
+        """PriceTable for a customer, or None if the customer does not exist."""
+        self._check_generation()
+        customer_id = str(customer_id)
+        with self._lock:
+            table = self._tables.get(customer_id)
+            generation = self._generation
+        if table is not None:
+            return table
+        customer = self._store.get(customer_id)
+        if customer is None:
+            return None
+        table = price_table(customer)
+        with self._lock:
+            # A write between the read and now may have made this table stale; don't keep it.
+            if self._generation == generation:
+                self._tables[customer_id] = table
+        return table
+
+    def unit_prices(self, customer_id, service_type):
+        """(adult, kid) unit prices for a service, zeros for unknown customers."""
+        table = self.prices_for(customer_id)
+        if table is None:
+            return Decimal('0.00'), Decimal('0.00')
+        return unit_prices(table, service_type)
+
+    def totals(self, orders):
+        """
+        Totals(total, gst) as Decimals for each order dict (customer_id,
+        service_type, adults, kids), in the same order as given.
+        """
+        orders = list(orders)
+        group_of = [(str(o['customer_id']), str(o['service_type']).lower() == 'dinner') for o in orders]
+        prices = {}
+        for key in set(group_of):
+            adult, kid = self.unit_prices(key[0], 'dinner' if key[1] else 'lunch')
+            prices[key] = (_cents(adult), _cents(kid))
+
+        adult_cents = [prices[key][0] for key in group_of]
+        kid_cents = [prices[key][1] for key in group_of]
+        adults = [int(o.get('adults') or 0) for o in orders]
+        kids = [int(o.get('kids') or 0) for o in orders]
+        total_cents = [a * ap + k * kp for a, ap, k, kp in zip(adults, adult_cents, kids, kid_cents)]
+        return [Totals(_to_decimal(t), _to_decimal(_gst_cents(t))) for t in total_cents]
+
+
+def recalculate_invoices(cache, date_from=None, date_to=None, chunk_size=500):
+    """
+    Rewrite final_total and gst_breakdown for every invoice whose order falls
+    in the date range, one chunk (and one transaction) at a time. Returns the
+    number of invoices updated.
+    """
+    sql = ("SELECT i.id AS invoice_id, o.customer_id, o.service_type, o.adults, o.kids "
+           "FROM invoices i JOIN orders o ON o.id = i.order_id WHERE i.id > ?")
+    params = []
+    if date_from:
+        sql += " AND o.order_date >= ?"
+        params.append(date_from)
+    if date_to:
+        sql += " AND o.order_date <= ?"
+        params.append(date_to)
+    sql += " ORDER BY i.id LIMIT ?"
+
+    conn = database.get_connection()
+    updated, last_id = 0, 0
+    try:
+        while True:
+            rows = conn.execute(sql, [last_id, *params, chunk_size]).fetchall()
+            if not rows:
+                break
+            totals = cache.totals(dict(row) for row in rows)
+            conn.executemany(
+                "UPDATE invoices SET final_total = ?, gst_breakdown = ? WHERE id = ?",
+                [(float(t.total), float(t.gst), row['invoice_id']) for row, t in zip(rows, totals)]
+            )
+            conn.commit()
+            updated += len(rows)
+            last_id = rows[-1]['invoice_id']
+    finally:
+        conn.close()
+    return updated
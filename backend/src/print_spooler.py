@@ -0,0 +1,431 @@
+"""
+Print spooler for kitchen dockets.
+
+Orders to print are queued in print_jobs. A worker thread claims the pending
+jobs of one service window (order date + service type) at a time, earliest
+date and arrival time first, and prints them as one combined document: a
+summary page with the window's course totals, then one docket per order in
+arrival order. Dockets are plain text with form feeds between pages, which
+every CUPS queue prints as is.
+
+The document goes to a sink: LpSink hands it to the lp command, FileSink
+copies it into a folder (for tests, or printers fed from a shared folder).
+Claims happen under BEGIN IMMEDIATE, so several worker processes can run
+spoolers against the same queue; a batch that fails is retried up to
+MAX_ATTEMPTS times, and one left "printing" by a dead worker is requeued
+after STALE_SECONDS.
+
+print_batches keeps a row per batch, from which metrics() reports queue
+depth, waiting time and throughput.
+"""
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+from . import database
+
+MAX_ATTEMPTS = 3
+STALE_SECONDS = 300
+DEFAULT_MAX_BATCH = 50
+COURSES = (('entree', 'ENTREE'), ('mains', 'MAINS'), ('desserts', 'DESSERTS'), ('other', 'OTHER'))
+CATEGORY_PREFIXES = {'ENTR': 'entree', 'MAIN': 'mains', 'DESS': 'desserts'}
+DOCKET_WIDTH = 42
+
+
+def init_print_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS print_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            service_date TEXT NOT NULL,
+            service_type TEXT NOT NULL,
+            arrival_time TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            batch_id INTEGER,
+            error TEXT,
+            created_at REAL NOT NULL,
+            printed_at REAL
+        )
+    ''')
+    # An order is queued at most once until it has printed (or failed).
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_print_jobs_active ON print_jobs(order_id) "
+                   "WHERE status IN ('pending', 'printing')")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_print_jobs_queue "
+                   "ON print_jobs(status, service_date, arrival_time)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS print_batches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            service_date TEXT NOT NULL,
+            service_type TEXT NOT NULL,
+            job_count INTEGER NOT NULL DEFAULT 0,
+            sink TEXT,
+            document_path TEXT,
+            status TEXT NOT NULL DEFAULT 'printing',
+            error TEXT,
+            started_at REAL NOT NULL,
+            finished_at REAL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_print_batches_started_at ON print_batches(started_at)")
+
+
+# --- Queueing ---
+def enqueue(order_ids):
+    """Queue dockets for the given orders. Returns how many were newly queued."""
+    ids = sorted({int(i) for i in order_ids})
+    queued = 0
+    conn = database.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for start in range(0, len(ids), database.IN_CHUNK_SIZE):
+            chunk = ids[start:start + database.IN_CHUNK_SIZE]
+            queued += conn.execute(f'''
+                INSERT OR IGNORE INTO print_jobs (order_id, service_date, service_type, arrival_time, created_at)
+                SELECT id, order_date, service_type, arrival_time, ? FROM orders
+                WHERE id IN ({', '.join('?' * len(chunk))})
+            ''', [time.time(), *chunk]).rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return queued
+
+
+def window_order_ids(service_date, service_type=None):
+    """Ids of the orders in a service window (every service that day if service_type is None)."""
+    sql, params = "SELECT id FROM orders WHERE order_date = ?", [service_date]
+    if service_type:
+        sql += " AND lower(service_type) = lower(?)"
+        params.append(service_type)
+    conn = database.get_connection()
+    try:
+        return [row['id'] for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def _requeue_stale(conn, now):
+    stale = "SELECT id FROM print_batches WHERE status = 'printing' AND started_at < ?"
+    conn.execute(f"UPDATE print_jobs SET status = 'pending', batch_id = NULL "
+                 f"WHERE status = 'printing' AND batch_id IN ({stale})", (now - STALE_SECONDS,))
+    conn.execute("UPDATE print_batches SET status = 'abandoned', finished_at = ? "
+                 "WHERE status = 'printing' AND started_at < ?", (now, now - STALE_SECONDS))
+
+
+def claim_batch(sink_name, max_jobs=DEFAULT_MAX_BATCH):
+    """
+    Claim the pending jobs of the most urgent service window. Returns
+    (batch_id, service_date, service_type, order rows) or None if the queue is empty.
+    """
+    now = time.time()
+    conn = database.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        _requeue_stale(conn, now)
+        head = conn.execute('''
+            SELECT service_date, service_type FROM print_jobs WHERE status = 'pending'
+            ORDER BY service_date, arrival_time, id LIMIT 1
+        ''').fetchone()
+        if head is None:
+            conn.commit()
+            return None
+        service_date, service_type = head['service_date'], head['service_type']
+        job_ids = [row['id'] for row in conn.execute('''
+            SELECT id FROM print_jobs
+            WHERE status = 'pending' AND service_date = ? AND service_type = ?
+            ORDER BY arrival_time, id LIMIT ?
+        ''', (service_date, service_type, max_jobs))]
+        batch_id = conn.execute(
+            "INSERT INTO print_batches (service_date, service_type, job_count, sink, started_at) VALUES (?, ?, ?, ?, ?)",
+            (service_date, service_type, len(job_ids), sink_name, now)
+        ).lastrowid
+        placeholders = ', '.join('?' * len(job_ids))
+        conn.execute(f"UPDATE print_jobs SET status = 'printing', batch_id = ?, attempts = attempts + 1 "
+                     f"WHERE id IN ({placeholders})", [batch_id, *job_ids])
+        orders = [dict(row) for row in conn.execute(f'''
+            SELECT o.*, i.invoice_number FROM print_jobs j
+            JOIN orders o ON o.id = j.order_id
+            LEFT JOIN invoices i ON i.order_id = o.id
+            WHERE j.id IN ({placeholders})
+            ORDER BY j.arrival_time, j.id
+        ''', job_ids)]
+        conn.commit()
+    finally:
+        conn.close()
+    return batch_id, service_date, service_type, orders
+
+
+def finish_batch(batch_id, document_path=None, error=None):
+    """Mark a claimed batch printed, or put its jobs back in the queue after a failure."""
+    now = time.time()
+    conn = database.get_connection()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if error is None:
+            conn.execute("UPDATE print_jobs SET status = 'printed', printed_at = ?, error = NULL "
+                         "WHERE batch_id = ? AND status = 'printing'", (now, batch_id))
+            conn.execute("UPDATE print_batches SET status = 'printed', document_path = ?, finished_at = ? "
+                         "WHERE id = ?", (document_path, now, batch_id))
+        else:
+            conn.execute(f'''
+                UPDATE print_jobs
+                SET status = CASE WHEN attempts >= {MAX_ATTEMPTS} THEN 'failed' ELSE 'pending' END,
+                    batch_id = NULL, error = ?
+                WHERE batch_id = ? AND status = 'printing'
+            ''', (error, batch_id))
+            conn.execute("UPDATE print_batches SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                         (error, now, batch_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# --- Rendering ---
+def order_lines(order_data):
+    """(name, quantity, comment) for each item of an order's order_data, skipping zero quantities."""
+    if isinstance(order_data, str):
+        try:
+            order_data = json.loads(order_data or '{}')
+        except json.JSONDecodeError:
+            return []
+    if isinstance(order_data, dict):
+        entries = []
+        for name, value in order_data.items():
+            if isinstance(value, dict):
+                entries.append((name, value.get('quantity', value.get('qty')), value.get('comment') or ''))
+            else:
+                entries.append((name, value, ''))
+    elif isinstance(order_data, list):
+        entries = [(e[0], e[1] if len(e) > 1 else 1, e[2] if len(e) > 2 else '')
+                   for e in order_data if isinstance(e, (list, tuple)) and e]
+    else:
+        return []
+    lines = []
+    for name, quantity, comment in entries:
+        try:
+            quantity = int(quantity or 0)
+        except (TypeError, ValueError):
+            continue
+        if quantity > 0:
+            lines.append((str(name), quantity, str(comment).strip()))
+    return lines
+
+
+def course_of(category):
+    category = (category or '').upper()
+    for prefix, course in CATEGORY_PREFIXES.items():
+        if category.startswith(prefix):
+            return course
+    return 'other'
+
+
+def render_batch(service_date, service_type, orders, customer_name, categories):
+    """The combined docket text for one batch: a summary page, then one page per order."""
+    rule = '=' * DOCKET_WIDTH
+    totals = {course: {} for course, _ in COURSES}
+    dockets = []
+    for order in orders:
+        courses = {course: [] for course, _ in COURSES}
+        for name, quantity, comment in order_lines(order.get('order_data')):
+            course = course_of(categories.get(name))
+            courses[course].append((name, quantity, comment))
+            totals[course][name] = totals[course].get(name, 0) + quantity
+        page = [
+            rule,
+            f"{order.get('arrival_time') or '--:--'}  {service_type.upper()}  {service_date}",
+            f"{customer_name(order['customer_id']) or 'Unknown customer'}",
+            f"Order {order.get('order_number')}  {order.get('invoice_number') or ''}".rstrip(),
+            f"Pax: {order.get('adults') or 0} adults + {order.get('kids') or 0} kids",
+            rule,
+        ]
+        for course, label in COURSES:
+            if courses[course]:
+                page.append(label)
+                for name, quantity, comment in courses[course]:
+                    page.append(f"  {quantity:>3}  {name}" + (f" ({comment})" if comment else ''))
+        dockets.append('\n'.join(page))
+
+    summary = [rule, f"{service_type.upper()} {service_date}: {len(orders)} orders, "
+               f"{sum(int(o.get('adults') or 0) + int(o.get('kids') or 0) for o in orders)} pax", rule]
+    for order in orders:
+        summary.append(f"{order.get('arrival_time') or '--:--'}  {order.get('order_number')}  "
+                       f"{customer_name(order['customer_id']) or 'Unknown customer'}")
+    for course, label in COURSES:
+        if totals[course]:
+            summary.append('')
+            summary.append(f"{label} TOTALS")
+            for name, quantity in sorted(totals[course].items()):
+                summary.append(f"  {quantity:>3}  {name}")
+    return '\f'.join(['\n'.join(summary)] + dockets) + '\n'
+
+
+# --- Sinks ---
+class FileSink:
+    """Copies each batch document into a folder."""
+    name = 'file'
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def send(self, path, title):
+        os.makedirs(self.directory, exist_ok=True)
+        destination = os.path.join(self.directory, os.path.basename(path))
+        shutil.copyfile(path, destination)
+        return destination
+
+
+class LpSink:
+    """Submits each batch document to CUPS with lp."""
+    name = 'lp'
+
+    def __init__(self, printer=None, command='lp'):
+        self.printer = printer
+        self.command = command
+
+    def send(self, path, title):
+        args = [self.command]
+        if self.printer:
+            args += ['-d', self.printer]
+        args += ['-t', title, path]
+        try:
+            subprocess.run(args, check=True, capture_output=True, text=True, timeout=60)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"lp failed: {(e.stderr or e.stdout or '').strip()}") from e
+        return path
+
+
+def sink_from_env():
+    """PRINT_SINK=lp|file (default lp when available), PRINT_PRINTER and PRINT_OUTPUT_DIR."""
+    kind = os.environ.get('PRINT_SINK') or ('lp' if shutil.which('lp') else 'file')
+    if kind == 'lp':
+        return LpSink(os.environ.get('PRINT_PRINTER'))
+    return FileSink(os.environ.get('PRINT_OUTPUT_DIR', 'printed_dockets'))
+
+
+# --- Worker ---
+class PrintSpooler:
+    def __init__(self, sink, customer_name, menu_categories, spool_dir='print_spool',
+                 max_batch=DEFAULT_MAX_BATCH, poll_interval=2.0):
+        """
+        customer_name(customer_id) returns a name for the dockets and
+        menu_categories() a {menu item name: category} dict.
+        """
+        self.sink = sink
+        self.customer_name = customer_name
+        self.menu_categories = menu_categories
+        self.spool_dir = spool_dir
+        self.max_batch = max_batch
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        """Print one batch. Returns the number of dockets printed (0 if the queue was empty or it failed)."""
+        claimed = claim_batch(self.sink.name, self.max_batch)
+        if claimed is None:
+            return 0
+        batch_id, service_date, service_type, orders = claimed
+        try:
+            text = render_batch(service_date, service_type, orders, self.customer_name, self.menu_categories())
+            os.makedirs(self.spool_dir, exist_ok=True)
+            path = os.path.join(self.spool_dir, f"batch-{batch_id:06d}-{service_date}-{service_type.lower()}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            document = self.sink.send(path, f"{service_type} {service_date} ({len(orders)} dockets)")
+        except Exception as e:
+            finish_batch(batch_id, error=str(e) or type(e).__name__)
+            print(f"Print batch {batch_id} failed:", e)
+            return 0
+        finish_batch(batch_id, document)
+        return len(orders)
+
+    def drain(self):
+        """Print batches until the queue is empty or a batch fails. Returns the dockets printed."""
+        printed = 0
+        while True:
+            count = self.run_once()
+            if not count:
+                return printed
+            printed += count
+
+    def wake(self):
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.drain()
+                except Exception as e:
+                    print("Print spooler error:", e)
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=loop, name='print-spooler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# --- Reporting ---
+def list_jobs(status=None, limit=100):
+    sql = "SELECT * FROM print_jobs"
+    params = []
+    if status:
+        sql += " WHERE status = ?"
+        params.append(status)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    conn = database.get_connection()
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def metrics(window_seconds=3600):
+    """Queue depth by status plus wait times and throughput over the last window_seconds."""
+    since = time.time() - window_seconds
+    conn = database.get_connection()
+    try:
+        queue = {row['status']: row['n'] for row in
+                 conn.execute("SELECT status, COUNT(*) AS n FROM print_jobs GROUP BY status")}
+        waits = sorted(row[0] for row in conn.execute(
+            "SELECT printed_at - created_at FROM print_jobs WHERE status = 'printed' AND printed_at >= ?", (since,)))
+        batches = conn.execute('''
+            SELECT COUNT(*) AS batches,
+                   SUM(status = 'failed') AS failed,
+                   AVG(CASE WHEN status = 'printed' THEN job_count END) AS avg_jobs,
+                   AVG(CASE WHEN status = 'printed' THEN finished_at - started_at END) AS avg_seconds
+            FROM print_batches WHERE started_at >= ?
+        ''', (since,)).fetchone()
+    finally:
+        conn.close()
+
+    def percentile(p):
+        return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3) if waits else None
+
+    return {
+        'queue': {status: queue.get(status, 0) for status in ('pending', 'printing', 'printed', 'failed')},
+        'window_seconds': window_seconds,
+        'dockets_printed': len(waits),
+        'dockets_per_minute': round(len(waits) / (window_seconds / 60), 2),
+        'wait_seconds': {'p50': percentile(0.5), 'p95': percentile(0.95)},
+        'batches': batches['batches'],
+        'failed_batches': batches['failed'] or 0,
+        'avg_dockets_per_batch': round(batches['avg_jobs'], 2) if batches['avg_jobs'] is not None else None,
+        'avg_batch_seconds': round(batches['avg_seconds'], 3) if batches['avg_seconds'] is not None else None,
+    }
@@ -0,0 +1,130 @@
+"""
+On-disk cache of rendered order documents (DOCX / PDF).
+
+An artifact is stored under the SHA-256 of its kind, the kind's template
+version and the canonical JSON of the order payload, so rendering the same
+order again is a file lookup, and any change to the content (or a template
+bump) renders a new file. Renders are written to a temporary file and moved
+into place, so a half-written document is never served.
+
+The cache is bounded by size: every hit refreshes the file's mtime, and
+after each new render the least recently used files are removed until the
+total is back under the limit.
+
+Callers usually want the document under its conventional name in some
+output folder; materialize() links (or copies) the cached artifact there and
+only replaces an existing file when its content differs.
+"""
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+# Bump a version whenever its generator's layout changes, so cached files are re-rendered.
+TEMPLATE_VERSIONS = {'docx': 2, 'pdf': 3}
+
+DEFAULT_DIR = os.environ.get('RENDER_CACHE_DIR', 'render_cache')
+DEFAULT_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_MB', '256')) * 1024 * 1024
+_LOCK_STRIPES = 32
+
+
+def content_hash(kind, payload):
+    canonical = json.dumps(
+        {'kind': kind, 'template': TEMPLATE_VERSIONS.get(kind, 0), 'payload': payload},
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _temporary_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+class RenderCache:
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Striped locks so two threads never render the same document at once.
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._evict_lock = threading.Lock()
+
+    def render(self, kind, payload, render, suffix):
+        """
+        Path of the cached artifact for payload, calling render(path) to
+        create it on a miss.
+        """
+        key = content_hash(kind, payload)
+        path = os.path.join(self.directory, key + suffix)
+        with self._locks[int(key[:8], 16) % _LOCK_STRIPES]:
+            try:
+                os.utime(path)
+                self.hits += 1
+                return path
+            except FileNotFoundError:
+                pass
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = _temporary_path(path)
+            try:
+                render(tmp)
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            self.misses += 1
+        self._evict(keep=path)
+        return path
+
+    def materialize(self, kind, payload, render, target):
+        """Put the rendered document at target, re-rendering only if the content changed."""
+        source = self.render(kind, payload, render, os.path.splitext(target)[1])
+        if os.path.exists(target):
+            if os.path.samefile(source, target) or filecmp.cmp(source, target, shallow=False):
+                return target
+            print(f"Replacing {target}: the order's content changed.")
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        tmp = _temporary_path(target)
+        try:
+            try:
+                os.link(source, tmp)
+            except OSError:
+                shutil.copyfile(source, tmp)
+            os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return target
+
+    def _evict(self, keep):
+        with self._evict_lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RenderCache()
+        return _default
@@ -0,0 +1,210 @@
+"""
+Revenue and GST reporting.
+
+Invoice totals (final_total / gst_breakdown) are filled when an invoice is
+created, and triggers fold them into revenue_rollups: one row per period
+('week' starting Monday, 'month'), customer and service type with order,
+pax, total and GST counts in integer cents. Changing an invoice's totals or
+an order's date, customer, service or pax moves the amounts between rollup
+rows, so the rollups never need rebuilding.
+
+A report over [from, to] reads whole months inside the range from the month
+rollups, whole weeks in the leftover edges from the week rollups, and scans
+invoices only for the few remaining days at either end.
+"""
+from datetime import timedelta
+
+from . import database
+
+PERIODS = {
+    'week': "date({o}.order_date, 'weekday 0', '-6 days')",
+    'month': "strftime('%Y-%m-01', {o}.order_date)",
+}
+
+
+def _rollup_sql(order, invoice, sign, source):
+    """
+    Statements adding (sign=1) or removing (sign=-1) invoices from both
+    rollups. source is the FROM ... WHERE clause binding the order and invoice.
+    """
+    statements = []
+    for period, start in PERIODS.items():
+        statements.append(f'''
+            INSERT INTO revenue_rollups (period, period_start, customer_id, service_type,
+                                         orders, adults, kids, total_cents, gst_cents)
+            SELECT '{period}', {start.format(o=order)}, {order}.customer_id, {order}.service_type,
+                   {sign}, {sign} * {order}.adults, {sign} * {order}.kids,
+                   {sign} * CAST(ROUND(COALESCE({invoice}.final_total, 0) * 100) AS INTEGER),
+                   {sign} * CAST(ROUND(COALESCE({invoice}.gst_breakdown, 0) * 100) AS INTEGER)
+            {source} AND {start.format(o=order)} IS NOT NULL
+            ON CONFLICT (period, period_start, customer_id, service_type) DO UPDATE SET
+                orders = orders + excluded.orders,
+                adults = adults + excluded.adults,
+                kids = kids + excluded.kids,
+                total_cents = total_cents + excluded.total_cents,
+                gst_cents = gst_cents + excluded.gst_cents;
+        ''')
+    return '\n'.join(statements)
+
+
+def init_report_schema(cursor):
+    exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'revenue_rollups'").fetchone()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS revenue_rollups (
+            period TEXT NOT NULL,
+            period_start TEXT NOT NULL,
+            customer_id TEXT NOT NULL,
+            service_type TEXT NOT NULL,
+            orders INTEGER NOT NULL DEFAULT 0,
+            adults INTEGER NOT NULL DEFAULT 0,
+            kids INTEGER NOT NULL DEFAULT 0,
+            total_cents INTEGER NOT NULL DEFAULT 0,
+            gst_cents INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, period_start, customer_id, service_type)
+        )
+    ''')
+
+    # Invoices carry the money, orders carry the date / customer / service / pax.
+    old_invoice = _rollup_sql('o', 'OLD', -1, "FROM orders o WHERE o.id = OLD.order_id")
+    new_invoice = _rollup_sql('o', 'NEW', 1, "FROM orders o WHERE o.id = NEW.order_id")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS invoices_rollup_insert AFTER INSERT ON invoices "
+                   f"BEGIN {new_invoice} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS invoices_rollup_update "
+                   f"AFTER UPDATE OF order_id, final_total, gst_breakdown ON invoices "
+                   f"BEGIN {old_invoice} {new_invoice} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS invoices_rollup_delete AFTER DELETE ON invoices "
+                   f"BEGIN {old_invoice} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS orders_rollup_update "
+                   f"AFTER UPDATE OF customer_id, service_type, adults, kids, order_date ON orders BEGIN "
+                   f"{_rollup_sql('OLD', 'i', -1, 'FROM invoices i WHERE i.order_id = OLD.id')} "
+                   f"{_rollup_sql('NEW', 'i', 1, 'FROM invoices i WHERE i.order_id = NEW.id')} END")
+    if not exists:
+        rebuild_rollups(cursor)
+
+
+def rebuild_rollups(cursor):
+    """Recompute every rollup row from the invoices (used once when the table is created)."""
+    cursor.execute("DELETE FROM revenue_rollups")
+    for period, start in PERIODS.items():
+        cursor.execute(f'''
+            INSERT INTO revenue_rollups (period, period_start, customer_id, service_type,
+                                         orders, adults, kids, total_cents, gst_cents)
+            SELECT '{period}', {start.format(o='o')}, o.customer_id, o.service_type,
+                   COUNT(*), SUM(o.adults), SUM(o.kids),
+                   SUM(CAST(ROUND(COALESCE(i.final_total, 0) * 100) AS INTEGER)),
+                   SUM(CAST(ROUND(COALESCE(i.gst_breakdown, 0) * 100) AS INTEGER))
+            FROM invoices i JOIN orders o ON o.id = i.order_id
+            WHERE {start.format(o='o')} IS NOT NULL
+            GROUP BY 2, o.customer_id, o.service_type
+        ''')
+
+
+# --- Planning a range ---
+def _first_of_next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def plan(start, end):
+    """
+    Split [start, end] into (months, weeks, days): month and week start dates
+    to read from rollups, and (first, last) day ranges to scan.
+    """
+    months, weeks, days = [], [], []
+    first_month = start if start.day == 1 else _first_of_next_month(start)
+    month = first_month
+    while _first_of_next_month(month) - timedelta(days=1) <= end:
+        months.append(month)
+        month = _first_of_next_month(month)
+
+    if months:
+        edges = [(start, months[0] - timedelta(days=1)), (month, end)]
+    else:
+        edges = [(start, end)]
+    for edge_start, edge_end in edges:
+        if edge_start > edge_end:
+            continue
+        week = edge_start + timedelta(days=(7 - edge_start.weekday()) % 7)
+        edge_weeks = []
+        while week + timedelta(days=6) <= edge_end:
+            edge_weeks.append(week)
+            week += timedelta(days=7)
+        if edge_weeks:
+            weeks.extend(edge_weeks)
+            days.append((edge_start, edge_weeks[0] - timedelta(days=1)))
+            days.append((edge_weeks[-1] + timedelta(days=7), edge_end))
+        else:
+            days.append((edge_start, edge_end))
+    return months, weeks, [(a, b) for a, b in days if a <= b]
+
+
+# --- Querying ---
+def _in_chunks(values, size=database.IN_CHUNK_SIZE):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def revenue(start, end, customer_id=None):
+    """
+    Revenue for order dates in [start, end] (datetime.date), totalled and
+    broken down per customer and service type. Amounts are in dollars.
+    """
+    months, weeks, days = plan(start, end)
+    groups = {}
+
+    def add(rows):
+        for row in rows:
+            key = (row['customer_id'], row['service_type'])
+            g = groups.setdefault(key, [0, 0, 0, 0, 0])
+            for i, column in enumerate(('orders', 'adults', 'kids', 'total_cents', 'gst_cents')):
+                g[i] += row[column] or 0
+
+    rollup_filter = " AND customer_id = ?" if customer_id else ""
+    scan_filter = " AND o.customer_id = ?" if customer_id else ""
+    customer_params = [str(customer_id)] if customer_id else []
+    conn = database.get_connection()
+    try:
+        conn.execute("BEGIN")
+        for period, starts in (('month', months), ('week', weeks)):
+            for chunk in _in_chunks([d.isoformat() for d in starts]):
+                add(conn.execute(f'''
+                    SELECT customer_id, service_type, SUM(orders) AS orders, SUM(adults) AS adults,
+                           SUM(kids) AS kids, SUM(total_cents) AS total_cents, SUM(gst_cents) AS gst_cents
+                    FROM revenue_rollups
+                    WHERE period = ? AND period_start IN ({', '.join('?' * len(chunk))}){rollup_filter}
+                    GROUP BY customer_id, service_type
+                ''', [period, *chunk, *customer_params]))
+        for first, last in days:
+            add(conn.execute(f'''
+                SELECT o.customer_id, o.service_type, COUNT(*) AS orders, SUM(o.adults) AS adults,
+                       SUM(o.kids) AS kids,
+                       SUM(CAST(ROUND(COALESCE(i.final_total, 0) * 100) AS INTEGER)) AS total_cents,
+                       SUM(CAST(ROUND(COALESCE(i.gst_breakdown, 0) * 100) AS INTEGER)) AS gst_cents
+                FROM invoices i JOIN orders o ON o.id = i.order_id
+                WHERE o.order_date BETWEEN ? AND ?{scan_filter}
+                GROUP BY o.customer_id, o.service_type
+            ''', [first.isoformat(), last.isoformat(), *customer_params]))
+        conn.commit()
+    finally:
+        conn.close()
+
+    def money(cents):
+        return round(cents / 100, 2)
+
+    breakdown, totals = [], [0, 0, 0, 0, 0]
+    for (cid, service_type), g in sorted(groups.items()):
+        if not g[0]:
+            continue
+        totals = [a + b for a, b in zip(totals, g)]
+        breakdown.append({
+            'customer_id': cid, 'service_type': service_type, 'orders': g[0], 'adults': g[1],
+            'kids': g[2], 'total': money(g[3]), 'gst': money(g[4]),
+        })
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'totals': {'orders': totals[0], 'adults': totals[1], 'kids': totals[2],
+                   'total': money(totals[3]), 'gst': money(totals[4])},
+        'breakdown': breakdown,
+        'sources': {'month_rollups': len(months), 'week_rollups': len(weeks),
+                    'scanned_days': sum((b - a).days + 1 for a, b in days)},
+    }
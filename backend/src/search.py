@@ -0,0 +1,219 @@
+"""
+Full-text search over orders, customers and menu items (SQLite FTS5).
+
+orders_fts is kept in step with the orders table by triggers and indexes the
+order number, service type, customer name and the item names and comments
+found in order_data.
+
+Customers and menu items live in the JSON stores, so they are mirrored into
+search_customers / search_menu_items (plain tables) whenever a store record
+is put or deleted, and reconciled in full once per process. Triggers on the
+mirrors maintain the external-content FTS tables customers_fts and menu_fts,
+and copy customer renames into orders_fts.
+
+Queries are split into terms and every term is matched as a prefix, so
+"smi jo" finds "John Smith". Results are ranked with bm25.
+"""
+import re
+import sqlite3
+
+from . import database
+
+FTS_TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+ORDER_DATA_KEYS_SKIPPED = ('quantity', 'qty', 'comment', 'comments')
+
+# Item names are the object keys of order_data; comments and Qt-style
+# [name, qty, comment] entries are text leaves. Invalid JSON indexes nothing.
+ITEMS_SQL = f"""
+    (SELECT group_concat(word, ' ') FROM (
+        SELECT CASE WHEN typeof(key) = 'text' AND key NOT IN {ORDER_DATA_KEYS_SKIPPED} THEN key END AS word
+        FROM json_tree(CASE WHEN json_valid({{row}}.order_data) THEN {{row}}.order_data ELSE '{{{{}}}}' END)
+        UNION ALL
+        SELECT CASE WHEN type = 'text' THEN atom END
+        FROM json_tree(CASE WHEN json_valid({{row}}.order_data) THEN {{row}}.order_data ELSE '{{{{}}}}' END)
+    ))
+"""
+
+MIRRORS = {
+    'customers': ('search_customers', 'customers_fts', ('name', 'email', 'phone', 'address')),
+    'menu_items': ('search_menu_items', 'menu_fts', ('name', 'category')),
+}
+
+
+def available(conn):
+    try:
+        conn.execute("SELECT 1 FROM orders_fts LIMIT 0")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _index_order_sql(row):
+    return (f"INSERT INTO orders_fts (rowid, order_number, customer_name, service_type, items) "
+            f"VALUES ({row}.id, {row}.order_number, "
+            f"(SELECT name FROM search_customers WHERE id = {row}.customer_id), "
+            f"{row}.service_type, {ITEMS_SQL.format(row=row)});")
+
+
+# Indexes existing orders in id ranges (see database.backfill). Orders the
+# triggers have already indexed are skipped, so it can run while others write.
+ORDERS_BACKFILL_SQL = (
+    f"INSERT INTO orders_fts (rowid, order_number, customer_name, service_type, items) "
+    f"SELECT o.id, o.order_number, (SELECT name FROM search_customers WHERE id = o.customer_id), "
+    f"o.service_type, {ITEMS_SQL.format(row='o')} FROM orders o "
+    f"WHERE o.id BETWEEN ? AND ? AND NOT EXISTS (SELECT 1 FROM orders_fts WHERE rowid = o.id)"
+)
+
+
+def init_search_schema(cursor):
+    """Create the FTS tables and triggers. Does nothing if SQLite lacks FTS5."""
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE fts5_probe")
+    except sqlite3.OperationalError:
+        print("SQLite has no FTS5 support; /api/search is disabled.")
+        return
+
+    for mirror, fts, columns in MIRRORS.values():
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {mirror} (id TEXT PRIMARY KEY, {', '.join(columns)})")
+        cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                       f"{', '.join(columns)}, content = '{mirror}', content_rowid = 'rowid', {FTS_TOKENIZE})")
+        new_values = ', '.join(f"NEW.{c}" for c in columns)
+        old_values = ', '.join(f"OLD.{c}" for c in columns)
+        column_list = ', '.join(columns)
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {mirror}_ai AFTER INSERT ON {mirror} BEGIN
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.rowid, {new_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {mirror}_ad AFTER DELETE ON {mirror} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.rowid, {old_values});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {mirror}_au AFTER UPDATE ON {mirror} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {column_list}) VALUES ('delete', OLD.rowid, {old_values});
+                INSERT INTO {fts} (rowid, {column_list}) VALUES (NEW.rowid, {new_values});
+            END
+        ''')
+
+    cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS orders_fts USING fts5("
+                   f"order_number, customer_name, service_type, items, {FTS_TOKENIZE})")
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS orders_fts_ai AFTER INSERT ON orders BEGIN
+            {_index_order_sql('NEW')}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS orders_fts_ad AFTER DELETE ON orders BEGIN
+            DELETE FROM orders_fts WHERE rowid = OLD.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS orders_fts_au
+        AFTER UPDATE OF customer_id, order_number, service_type, order_data ON orders BEGIN
+            DELETE FROM orders_fts WHERE rowid = OLD.id;
+            {_index_order_sql('NEW')}
+        END
+    ''')
+    # A customer appearing or being renamed changes the name on their orders.
+    for event in ('INSERT', 'UPDATE OF name'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS search_customers_orders_{event.split()[0].lower()}
+            AFTER {event} ON search_customers BEGIN
+                UPDATE orders_fts SET customer_name = NEW.name
+                WHERE rowid IN (SELECT id FROM orders WHERE customer_id = NEW.id);
+            END
+        ''')
+
+
+# --- Mirroring the JSON stores ---
+def _upsert_sql(mirror, columns):
+    column_list = ', '.join(columns)
+    changed = ' OR '.join(f"{c} IS NOT excluded.{c}" for c in columns)
+    return (f"INSERT INTO {mirror} (id, {column_list}) VALUES (?{', ?' * len(columns)}) "
+            f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns)} "
+            f"WHERE {changed}")
+
+
+def _values(record, columns):
+    return (str(record['id']),) + tuple(
+        str(record.get(c)) if record.get(c) is not None else None for c in columns)
+
+
+def index_record(kind, op, value):
+    """JournalStore listener: mirror one put (value=record) or delete (value=id)."""
+    mirror, _, columns = MIRRORS[kind]
+    conn = database.get_connection()
+    try:
+        if not available(conn):
+            return
+        if op == 'put':
+            conn.execute(_upsert_sql(mirror, columns), _values(value, columns))
+        else:
+            conn.execute(f"DELETE FROM {mirror} WHERE id = ?", (str(value),))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def reconcile(kind, records):
+    """Make a mirror match the store's full contents, touching only rows that differ."""
+    mirror, _, columns = MIRRORS[kind]
+    conn = database.get_connection()
+    try:
+        if not available(conn):
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(_upsert_sql(mirror, columns), [_values(r, columns) for r in records])
+        conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS keep_ids (id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM keep_ids")
+        conn.executemany("INSERT OR IGNORE INTO keep_ids (id) VALUES (?)", [(str(r['id']),) for r in records])
+        conn.execute(f"DELETE FROM {mirror} WHERE id NOT IN (SELECT id FROM keep_ids)")
+        conn.execute("DELETE FROM keep_ids")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# --- Querying ---
+def match_expression(text):
+    """Turn free text into an FTS5 query: every term must match as a prefix."""
+    terms = re.findall(r"\w+", text or '', flags=re.UNICODE)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search(text, kinds=('orders', 'customers', 'menu_items'), limit=20):
+    """Ranked matches per kind as {'orders': [...], 'customers': [...], 'menu_items': [...]}."""
+    expression = match_expression(text)
+    results = {kind: [] for kind in kinds}
+    if not expression:
+        return results
+    conn = database.get_connection()
+    try:
+        if 'orders' in kinds:
+            results['orders'] = [dict(row) for row in conn.execute('''
+                SELECT o.id, o.order_number, o.customer_id, f.customer_name, o.service_type,
+                       o.order_date, o.arrival_time, bm25(orders_fts) AS score
+                FROM orders_fts f JOIN orders o ON o.id = f.rowid
+                WHERE orders_fts MATCH ?
+                ORDER BY score LIMIT ?
+            ''', (expression, limit))]
+        if 'customers' in kinds:
+            results['customers'] = [dict(row) for row in conn.execute('''
+                SELECT c.id, c.name, c.email, c.phone, c.address, bm25(customers_fts) AS score
+                FROM customers_fts f JOIN search_customers c ON c.rowid = f.rowid
+                WHERE customers_fts MATCH ?
+                ORDER BY score LIMIT ?
+            ''', (expression, limit))]
+        if 'menu_items' in kinds:
+            results['menu_items'] = [dict(row) for row in conn.execute('''
+                SELECT m.id, m.name, m.category, bm25(menu_fts) AS score
+                FROM menu_fts f JOIN search_menu_items m ON m.rowid = f.rowid
+                WHERE menu_fts MATCH ?
+                ORDER BY score LIMIT ?
+            ''', (expression, limit))]
+    finally:
+        conn.close()
+    return results
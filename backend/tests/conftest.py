@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def backend(tmp_path_factory):
+    """The app module, running against an empty database and stores in a temporary folder."""
+    # The database, the JSON stores and the invoice folder are all relative to the cwd.
+    os.chdir(tmp_path_factory.mktemp('backend'))
+    # Nothing listens here, so order emails fail fast instead of reaching a real server.
+    os.environ['SMTP_HOST'] = '127.0.0.1'
+    os.environ['SMTP_PORT'] = '9'
+    import app
+    from src import database
+    database.init_db()
+    return app
+
+
+@pytest.fixture
+def client(backend):
+    return backend.app.test_client()
@@ -0,0 +1,62 @@
+import importlib.util
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import BACKEND_DIR
+from src.events import EventBus
+
+
+@pytest.fixture(scope='module')
+def other_worker(backend):
+    """A second instance of the app on the same database, standing in for another gunicorn worker."""
+    spec = importlib.util.spec_from_file_location('app_other_worker', os.path.join(BACKEND_DIR, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_feed_includes_writes_from_another_worker(backend, other_worker):
+    cursor = backend.events.last_id
+    created = other_worker.app.test_client().post('/api/customers', json={'name': 'Other Worker Tours'}).get_json()
+
+    events, complete = backend.events.since(cursor)
+    assert complete
+    assert [(e['entity'], e['entity_id'], e['action']) for e in events] == [('customer', created['id'], 'created')]
+
+    response = backend.app.test_client().get('/api/events', headers={'Last-Event-ID': str(cursor)}, buffered=False)
+    frames = iter(response.response)
+    try:
+        assert next(frames).startswith(b'retry:')
+        frame = next(frames).decode()
+    finally:
+        response.close()
+    assert frame.startswith(f"id: {events[0]['id']}\nevent: change\n")
+    assert created['id'] in frame
+
+
+def test_wait_wakes_for_another_workers_write(backend, other_worker):
+    cursor = backend.events.last_id
+    backend.events.poll_interval = 0.1
+    timer = threading.Timer(0.2, other_worker.app.test_client().post, args=('/api/customers',),
+                            kwargs={'json': {'name': 'Late Tours'}})
+    timer.start()
+    started = time.monotonic()
+    events, complete = backend.events.wait(cursor, 5)
+    timer.join()
+    assert complete and [e['entity'] for e in events] == ['customer']
+    assert time.monotonic() - started < 2
+
+
+def test_cursor_older_than_kept_events_is_incomplete(backend):
+    bus = EventBus(capacity=2)
+    first = bus.publish('order', 1, 'updated')
+    for order_id in (2, 3, 4):
+        bus.publish('order', order_id, 'updated')
+
+    assert bus.since(first['id']) == ([], False)
+    events, complete = bus.since(first['id'] + 2)
+    assert complete and [e['entity_id'] for e in events] == ['4']
+    assert bus.since(bus.last_id + 10) == ([], False)
@@ -0,0 +1,17 @@
+def test_if_none_match_round_trips_through_compression(client):
+    for n in range(40):
+        client.post('/api/menu-items', json={'name': f'Round trip dish {n}', 'category': 'MAINS'})
+
+    first = client.get('/api/menu-items', headers={'Accept-Encoding': 'gzip'})
+    assert first.status_code == 200
+    assert first.headers['Content-Encoding'] == 'gzip'
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+
+    again = client.get('/api/menu-items', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+
+    identity = client.get('/api/menu-items', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers
+    assert identity.headers['ETag'] == etag
@@ -0,0 +1,149 @@
+import threading
+import time
+import uuid
+
+import pytest
+from flask import Flask, jsonify, request
+
+from src import database, idempotency
+from src.idempotency import idempotent
+
+from test_orders import ORDER
+
+
+@pytest.fixture
+def customer_id(client):
+    response = client.post('/api/customers', json={'name': 'Idempotent Tours', 'price_lunch': '40', 'price_kids': '20'})
+    return response.get_json()['id']
+
+
+@pytest.fixture
+def flaky(backend):
+    """A small app whose endpoint counts its runs and fails with ?fail=1."""
+    app = Flask('flaky')
+    runs = []
+
+    @app.route('/things', methods=['POST'])
+    @idempotent('tests.things')
+    def create_thing():
+        runs.append(request.get_json())
+        if request.args.get('fail'):
+            return jsonify({'message': 'down'}), 503
+        return jsonify({'run': len(runs)}), 201
+
+    app.runs = runs
+    return app
+
+
+def key_row(scope, key):
+    conn = database.get_connection()
+    try:
+        return conn.execute("SELECT * FROM idempotency_keys WHERE scope = ? AND key = ?", (scope, key)).fetchone()
+    finally:
+        conn.close()
+
+
+def count(sql, *args):
+    conn = database.get_connection()
+    try:
+        return conn.execute(sql, args).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_repeat_is_replayed_without_running_again(flaky):
+    client, key = flaky.test_client(), str(uuid.uuid4())
+    first = client.post('/things', json={'a': 1}, headers={'Idempotency-Key': key})
+    second = client.post('/things', json={'a': 1}, headers={'Idempotency-Key': key})
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first.headers
+    assert len(flaky.runs) == 1
+
+
+def test_key_reused_for_another_body_is_rejected(flaky):
+    client, key = flaky.test_client(), str(uuid.uuid4())
+    client.post('/things', json={'a': 1}, headers={'Idempotency-Key': key})
+    response = client.post('/things', json={'a': 2}, headers={'Idempotency-Key': key})
+    assert response.status_code == 422
+    assert len(flaky.runs) == 1
+
+
+def test_server_error_releases_the_key(flaky):
+    client, key = flaky.test_client(), str(uuid.uuid4())
+    failed = client.post('/things?fail=1', json={'a': 1}, headers={'Idempotency-Key': key})
+    assert failed.status_code == 503
+    assert key_row('tests.things', key) is None
+    retried = client.post('/things?fail=1', json={'a': 1}, headers={'Idempotency-Key': key})
+    assert retried.status_code == 503
+    assert 'Idempotent-Replayed' not in retried.headers
+    assert len(flaky.runs) == 2
+
+
+def test_expired_key_runs_again(flaky):
+    client, key = flaky.test_client(), str(uuid.uuid4())
+    client.post('/things', json={'a': 1}, headers={'Idempotency-Key': key})
+    conn = database.get_connection()
+    try:
+        conn.execute("UPDATE idempotency_keys SET expires_at = ? WHERE key = ?", (int(time.time()) - 1, key))
+        conn.commit()
+    finally:
+        conn.close()
+    response = client.post('/things', json={'a': 1}, headers={'Idempotency-Key': key})
+    assert response.status_code == 201
+    assert 'Idempotent-Replayed' not in response.headers
+    assert len(flaky.runs) == 2
+
+
+def test_abandoned_claim_is_taken_over_after_its_lease(backend):
+    key = str(uuid.uuid4())
+    assert idempotency.claim('tests.lease', key, 'f')[0] == 'claimed'
+    assert idempotency.claim('tests.lease', key, 'f')[0] == 'pending'
+    conn = database.get_connection()
+    try:
+        conn.execute("UPDATE idempotency_keys SET locked_until = ? WHERE key = ?", (int(time.time()) - 1, key))
+        conn.commit()
+    finally:
+        conn.close()
+    assert idempotency.claim('tests.lease', key, 'f')[0] == 'claimed'
+    assert key_row('tests.lease', key)['locked_until'] > time.time()
+
+
+def test_running_claim_keeps_renewing_its_lease(backend, monkeypatch):
+    monkeypatch.setattr(idempotency, 'RENEW_SECONDS', 0.05)
+    key = str(uuid.uuid4())
+    idempotency.claim('tests.lease', key, 'f')
+    conn = database.get_connection()
+    try:
+        conn.execute("UPDATE idempotency_keys SET locked_until = 0 WHERE key = ?", (key,))
+        conn.commit()
+    finally:
+        conn.close()
+    with idempotency._leased('tests.lease', key):
+        time.sleep(0.3)
+    assert key_row('tests.lease', key)['locked_until'] > time.time()
+
+
+def test_concurrent_duplicates_create_one_order_and_one_invoice(backend, customer_id):
+    key, order_number = str(uuid.uuid4()), f"IDEM-{uuid.uuid4().hex[:8]}"
+    body = {**ORDER, 'customer_id': customer_id, 'order_number': order_number}
+    start, responses = threading.Barrier(2), []
+
+    def submit():
+        client = backend.app.test_client()
+        start.wait()
+        responses.append(client.post('/api/orders', json=body, headers={'Idempotency-Key': key}))
+
+    threads = [threading.Thread(target=submit) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(r.status_code for r in responses) in ([201, 201], [207, 207])
+    assert responses[0].get_json()['id'] == responses[1].get_json()['id']
+    assert sum('Idempotent-Replayed' in r.headers for r in responses) == 1
+    assert count("SELECT COUNT(*) FROM orders WHERE order_number = ?", order_number) == 1
+    assert count("SELECT COUNT(*) FROM invoices i JOIN orders o ON o.id = i.order_id "
+                 "WHERE o.order_number = ?", order_number) == 1
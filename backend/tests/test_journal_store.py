@@ -0,0 +1,35 @@
+import json
+
+from src.journal_store import JournalStore
+
+
+def make_store(tmp_path):
+    return JournalStore(str(tmp_path / 'customers.json'), compact_interval=0, fsync=False)
+
+
+def test_append_after_torn_line_keeps_journal_readable(tmp_path):
+    store = make_store(tmp_path)
+    store.put({'id': '1', 'name': 'First'})
+    # A crash mid-append leaves a partial last line without its newline.
+    with open(store.journal_path, 'ab') as f:
+        f.write(b'{"op":"put","record":{"id":"2","na')
+
+    store.put({'id': '3', 'name': 'Third'})
+
+    with open(store.journal_path, 'rb') as f:
+        lines = f.read().splitlines()
+    assert [json.loads(line)['record']['id'] for line in lines] == ['1', '3']
+    reloaded = make_store(tmp_path)
+    assert sorted(r['id'] for r in reloaded.all()) == ['1', '3']
+    assert store.compact()
+    assert sorted(r['id'] for r in make_store(tmp_path).all()) == ['1', '3']
+
+
+def test_unreadable_line_is_skipped(tmp_path):
+    store = make_store(tmp_path)
+    store.put({'id': '1', 'name': 'First'})
+    with open(store.journal_path, 'ab') as f:
+        f.write(b'{"op":"put","rec\n')
+    store.put({'id': '2', 'name': 'Second'})
+
+    assert sorted(r['id'] for r in make_store(tmp_path).all()) == ['1', '2']
@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from src import json_store
+
+
+def test_failed_atomic_write_keeps_original_and_leaves_no_temp_file(tmp_path, monkeypatch):
+    path = tmp_path / 'customers.json'
+    json_store.atomic_write(str(path), json_store.dumps([{'id': '1'}]))
+    original = path.read_text()
+
+    def fail_fsync(fd):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'fsync', fail_fsync)
+    with pytest.raises(OSError):
+        json_store.atomic_write(str(path), json_store.dumps([{'id': '2'}]))
+
+    assert path.read_text() == original
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['customers.json']
+
+
+def test_atomic_write_replaces_contents(tmp_path):
+    path = tmp_path / 'menu_items.json'
+    json_store.atomic_write(str(path), json_store.dumps([{'id': '1'}]))
+    json_store.atomic_write(str(path), json_store.dumps([{'id': '2'}]))
+    assert json_store.read_json(str(path)) == [{'id': '2'}]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['menu_items.json']
@@ -0,0 +1,109 @@
+import json
+import sqlite3
+
+import pytest
+
+from src import database, migrations, search
+
+ORDERS = [
+    ('C1', 'B-1', 'Lunch', 2, 0, '12:00', '2025-01-06', {'Soup': {'quantity': 2}}),
+    ('C1', 'B-2', 'Dinner', 4, 1, '18:30', '2025-01-07', {'Fish Pie': {'quantity': 5}}),
+    ('C2', 'B-3', 'Lunch', 1, 1, '12:15', '2025-01-08', {'Soup': {'quantity': 1}}),
+]
+
+
+@pytest.fixture
+def baseline_db(backend, tmp_path, monkeypatch):
+    """A database as created before versioning: the original tables with rows in them, no user_version."""
+    path = str(tmp_path / 'baseline.db')
+    monkeypatch.setattr(database, 'DB_NAME', path)
+    conn = sqlite3.connect(path)
+    database.create_tables(conn.cursor())
+    for order in ORDERS:
+        *fields, items = order
+        order_id = conn.execute(
+            "INSERT INTO orders (customer_id, order_number, service_type, adults, kids, arrival_time, order_date, "
+            "order_data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (*fields, json.dumps(items))
+        ).lastrowid
+        conn.execute("INSERT INTO invoices (order_id, invoice_number, final_total) VALUES (?, ?, ?)",
+                     (order_id, f"INV-{order_id:05d}", 100.0))
+    conn.commit()
+    conn.close()
+    return path
+
+
+def pragma_user_version():
+    conn = database.get_connection()
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def rows(sql):
+    conn = database.get_connection()
+    try:
+        return [tuple(row) for row in conn.execute(sql)]
+    finally:
+        conn.close()
+
+
+def test_baseline_database_is_upgraded(baseline_db):
+    applied = migrations.migrate()
+    assert [version for version, _ in applied] == [m.version for m in migrations.MIGRATIONS]
+    assert pragma_user_version() == database.SCHEMA_VERSION
+    for table in database.SYNC_TABLES:
+        assert rows(f"SELECT row_version FROM {table}") == [(1,)] * len(ORDERS)
+    conn = database.get_connection()
+    try:
+        fts = search.available(conn)
+    finally:
+        conn.close()
+    if fts:
+        assert rows("SELECT rowid, order_number FROM orders_fts ORDER BY rowid") == \
+            [(i + 1, order[1]) for i, order in enumerate(ORDERS)]
+    assert migrations.migrate() == []
+
+
+def test_interrupted_backfill_is_not_recorded_and_resumes(baseline_db, monkeypatch):
+    index = next(i for i, m in enumerate(migrations.MIGRATIONS) if m.backfill is migrations._backfill_sync_versions)
+    migration = migrations.MIGRATIONS[index]
+
+    def interrupted(conn):
+        # Stamp the first order, then die before the rest.
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(database.sync_backfill_sql('orders'), (1, 1))
+        conn.commit()
+        raise RuntimeError('killed mid-backfill')
+
+    original = migrations.MIGRATIONS
+    patched = list(original)
+    patched[index] = migration._replace(backfill=interrupted)
+    monkeypatch.setattr(migrations, 'MIGRATIONS', patched)
+    with pytest.raises(RuntimeError):
+        migrations.migrate()
+    assert migration.version not in {version for version, _ in rows("SELECT version, name FROM schema_version")}
+    assert pragma_user_version() == migration.version - 1
+    assert rows("SELECT row_version FROM orders ORDER BY id") == [(1,), (None,), (None,)]
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', original)
+    applied = migrations.migrate()
+    assert applied[0][0] == migration.version
+    assert pragma_user_version() == database.SCHEMA_VERSION
+    assert rows("SELECT row_version FROM orders ORDER BY id") == [(1,)] * len(ORDERS)
+    assert rows("SELECT row_version FROM invoices ORDER BY id") == [(1,)] * len(ORDERS)
+
+
+def test_user_version_only_covers_contiguous_migrations(baseline_db):
+    first, second, third = migrations.MIGRATIONS[:3]
+    conn = database.get_connection()
+    try:
+        migrations._ensure_version_table(conn)
+        migrations._record(conn, first)
+        migrations._record(conn, third)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == first.version
+        migrations._record(conn, second)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == third.version
+        conn.commit()
+    finally:
+        conn.close()
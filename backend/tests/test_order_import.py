@@ -0,0 +1,75 @@
+import json
+import sqlite3
+
+import pytest
+
+from src import database, order_import
+
+
+@pytest.fixture
+def customer_id(client):
+    response = client.post('/api/customers', json={'name': 'Import Tours', 'price_lunch': '40', 'price_kids': '20'})
+    return response.get_json()['id']
+
+
+def row(customer_id, number, **fields):
+    return {'customer_id': customer_id, 'order_number': number, 'service_type': 'Lunch', 'adults': 2,
+            'kids': 1, 'arrival_time': '12:00', 'order_date': '2025-04-01',
+            'order_data': {'Soup': {'quantity': 3}}, **fields}
+
+
+def count(sql, *args):
+    conn = database.get_connection()
+    try:
+        return conn.execute(sql, args).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_mixed_file_imports_valid_rows_and_reports_the_rest(client, customer_id):
+    lines = [
+        json.dumps(row(customer_id, 'IMP-1')),
+        json.dumps(row(customer_id, 'IMP-2', adults='two')),
+        'not json',
+        '',
+        json.dumps(row('no-such-customer', 'IMP-3', arrival_time='noon')),
+        json.dumps(row(customer_id, 'IMP-4', kids='3')),
+    ]
+    response = client.post('/api/orders/import?format=jsonl&documents=0', data='\n'.join(lines))
+    assert response.status_code == 207
+    body = response.get_json()
+    assert [o['line'] for o in body['imported']] == [1, 6]
+    errors = {e['line']: e['errors'] for e in body['errors']}
+    assert errors[2] == ['adults must be a whole number']
+    assert errors[3] == ['line is not a JSON object']
+    assert set(errors[5]) == {"unknown customer_id 'no-such-customer'", 'arrival_time must be HH:MM'}
+    assert sorted(errors) == [2, 3, 5]
+
+    for imported in body['imported']:
+        assert count("SELECT COUNT(*) FROM invoices WHERE order_id = ? AND invoice_number = ?",
+                     imported['id'], imported['invoice_number']) == 1
+    assert count("SELECT kids FROM orders WHERE id = ?", body['imported'][1]['id']) == 3
+
+
+def test_csv_without_required_columns_is_rejected(client, customer_id):
+    response = client.post('/api/orders/import?format=csv&documents=0', data='customer_id,order_number\nx,y\n')
+    assert response.status_code == 400
+    assert 'missing columns' in response.get_json()['message']
+
+
+def test_failed_batch_inserts_nothing(backend, customer_id):
+    orders = [order_import.validate_row(row(customer_id, f'ROLL-{i}'), {customer_id})[0] for i in range(3)]
+    orders[2]['service_type'] = None  # fails NOT NULL after the first rows are written
+    before = count("SELECT COUNT(*) FROM orders"), count("SELECT COUNT(*) FROM invoices")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        order_import.insert_orders(orders)
+
+    assert (count("SELECT COUNT(*) FROM orders"), count("SELECT COUNT(*) FROM invoices")) == before
+    assert count("SELECT COUNT(*) FROM orders WHERE order_number LIKE 'ROLL-%'") == 0
+    assert all('id' not in o and 'invoice_number' not in o for o in orders)
+
+    # Nothing was left half-written, so the corrected batch goes in whole.
+    orders[2]['service_type'] = 'Lunch'
+    order_import.insert_orders(orders)
+    assert count("SELECT COUNT(*) FROM orders WHERE order_number LIKE 'ROLL-%'") == 3
@@ -0,0 +1,75 @@
+import sqlite3
+import uuid
+
+import pytest
+
+from src import database
+
+ORDER = {
+    'order_number': 'T-1',
+    'service_type': 'Lunch',
+    'adults': 2,
+    'kids': 1,
+    'arrival_time': '12:00',
+    'order_date': '2025-03-31',
+    'order_data': {'Soup': {'quantity': 2}},
+}
+
+
+@pytest.fixture
+def customer_id(client):
+    response = client.post('/api/customers', json={'name': 'Test Tours', 'price_lunch': '40', 'price_kids': '20'})
+    return response.get_json()['id']
+
+
+def post_order(client, customer_id, **fields):
+    return client.post('/api/orders', json={**ORDER, 'customer_id': customer_id, **fields},
+                       headers={'Idempotency-Key': str(uuid.uuid4())})
+
+
+def assert_database_writable():
+    conn = sqlite3.connect(database.DB_NAME, timeout=0)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('adults', ['2.5', 'two', [2], -1])
+def test_invalid_head_count_is_rejected(client, customer_id, adults):
+    response = post_order(client, customer_id, adults=adults)
+    assert response.status_code == 400
+    assert 'adults' in response.get_json()['message']
+    assert_database_writable()
+
+
+def test_numeric_strings_are_coerced(client, customer_id):
+    response = post_order(client, customer_id, adults='3', kids='')
+    assert response.status_code in (201, 207)
+    conn = database.get_connection()
+    try:
+        order = conn.execute("SELECT adults, kids FROM orders WHERE id = ?", (response.get_json()['id'],)).fetchone()
+        invoice = conn.execute("SELECT final_total FROM invoices WHERE order_id = ?",
+                               (response.get_json()['id'],)).fetchone()
+    finally:
+        conn.close()
+    assert (order['adults'], order['kids']) == (3, 0)
+    assert invoice['final_total'] == 120.0
+
+
+def test_failed_invoice_insert_rolls_back_and_releases_the_write_lock(backend, client, customer_id):
+    conn = sqlite3.connect(database.DB_NAME)
+    conn.execute("CREATE TRIGGER fail_invoice BEFORE INSERT ON invoices BEGIN SELECT RAISE(ABORT, 'boom'); END")
+    conn.commit()
+    backend.app.config['PROPAGATE_EXCEPTIONS'] = False
+    try:
+        response = post_order(client, customer_id, order_number='T-rollback')
+    finally:
+        backend.app.config['PROPAGATE_EXCEPTIONS'] = None
+        conn.execute("DROP TRIGGER fail_invoice")
+        conn.commit()
+    assert response.status_code == 500
+    assert conn.execute("SELECT COUNT(*) FROM orders WHERE order_number = 'T-rollback'").fetchone()[0] == 0
+    conn.close()
+    assert_database_writable()
@@ -0,0 +1,61 @@
+import base64
+import re
+import uuid
+import zlib
+
+from src import database, pricing
+from src.pdf_generator import generate_order_pdf
+
+
+def pdf_text(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    text = []
+    # reportlab writes content streams ASCII85- then Flate-encoded.
+    for stream in re.findall(rb'stream\r?\n(.*?)~>\s*endstream', data, re.S):
+        try:
+            text.append(zlib.decompress(base64.a85decode(stream.strip())).decode('latin-1'))
+        except (ValueError, zlib.error):
+            continue
+    return '\n'.join(text)
+
+
+def test_pdf_totals_match_stored_invoice_totals(client, tmp_path):
+    # 3 x 19.95 = 59.85; its GST of 5.985 is where float and cent rounding part ways.
+    customer = client.post('/api/customers', json={
+        'name': 'Rounding Tours', 'price_lunch': '19.95', 'price_dinner': '25', 'price_kids': '10',
+    }).get_json()
+    response = client.post('/api/orders', json={
+        'customer_id': customer['id'], 'order_number': 'PDF-1', 'service_type': 'Lunch',
+        'adults': 3, 'kids': 0, 'arrival_time': '12:00', 'order_date': '2025-04-01',
+        'order_data': {},
+    }, headers={'Idempotency-Key': str(uuid.uuid4())})
+    order_id = response.get_json()['id']
+    conn = database.get_connection()
+    try:
+        invoice = conn.execute("SELECT final_total, gst_breakdown FROM invoices WHERE order_id = ?",
+                               (order_id,)).fetchone()
+    finally:
+        conn.close()
+
+    adult_price, kid_price = pricing.unit_prices(pricing.price_table(customer), 'Lunch')
+    path = generate_order_pdf({
+        'customer_name': customer['name'], 'invoice_number': 'INV-PDF', 'invoice_date': '2025-04-01',
+        'adults': 3, 'kids': 0, 'adult_price': float(adult_price), 'kid_price': float(kid_price),
+    }, str(tmp_path / 'invoice.pdf'), use_cache=False)
+    text = pdf_text(path)
+
+    assert f"(${invoice['final_total']:.2f})" in text
+    assert f"(\\(Includes a GST of ${invoice['gst_breakdown']:.2f}\\))" in text
+    assert (invoice['final_total'], invoice['gst_breakdown']) == (59.85, 5.99)
+
+
+def test_order_totals_match_batch_totals(backend):
+    cache = backend.pricing
+    customer = backend.customer_store.put({'id': str(uuid.uuid4()), 'name': 'Batch Tours',
+                                           'price_lunch': '43.50', 'price_dinner': '51', 'price_kids': '19.95'})
+    orders = [{'customer_id': customer['id'], 'service_type': service, 'adults': adults, 'kids': kids}
+              for service in ('Lunch', 'Dinner') for adults in (0, 1, 7) for kids in (0, 3)]
+    for order, totals in zip(orders, cache.totals(orders)):
+        adult, kid = cache.unit_prices(order['customer_id'], order['service_type'])
+        assert pricing.order_totals(order['adults'], order['kids'], adult, kid) == totals
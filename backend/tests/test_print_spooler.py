@@ -0,0 +1,109 @@
+import json
+import threading
+
+import pytest
+
+from src import database, migrations, print_spooler
+
+
+@pytest.fixture
+def db(backend, tmp_path, monkeypatch):
+    """A freshly migrated database of its own, so the queue holds only this test's jobs."""
+    monkeypatch.setattr(database, 'DB_NAME', str(tmp_path / 'spool.db'))
+    migrations.migrate()
+
+
+def add_orders(count, service_type='Lunch', order_date='2025-05-02'):
+    conn = database.get_connection()
+    try:
+        ids = [conn.execute(
+            "INSERT INTO orders (customer_id, order_number, service_type, adults, kids, arrival_time, order_date, "
+            "order_data) VALUES ('C1', ?, ?, 2, 0, ?, ?, ?)",
+            (f"P-{i}", service_type, f"12:{i:02d}", order_date, json.dumps({'Soup': {'quantity': 2}}))
+        ).lastrowid for i in range(count)]
+        conn.commit()
+    finally:
+        conn.close()
+    return ids
+
+
+def jobs():
+    conn = database.get_connection()
+    try:
+        return {row['order_id']: dict(row) for row in conn.execute("SELECT * FROM print_jobs")}
+    finally:
+        conn.close()
+
+
+class BrokenSink:
+    name = 'broken'
+
+    def send(self, path, title):
+        raise RuntimeError('printer on fire')
+
+
+def spooler(sink, tmp_path):
+    return print_spooler.PrintSpooler(sink, lambda customer_id: 'Test Tours', dict,
+                                      spool_dir=str(tmp_path / 'spool'), max_batch=2)
+
+
+def test_concurrent_workers_never_claim_the_same_job(db):
+    order_ids = add_orders(6) + add_orders(6, service_type='Dinner')
+    print_spooler.enqueue(order_ids)
+    start, claims = threading.Barrier(4), [[] for _ in range(4)]
+
+    def worker(claimed):
+        start.wait()
+        while True:
+            batch = print_spooler.claim_batch('test', max_jobs=2)
+            if batch is None:
+                return
+            claimed.extend(order['id'] for order in batch[3])
+
+    threads = [threading.Thread(target=worker, args=(claimed,)) for claimed in claims]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    claimed = [order_id for c in claims for order_id in c]
+    assert sorted(claimed) == sorted(order_ids)
+    assert all(job['status'] == 'printing' and job['attempts'] == 1 for job in jobs().values())
+
+
+def test_claimed_batch_is_not_claimed_again(db):
+    first_ids = add_orders(2)
+    second_ids = add_orders(1, order_date='2025-05-03')
+    print_spooler.enqueue(first_ids + second_ids)
+
+    first = print_spooler.claim_batch('a')
+    second = print_spooler.claim_batch('b')
+    assert [o['id'] for o in first[3]] == first_ids
+    assert [o['id'] for o in second[3]] == second_ids
+    assert print_spooler.claim_batch('c') is None
+
+
+def test_failed_sink_requeues_the_jobs(db, tmp_path):
+    order_ids = add_orders(2)
+    print_spooler.enqueue(order_ids)
+
+    assert spooler(BrokenSink(), tmp_path).run_once() == 0
+    queued = jobs()
+    assert all(queued[i]['status'] == 'pending' and queued[i]['batch_id'] is None for i in order_ids)
+    assert all(queued[i]['error'] == 'printer on fire' for i in order_ids)
+    assert print_spooler.metrics()['failed_batches'] == 1
+
+    printed = spooler(print_spooler.FileSink(str(tmp_path / 'out')), tmp_path).run_once()
+    assert printed == 2
+    assert all(job['status'] == 'printed' and job['attempts'] == 2 for job in jobs().values())
+    assert len(list((tmp_path / 'out').iterdir())) == 1
+
+
+def test_jobs_fail_for_good_after_max_attempts(db, tmp_path):
+    order_ids = add_orders(1)
+    print_spooler.enqueue(order_ids)
+    broken = spooler(BrokenSink(), tmp_path)
+    for _ in range(print_spooler.MAX_ATTEMPTS):
+        broken.run_once()
+    assert jobs()[order_ids[0]]['status'] == 'failed'
+    assert print_spooler.claim_batch('test') is None
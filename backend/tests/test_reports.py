@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src import database, migrations, reports
+
+RANGES = [
+    (date(2025, 1, 20), date(2025, 3, 10)),  # whole February, weeks and days on either side
+    (date(2025, 2, 26), date(2025, 3, 5)),   # across a month edge, inside one week
+    (date(2025, 3, 3), date(2025, 3, 16)),   # two whole weeks
+    (date(2025, 1, 1), date(2025, 12, 31)),
+]
+
+
+@pytest.fixture
+def db(backend, tmp_path, monkeypatch):
+    """A freshly migrated database of its own, so other tests' orders don't count."""
+    monkeypatch.setattr(database, 'DB_NAME', str(tmp_path / 'reports.db'))
+    migrations.migrate()
+
+
+def execute(sql, *args):
+    conn = database.get_connection()
+    try:
+        cursor = conn.execute(sql, args)
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def add_order(day, customer_id='C1', service_type='Lunch', total=100.0, gst=9.09, adults=2, kids=1):
+    order_id = execute(
+        "INSERT INTO orders (customer_id, order_number, service_type, adults, kids, arrival_time, order_date) "
+        "VALUES (?, ?, ?, ?, ?, '12:00', ?)", customer_id, f"R-{day}", service_type, adults, kids, day.isoformat())
+    execute("INSERT INTO invoices (order_id, invoice_number, gst_breakdown, final_total) VALUES (?, 'R', ?, ?)",
+            order_id, gst, total)
+    return order_id
+
+
+def raw_totals(start, end):
+    conn = database.get_connection()
+    try:
+        row = conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(o.adults), 0), COALESCE(SUM(o.kids), 0),
+                   COALESCE(SUM(CAST(ROUND(i.final_total * 100) AS INTEGER)), 0),
+                   COALESCE(SUM(CAST(ROUND(i.gst_breakdown * 100) AS INTEGER)), 0)
+            FROM invoices i JOIN orders o ON o.id = i.order_id
+            WHERE o.order_date BETWEEN ? AND ?
+        ''', (start.isoformat(), end.isoformat())).fetchone()
+    finally:
+        conn.close()
+    return {'orders': row[0], 'adults': row[1], 'kids': row[2],
+            'total': round(row[3] / 100, 2), 'gst': round(row[4] / 100, 2)}
+
+
+def assert_rollups_match_invoices():
+    for start, end in RANGES:
+        assert reports.revenue(start, end)['totals'] == raw_totals(start, end), (start, end)
+
+
+def test_rollups_follow_inserts_updates_and_deletes(db):
+    day = date(2025, 1, 25)
+    ids = []
+    while day <= date(2025, 3, 14):
+        ids.append(add_order(day, customer_id=f"C{len(ids) % 3}", total=50.0 + len(ids) * 1.15, gst=4.55))
+        day += timedelta(days=3)
+    assert_rollups_match_invoices()
+    assert reports.revenue(*RANGES[0])['sources']['month_rollups'] == 1
+
+    execute("UPDATE invoices SET final_total = 19.95, gst_breakdown = 1.81 WHERE order_id = ?", ids[1])
+    assert_rollups_match_invoices()
+    # Move orders across the February / March and week edges, and to another customer.
+    execute("UPDATE orders SET order_date = '2025-03-01', adults = 7 WHERE id = ?", ids[3])
+    execute("UPDATE orders SET order_date = '2025-02-28', customer_id = 'C9' WHERE id = ?", ids[-2])
+    assert_rollups_match_invoices()
+
+    execute("DELETE FROM invoices WHERE order_id = ?", ids[5])
+    execute("DELETE FROM invoices WHERE order_id = ?", ids[-1])
+    assert_rollups_match_invoices()
+
+    # The incrementally kept rollups equal a rebuild from scratch.
+    conn = database.get_connection()
+    try:
+        kept = sorted(tuple(r) for r in conn.execute("SELECT * FROM revenue_rollups WHERE orders != 0"))
+        reports.rebuild_rollups(conn.cursor())
+        rebuilt = sorted(tuple(r) for r in conn.execute("SELECT * FROM revenue_rollups"))
+        conn.rollback()
+    finally:
+        conn.close()
+    assert kept == rebuilt
+
+
+def test_customer_filter_matches_raw_sum(db):
+    add_order(date(2025, 2, 3), customer_id='C1', total=10.0, gst=0.91)
+    add_order(date(2025, 2, 10), customer_id='C2', total=20.0, gst=1.82)
+    add_order(date(2025, 3, 2), customer_id='C1', total=30.0, gst=2.73)
+    report = reports.revenue(date(2025, 1, 27), date(2025, 3, 9), customer_id='C1')
+    assert report['totals']['orders'] == 2
+    assert report['totals']['total'] == 40.0
+    assert [g['customer_id'] for g in report['breakdown']] == ['C1']
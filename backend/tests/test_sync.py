@@ -0,0 +1,86 @@
+from src import database
+
+from test_orders import post_order
+
+
+def sync(client, since):
+    response = client.get(f'/api/sync?since={since}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def execute(sql, *args):
+    conn = database.get_connection()
+    try:
+        conn.execute(sql, args)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def new_customer(client, name):
+    return client.post('/api/customers', json={'name': name, 'price_lunch': '40', 'price_kids': '20'}).get_json()
+
+
+def test_changed_then_deleted_rows_come_back_as_tombstones(client):
+    since = sync(client, 0)['version']
+    customer = new_customer(client, 'Tombstone Tours')
+    order_id = post_order(client, customer['id']).get_json()['id']
+    execute("UPDATE orders SET adults = adults + 1 WHERE id = ?", order_id)
+    conn = database.get_connection()
+    try:
+        invoice_id = conn.execute("SELECT id FROM invoices WHERE order_id = ?", (order_id,)).fetchone()[0]
+    finally:
+        conn.close()
+    execute("DELETE FROM invoices WHERE order_id = ?", order_id)
+    execute("DELETE FROM orders WHERE id = ?", order_id)
+    client.put(f"/api/customers/{customer['id']}", json={'name': 'Renamed Tours'})
+    assert client.delete(f"/api/customers/{customer['id']}").status_code == 200
+
+    body = sync(client, since)
+    assert order_id not in [o['id'] for o in body['changes']['orders']]
+    assert invoice_id not in [i['id'] for i in body['changes']['invoices']]
+    assert customer['id'] not in [c['id'] for c in body['changes']['customers']]
+    deleted = {(d['entity'], d['entity_id']): d['row_version'] for d in body['deleted']}
+    assert ('order', str(order_id)) in deleted
+    assert ('invoice', str(invoice_id)) in deleted
+    assert ('customer', str(customer['id'])) in deleted
+    assert all(since < version <= body['version'] for version in deleted.values())
+
+
+def test_consecutive_syncs_neither_repeat_nor_skip(client):
+    first = sync(client, 0)
+    customer = new_customer(client, 'Boundary Tours')
+    order_ids = [post_order(client, customer['id']).get_json()['id'] for _ in range(3)]
+
+    second = sync(client, first['version'])
+    assert second['since'] == first['version'] and second['version'] > first['version']
+    assert {o['id'] for o in second['changes']['orders']} == set(order_ids)
+    assert [c['id'] for c in second['changes']['customers']] == [customer['id']]
+
+    execute("UPDATE orders SET kids = kids + 1 WHERE id = ?", order_ids[0])
+    third = sync(client, second['version'])
+    assert [o['id'] for o in third['changes']['orders']] == [order_ids[0]]
+    assert third['changes']['customers'] == [] and third['deleted'] == []
+    # Every row version handed out lies in exactly one of the two windows.
+    assert all(first['version'] < o['row_version'] <= second['version'] for o in second['changes']['orders'])
+    assert all(second['version'] < o['row_version'] <= third['version'] for o in third['changes']['orders'])
+
+    assert sync(client, third['version'])['changes'] == {
+        'orders': [], 'invoices': [], 'customers': [], 'menu_items': []}
+
+
+def test_json_store_records_share_the_database_counter(backend, client):
+    customer = new_customer(client, 'Clock Tours')
+    order_id = post_order(client, customer['id']).get_json()['id']
+    menu_item = client.post('/api/menu-items', json={'name': 'Clock Soup', 'category': 'Starter'}).get_json()
+
+    conn = database.get_connection()
+    try:
+        order_version = conn.execute("SELECT row_version FROM orders WHERE id = ?", (order_id,)).fetchone()[0]
+        current = database.current_sync_version(conn)
+    finally:
+        conn.close()
+    customer_version = backend.customer_store.get(customer['id'])['row_version']
+    menu_version = backend.menu_store.get(menu_item['id'])['row_version']
+    assert customer_version < order_version < menu_version <= current
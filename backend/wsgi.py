@@ -0,0 +1,53 @@
+"""
+WSGI entry point for production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+    python serve.py --workers 4 --threads 8
+
+Each worker process calls init_worker() once after it has been forked and
+shutdown_worker() when it is asked to stop.
+"""
+import os
+import threading
+
+from app import app, customer_store, import_batches, menu_store, open_streams, spooler, warm_imports
+from src import database
+
+application = app
+
+_shutdown_lock = threading.Lock()
+_shut_down = False
+
+
+def max_streams(threads):
+    """SSE streams and long polls one worker may hold: WSGI_MAX_STREAMS, or half its threads."""
+    configured = os.environ.get('WSGI_MAX_STREAMS')
+    if configured:
+        return max(0, min(int(configured), threads - 1))
+    return threads // 2
+
+
+def init_worker(threads=1):
+    """Per-worker setup: a private SQLite connection pool sized to the thread count, the open-stream cap, pre-loaded document/email modules and the print spooler."""
+    global _shut_down
+    _shut_down = False
+    database.init_pool(size=max(1, threads))
+    open_streams.limit = max_streams(threads)
+    app.config['DRAINING'] = False
+    warm_imports()
+    spooler.start()
+
+
+def shutdown_worker():
+    """Stop reporting ready, finish queued import documents and the current print batch, fold journals and release pooled connections. Safe to call more than once."""
+    global _shut_down
+    with _shutdown_lock:
+        if _shut_down:
+            return
+        _shut_down = True
+    app.config['DRAINING'] = True
+    import_batches.shutdown(wait=True)
+    spooler.stop()
+    customer_store.close()
+    menu_store.close()
+    database.close_pool()
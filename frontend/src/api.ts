@@ -0,0 +1,9 @@
+declare global {
+  interface Window {
+    __API_BASE__?: string;
+  }
+}
+
+// Origin of the Flask API. The embedded pywebview mode serves the API and
+// the app from one server and sets window.__API_BASE__ to '' (same origin).
+export const API_BASE = window.__API_BASE__ ?? 'http://127.0.0.1:5000';
@@ -1,16 +1,18 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import dayjs, { Dayjs } from 'dayjs';
 import {
     Container, Stepper, Step, StepLabel, Button, Paper, Typography, 
-    TextField, MenuItem, Box
+    TextField, MenuItem, Box, Autocomplete
 } from '@mui/material';
 import Grid from '@mui/material/Grid';
 import { LocalizationProvider, DatePicker, TimePicker } from '@mui/x-date-pickers';
 import { AdapterDayjs } from '@mui/x-date-pickers/AdapterDayjs';
 import { FiChevronLeft, FiChevronRight, FiPlus } from 'react-icons/fi';
+import { API_BASE } from '../api';
 
 const STORAGE_KEY = 'restaurant-order-form';
+const SUBMIT_RETRIES = 2;
 
 // --- Robust function to get initial form data ---
 const getInitialFormData = () => {
@@ -43,9 +45,15 @@ const getInitialFormData = () => {
 const AddOrderPage = () => {
   const navigate = useNavigate();
   const [step, setStep] = useState(0);
-  const [customers, setCustomers] = useState([]);
+  const [customerOptions, setCustomerOptions] = useState([]);
+  const [customerQuery, setCustomerQuery] = useState('');
+  const [selectedCustomer, setSelectedCustomer] = useState(null);
   const [menuItems, setMenuItems] = useState([]);
   const [formData, setFormData] = useState(getInitialFormData);
+  const [submitting, setSubmitting] = useState(false);
+  // One key per submission of this exact form: retries and double clicks reuse
+  // it, so the server creates (and emails) the order only once.
+  const idempotencyKey = useRef<string | null>(null);
 
   // --- Effect to save to localStorage ---
   useEffect(() => {
@@ -59,14 +67,35 @@ const AddOrderPage = () => {
     } catch (error) {
         console.error("Could not save form data to localStorage:", error);
     }
+    idempotencyKey.current = null;
   }, [formData]);
 
   // --- Effect to fetch initial data ---
   useEffect(() => {
-    fetch('http://127.0.0.1:5000/api/customers').then(res => res.json()).then(setCustomers);
-    fetch('http://127.0.0.1:5000/api/menu-items').then(res => res.json()).then(setMenuItems);
+    fetch(`${API_BASE}/api/menu-items`).then(res => res.json()).then(setMenuItems);
+    // Restore the picker label for a customer saved in the draft.
+    if (formData.customer_id) {
+      fetch(`${API_BASE}/api/customers/${encodeURIComponent(formData.customer_id)}`)
+        .then(res => (res.ok ? res.json() : null))
+        .then(customer => customer && setSelectedCustomer({ id: customer.id, name: customer.name }));
+    }
   }, []);
 
+  // --- Effect to fetch customer suggestions as the user types ---
+  useEffect(() => {
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`${API_BASE}/api/customers/suggest?limit=20&q=${encodeURIComponent(customerQuery)}`, { signal: controller.signal })
+        .then(res => res.json())
+        .then(setCustomerOptions)
+        .catch(() => {});
+    }, 150);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [customerQuery]);
+
   // --- Handlers ---
   const handleInputChange = (e) => {
     const { name, value } = e.target;
@@ -95,13 +124,35 @@ const AddOrderPage = () => {
         order_data: finalOrderData 
     };
 
-    fetch('http://127.0.0.1:5000/api/orders', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(submissionData) })
-      .then(() => {
+    const key = (idempotencyKey.current ??= crypto.randomUUID());
+    // Network errors, 5xx and 409 (original still running) are safe to retry with the same key,
+    // after the server's Retry-After if it sent one.
+    const retryDelay = (res: Response | null, attempt: number) => {
+      const seconds = Number(res?.headers.get('Retry-After'));
+      return Number.isFinite(seconds) && seconds > 0 ? seconds * 1000 : 500 * 2 ** attempt;
+    };
+    const retry = (res: Response | null, attempt: number): Promise<Response> =>
+      new Promise(resolve => setTimeout(resolve, retryDelay(res, attempt))).then(() => post(attempt + 1));
+    const post = (attempt: number): Promise<Response> =>
+      fetch(`${API_BASE}/api/orders`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Idempotency-Key': key },
+        body: JSON.stringify(submissionData),
+      }).then(
+        res => ((res.status >= 500 || res.status === 409) && attempt < SUBMIT_RETRIES ? retry(res, attempt) : res),
+        err => (attempt < SUBMIT_RETRIES ? retry(null, attempt) : Promise.reject(err)),
+      );
+
+    setSubmitting(true);
+    post(0)
+      .then(res => {
+        if (!res.ok) throw new Error(`Server responded with ${res.status}`);
         alert('Order created successfully!');
         localStorage.removeItem(STORAGE_KEY);
         navigate('/orders');
       })
-      .catch(err => console.error("Failed to create order", err));
+      .catch(err => console.error("Failed to create order", err))
+      .finally(() => setSubmitting(false));
   };
 
   const nextStep = () => setStep(s => Math.min(s + 1, 2));
@@ -127,7 +178,22 @@ const AddOrderPage = () => {
       case 0:
         return (
             <Grid container spacing={3}>
-                <Grid item xs={12} sm={6}><TextField select fullWidth label="Customer" name="customer_id" value={formData.customer_id} onChange={handleInputChange} sx={{ minWidth: 240 }}><MenuItem value=""><em>Select a Customer</em></MenuItem>{customers.map(c => <MenuItem key={c.id} value={c.id}>{c.name}</MenuItem>)}</TextField></Grid>
+                <Grid item xs={12} sm={6}>
+                    <Autocomplete
+                        options={customerOptions}
+                        value={selectedCustomer}
+                        getOptionLabel={(option) => option.name || ''}
+                        isOptionEqualToValue={(option, value) => option.id === value.id}
+                        filterOptions={(options) => options}
+                        onChange={(_, customer) => {
+                            setSelectedCustomer(customer);
+                            setFormData(prev => ({ ...prev, customer_id: customer ? customer.id : '' }));
+                        }}
+                        onInputChange={(_, value) => setCustomerQuery(value)}
+                        renderInput={(params) => <TextField {...params} fullWidth label="Customer" placeholder="Start typing a name" />}
+                        sx={{ minWidth: 240 }}
+                    />
+                </Grid>
                 <Grid item xs={12} sm={6}><TextField fullWidth label="Order Number" name="order_number" value={formData.order_number} onChange={handleInputChange} /></Grid>
                 <Grid item xs={12} sm={6}><DatePicker label="Date" value={formData.order_date} onChange={handleDateChange} /></Grid>
                 <Grid item xs={12} sm={6}><TimePicker label="Arrival Time" value={formData.arrival_time} onChange={handleTimeChange} minutesStep={15} /></Grid>
@@ -159,7 +225,7 @@ const AddOrderPage = () => {
             {step < steps.length - 1 ? (
                 <Button variant="contained" onClick={nextStep} endIcon={<FiChevronRight />}>Next</Button>
             ) : (
-                <Button variant="contained" color="success" onClick={handleSubmit} startIcon={<FiPlus />}>Save Order</Button>
+                <Button variant="contained" color="success" onClick={handleSubmit} disabled={submitting} startIcon={<FiPlus />}>Save Order</Button>
             )}
         </Box>
     </Container>
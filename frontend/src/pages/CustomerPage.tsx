@@ -7,6 +7,7 @@ import {
 import AddIcon from '@mui/icons-material/Add';
 import EditIcon from '@mui/icons-material/Edit';
 import DeleteIcon from '@mui/icons-material/Delete';
+import { API_BASE } from '../api';
 
 // (Assuming Customer interface is defined elsewhere)
 interface Customer { id: number; name: string; email: string; price_lunch: number; price_dinner: number; price_kids: number; phone: string; address: string; additional_info: string; }
@@ -17,21 +18,21 @@ const CustomerPage = () => {
   const [selectedCustomer, setSelectedCustomer] = useState<Customer | null>(null);
 
   const fetchCustomers = () => {
-    fetch('http://127.0.0.1:5000/api/customers').then(res => res.json()).then(setCustomers);
+    fetch(`${API_BASE}/api/customers`).then(res => res.json()).then(setCustomers);
   };
 
   useEffect(() => { fetchCustomers(); }, []);
 
   const handleSave = (customer: Customer) => {
     const method = customer.id ? 'PUT' : 'POST';
-    const url = customer.id ? `http://127.0.0.1:5000/api/customers/${customer.id}` : 'http://127.0.0.1:5000/api/customers';
+    const url = customer.id ? `${API_BASE}/api/customers/${customer.id}` : `${API_BASE}/api/customers`;
     fetch(url, { method, headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(customer) })
       .then(() => { fetchCustomers(); setIsModalOpen(false); });
   };
 
   const handleDelete = (customerId: number) => {
     if (window.confirm('Are you sure you want to delete this customer?')) {
-      fetch(`http://127.0.0.1:5000/api/customers/${customerId}`, { method: 'DELETE' }).then(() => fetchCustomers());
+      fetch(`${API_BASE}/api/customers/${customerId}`, { method: 'DELETE' }).then(() => fetchCustomers());
     }
   };
 
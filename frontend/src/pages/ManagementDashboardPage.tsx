@@ -40,6 +40,7 @@ import dayjs, { Dayjs } from 'dayjs';
 import advancedFormat from 'dayjs/plugin/advancedFormat';
 import isSameOrAfter from 'dayjs/plugin/isSameOrAfter';
 import isSameOrBefore from 'dayjs/plugin/isSameOrBefore';
+import { API_BASE } from '../api';
 
 dayjs.extend(advancedFormat);
 dayjs.extend(isSameOrAfter);
@@ -89,7 +90,7 @@ const ManagementDashboardPage: React.FC = () => {
   useEffect(() => {
     let isMounted = true;
 
-    fetch('http://127.0.0.1:5000/api/orders')
+    fetch(`${API_BASE}/api/orders`)
       .then(async (response) => {
         if (!response.ok) {
           throw new Error(`Failed to load orders (${response.status})`);
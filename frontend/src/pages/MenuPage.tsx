@@ -18,6 +18,7 @@ import {
 import AddIcon from '@mui/icons-material/Add';
 import EditIcon from '@mui/icons-material/Edit';
 import DeleteIcon from '@mui/icons-material/Delete';
+import { API_BASE } from '../api';
 
 interface MenuItemDto {
   id: string;
@@ -25,7 +26,7 @@ interface MenuItemDto {
   name: string;
 }
 
-const MENU_ENDPOINT = 'http://127.0.0.1:5000/api/menu-items';
+const MENU_ENDPOINT = `${API_BASE}/api/menu-items`;
 
 const MenuPage = () => {
   const [menuItems, setMenuItems] = useState<MenuItemDto[]>([]);
@@ -34,6 +34,7 @@ import DeleteIcon from '@mui/icons-material/Delete';
 import dayjs from 'dayjs';
 import isSameOrAfter from 'dayjs/plugin/isSameOrAfter';
 import isSameOrBefore from 'dayjs/plugin/isSameOrBefore';
+import { API_BASE } from '../api';
 
 dayjs.extend(isSameOrAfter);
 dayjs.extend(isSameOrBefore);
@@ -53,6 +54,7 @@ interface Order {
 const OrderPage = () => {
   const [orders, setOrders] = useState<Order[]>([]);
   const [searchTerm, setSearchTerm] = useState('');
+  const [searchMatches, setSearchMatches] = useState<Set<number> | null>(null);
   const [selectedCustomer, setSelectedCustomer] = useState<string>('all');
   const [dateFrom, setDateFrom] = useState<string>('');
   const [dateTo, setDateTo] = useState<string>('');
@@ -63,7 +65,7 @@ const OrderPage = () => {
   const [editForm, setEditForm] = useState<Order | null>(null);
 
   useEffect(() => {
-    fetch('http://127.0.0.1:5000/api/orders')
+    fetch(`${API_BASE}/api/orders`)
       .then((response) => response.json())
       .then(setOrders)
       .catch((error) => {
@@ -71,6 +73,35 @@ const OrderPage = () => {
       });
   }, []);
 
+  // Server-side full-text search (also matches item names and comments);
+  // falls back to substring matching in the browser if it is unavailable.
+  useEffect(() => {
+    const term = searchTerm.trim();
+    if (!term) {
+      setSearchMatches(null);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`${API_BASE}/api/search?types=orders&limit=1000&q=${encodeURIComponent(term)}`, {
+        signal: controller.signal
+      })
+        .then((response) => (response.ok ? response.json() : Promise.reject(response.status)))
+        .then((data: { results: { orders: { id: number }[] } }) => {
+          setSearchMatches(new Set(data.results.orders.map((match) => match.id)));
+        })
+        .catch(() => {
+          if (!controller.signal.aborted) {
+            setSearchMatches(null);
+          }
+        });
+    }, 200);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [searchTerm]);
+
   const customerOptions = useMemo(() => {
     const unique = new Set<string>();
     orders.forEach((order) => {
@@ -86,9 +117,11 @@ const OrderPage = () => {
     return orders.filter((order) => {
       const matchesText =
         !term ||
-        [order.order_number, order.customer_name, order.service_type]
-          .filter(Boolean)
-          .some((field) => field.toLowerCase().includes(term));
+        (searchMatches
+          ? searchMatches.has(order.id)
+          : [order.order_number, order.customer_name, order.service_type]
+              .filter(Boolean)
+              .some((field) => field.toLowerCase().includes(term)));
 
       const matchesCustomer =
         selectedCustomer === 'all' || order.customer_name === selectedCustomer;
@@ -99,7 +132,7 @@ const OrderPage = () => {
 
       return matchesText && matchesCustomer && matchesDateFrom && matchesDateTo;
     });
-  }, [orders, searchTerm, selectedCustomer, dateFrom, dateTo]);
+  }, [orders, searchTerm, searchMatches, selectedCustomer, dateFrom, dateTo]);
 
   const openActionMenu = useCallback((order: Order, anchor: HTMLElement) => {
     setSelectedOrder(order);
@@ -152,7 +185,7 @@ const OrderPage = () => {
     delete (payload as any).order_data;
 
     try {
-      const response = await fetch(`http://127.0.0.1:5000/api/orders/${editForm.id}`, {
+      const response = await fetch(`${API_BASE}/api/orders/${editForm.id}`, {
         method: 'PUT',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(payload)
@@ -182,7 +215,7 @@ const OrderPage = () => {
       return;
     }
     try {
-      const response = await fetch(`http://127.0.0.1:5000/api/orders/${order.id}`, { method: 'DELETE' });
+      const response = await fetch(`${API_BASE}/api/orders/${order.id}`, { method: 'DELETE' });
       if (!response.ok) {
         throw new Error(`Failed with status ${response.status}`);
       }
@@ -15,6 +15,7 @@ import {
   Typography
 } from '@mui/material';
 import Grid from '@mui/material/Grid';
+import { API_BASE } from '../api';
 
 const DEFAULT_SETTINGS = {
   email_subject_template: '',
@@ -54,7 +55,7 @@ const SettingsPage: React.FC = () => {
   const [status, setStatus] = useState<{ message: string; type: 'success' | 'error' | 'info' | '' }>({ message: '', type: '' });
 
   useEffect(() => {
-    fetch('http://127.0.0.1:5000/api/settings')
+    fetch(`${API_BASE}/api/settings`)
       .then((res) => res.json())
       .then((data) => {
         if (!data) {
@@ -92,7 +93,7 @@ const SettingsPage: React.FC = () => {
   const handleSave = () => {
     setStatus({ message: '', type: '' });
 
-    fetch('http://127.0.0.1:5000/api/settings', {
+    fetch(`${API_BASE}/api/settings`, {
       method: 'PUT',
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify(settings)
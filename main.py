@@ -1,15 +1,21 @@
+import argparse
 import contextlib
 import os
 import shutil
+import socket
 import subprocess
 import sys
+import threading
 import time
+import urllib.request
 import webbrowser
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
 FRONTEND_DIR = os.path.join(ROOT_DIR, "frontend")
 FRONTEND_URL = "http://localhost:5173"
+FRONTEND_PORT = 5173
+BACKEND_READY_URL = "http://127.0.0.1:5000/readyz"
 
 
 def run_command(command, cwd):
@@ -20,33 +26,57 @@ def run_command(command, cwd):
     return subprocess.Popen(command, cwd=cwd)
 
 
-def wait_for_url(url, timeout=30):
-    try:
-        import urllib.request
-    except ImportError:
-        return False
+def wait_until(probe, process, timeout=60, initial_delay=0.05, max_delay=1.0):
+    """
+    Call probe() until it returns True, backing off exponentially between
+    attempts. Gives up early if process exits. Returns True when ready.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while time.monotonic() < deadline:
+        if probe():
+            return True
+        if process.poll() is not None:
+            return False
+        time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        delay = min(delay * 2, max_delay)
+    return False
+
 
-    deadline = time.time() + timeout
-    while time.time() < deadline:
+def http_ok(url):
+    def probe():
         try:
             with urllib.request.urlopen(url, timeout=2) as response:
-                if response.status < 500:
-                    return True
+                return response.status < 500
         except Exception:
-            time.sleep(0.5)
-    return False
+            return False
+    return probe
 
 
-def ensure_backend_ready():
-    print("Ensuring backend database schema exists...")
+def port_open(host, port):
+    def probe():
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            return False
+    return probe
+
+
+def ensure_schema():
+    """Run init_db in-process, but only when the stored schema version is stale."""
+    sys.path.insert(0, BACKEND_DIR)
+    previous = os.getcwd()
+    os.chdir(BACKEND_DIR)
     try:
-        subprocess.run(
-            [sys.executable, "-c", "from src.database import init_db; init_db()"],
-            cwd=BACKEND_DIR,
-            check=True,
-        )
-    except subprocess.CalledProcessError as exc:
-        raise RuntimeError("Failed to initialise backend database") from exc
+        from src import database
+        if database.schema_is_current():
+            return False
+        print("Initialising backend database schema...")
+        database.init_db()
+        return True
+    finally:
+        os.chdir(previous)
 
 
 def resolve_npm():
@@ -58,26 +88,71 @@ def resolve_npm():
     return npm_path
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the backend and frontend development servers.")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="Serve the backend through serve.py (worker processes, no reloader) instead of the Flask dev server.",
+    )
+    return parser.parse_args()
+
+
+def wait_for_components(components, started_at):
+    """Wait for all (name, probe, process) components in parallel; returns {name: seconds or None}."""
+    timings = {}
+
+    def wait(name, probe, process):
+        ready = wait_until(probe, process)
+        timings[name] = time.monotonic() - started_at if ready else None
+
+    threads = [threading.Thread(target=wait, args=component, daemon=True) for component in components]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings
+
+
 def main():
+    args = parse_args()
     processes = []
 
     try:
-        ensure_backend_ready()
-
-        print("Starting backend server...")
-        backend_process = run_command([sys.executable, "app.py"], cwd=BACKEND_DIR)
-        processes.append(("backend", backend_process))
+        started_at = time.monotonic()
 
+        # The frontend doesn't need the database, so it starts right away.
         print("Starting frontend development server...")
         frontend_process = run_command([resolve_npm(), "run", "dev"], cwd=FRONTEND_DIR)
         processes.append(("frontend", frontend_process))
 
-        print(f"Waiting for frontend to respond at {FRONTEND_URL}...")
-        if wait_for_url(FRONTEND_URL):
-            webbrowser.open(FRONTEND_URL)
-        else:
+        schema_started = time.monotonic()
+        initialised = ensure_schema()
+        schema_seconds = time.monotonic() - schema_started
+
+        print("Starting backend server...")
+        backend_script = "serve.py" if args.production else "app.py"
+        backend_process = run_command([sys.executable, backend_script], cwd=BACKEND_DIR)
+        processes.append(("backend", backend_process))
+
+        timings = wait_for_components([
+            ("backend", http_ok(BACKEND_READY_URL), backend_process),
+            ("frontend", port_open("localhost", FRONTEND_PORT), frontend_process),
+        ], started_at)
+
+        print("Startup timings:")
+        print(f"  schema    {'initialised' if initialised else 'up to date':<12} {schema_seconds:6.2f}s")
+        for name in ("backend", "frontend"):
+            seconds = timings.get(name)
+            print(f"  {name:<9} {'ready' if seconds is not None else 'NOT READY':<12} "
+                  f"{seconds if seconds is not None else 0:6.2f}s")
+        for name, proc in processes:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{name} process exited with code {proc.returncode}")
+
+        if timings.get("frontend") is None:
             print("Could not confirm frontend availability yet; opening browser anyway.")
-            webbrowser.open(FRONTEND_URL)
+        webbrowser.open(FRONTEND_URL)
 
         print("Servers are running. Press Ctrl+C to stop.")
         while True:
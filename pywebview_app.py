@@ -1,9 +1,11 @@
 ﻿import argparse
 import contextlib
+import os
 import pathlib
+import sys
 import threading
 import time
-from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer
 
 try:
     import requests
@@ -12,11 +14,19 @@ except ImportError:  # pragma: no cover - optional dependency for dev mode
 
 import webview
 
+import static_assets
+
 ROOT_DIR = pathlib.Path(__file__).resolve().parent
 FRONTEND_DIR = ROOT_DIR / "frontend"
+BACKEND_DIR = ROOT_DIR / "backend"
 DIST_DIR = FRONTEND_DIR / "dist"
 DEFAULT_DEV_URL = "http://127.0.0.1:5173"
 DEFAULT_DIST_PORT = 8333
+EMBEDDED_THREADS = 4
+# Requests for these paths go to the Flask app in embedded mode; the rest are static assets.
+API_PATHS = ("/api/", "/healthz", "/readyz")
+# Tells the frontend (src/api.ts) to call the API on the page's own origin.
+SAME_ORIGIN_API_HTML = '<script>window.__API_BASE__ = "";</script>'
 
 
 def wait_for_dev_server(url: str, timeout: int = 30) -> bool:
@@ -40,19 +50,78 @@ def start_dist_server(port: int) -> ThreadingHTTPServer:
         raise FileNotFoundError(
             f"Could not find build output at {dist_path}. Run 'npm run build' inside frontend/ first."
         )
+    return static_assets.serve(dist_path, "127.0.0.1", port)
+
+
+def start_embedded_server(port: int):
+    """
+    Serve the Flask API and the dist assets from one in-process WSGI server,
+    so the page and the API share an origin and no separate backend is needed.
+    """
+    if not DIST_DIR.exists():
+        raise FileNotFoundError(
+            f"Could not find build output at {DIST_DIR}. Run 'npm run build' inside frontend/ first."
+        )
+    # The backend resolves its database and JSON stores relative to its own directory.
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, str(BACKEND_DIR))
+    from werkzeug.serving import WSGIRequestHandler, make_server
 
-    class Handler(SimpleHTTPRequestHandler):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, directory=str(dist_path), **kwargs)
+    import wsgi
+    from src import database
 
-        def log_message(self, format: str, *args):  # noqa: D401 - silence server logs
+    database.init_db()
+    wsgi.init_worker(EMBEDDED_THREADS)
+
+    cache = static_assets.AssetCache(DIST_DIR, head_html=SAME_ORIGIN_API_HTML)
+    assets = static_assets.make_wsgi_app(cache)
+
+    def application(environ, start_response):
+        if environ.get("PATH_INFO", "").startswith(API_PATHS):
+            return wsgi.application(environ, start_response)
+        return assets(environ, start_response)
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
             return
 
-    httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server = make_server("127.0.0.1", port, application, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="pywebview-embedded-server").start()
+    cache.start_compression()
+    return server
+
+
+# Read once the page has loaded; paint entries are relative to navigation start.
+PAINT_TIMINGS_JS = """
+(() => {
+    const paint = name => (performance.getEntriesByName(name)[0] || {}).startTime || null;
+    return {first_paint: paint('first-paint'), first_contentful_paint: paint('first-contentful-paint')};
+})()
+"""
 
-    thread = threading.Thread(target=httpd.serve_forever, daemon=True, name="pywebview-static-server")
-    thread.start()
-    return httpd
+
+def add_startup_timing_hook(window, started_at: float) -> None:
+    """Print launch-to-loaded time and the page's own paint timings once it loads."""
+
+    def on_loaded():
+        loaded_ms = (time.perf_counter() - started_at) * 1000
+        try:
+            paints = window.evaluate_js(PAINT_TIMINGS_JS) or {}
+        except Exception:  # noqa: BLE001 - timings are best effort
+            paints = {}
+
+        def fmt(value):
+            return f"{value:.0f}ms" if isinstance(value, (int, float)) else "n/a"
+
+        print(
+            f"[pywebview] launch to page loaded: {loaded_ms:.0f}ms; after navigation: "
+            f"first paint {fmt(paints.get('first_paint'))}, "
+            f"first contentful paint {fmt(paints.get('first_contentful_paint'))}",
+            flush=True,
+        )
+        window.events.loaded -= on_loaded
+
+    window.events.loaded += on_loaded
 
 
 def parse_args() -> argparse.Namespace:
@@ -68,6 +137,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Force loading the built dist/ output (default if --dev is not supplied).",
     )
+    mode_group.add_argument(
+        "--embedded",
+        action="store_true",
+        help="Serve the backend API and the dist/ output from one in-process server (no separate backend).",
+    )
     parser.add_argument(
         "--url",
         default=DEFAULT_DEV_URL,
@@ -77,7 +151,7 @@ def parse_args() -> argparse.Namespace:
         "--port",
         type=int,
         default=DEFAULT_DIST_PORT,
-        help="Port for the lightweight static server when using dist assets (default: %(default)s).",
+        help="Port for the in-memory server when using dist assets or --embedded (default: %(default)s).",
     )
     parser.add_argument(
         "--title",
@@ -113,6 +187,7 @@ def parse_args() -> argparse.Namespace:
 
 
 def main():
+    started_at = time.perf_counter()
     args = parse_args()
 
     if args.dev:
@@ -122,6 +197,9 @@ def main():
                 f"[pywebview] Could not reach dev server at {url}. Make sure 'npm run dev' is running.",
                 flush=True,
             )
+    elif args.embedded:
+        server = start_embedded_server(args.port)
+        url = f"http://127.0.0.1:{args.port}/"
     else:
         server = start_dist_server(args.port)
         url = f"http://127.0.0.1:{args.port}/index.html"
@@ -135,6 +213,7 @@ def main():
         background_color="#ffffff",
         fullscreen=not args.windowed,
     )
+    add_startup_timing_hook(window, started_at)
 
     try:
         webview.start(gui=args.gui)
@@ -143,6 +222,10 @@ def main():
             with contextlib.suppress(Exception):
                 server.shutdown()
                 server.server_close()
+        if args.embedded:
+            import wsgi
+
+            wsgi.shutdown_worker()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,269 @@
+"""
+In-memory static server for the built frontend (frontend/dist).
+
+Every file is read once at startup and answered from memory with:
+  * a strong ETag per encoding ("<hash>", "<hash>-gzip", "<hash>-br", since the
+    bytes differ) and Last-Modified, honouring If-None-Match / If-Modified-Since;
+  * Cache-Control: immutable for Vite's content-hashed files under assets/,
+    no-cache (always revalidate) for index.html and the rest;
+  * gzip and, when the optional brotli package is installed, br variants,
+    chosen from Accept-Encoding. Variants are compressed once in a background
+    thread and written next to the source file (name.js.gz / name.js.br) so
+    later launches only read them; identity is served until they are ready;
+  * HTTP/1.1 keep-alive, so the window reuses one connection for its assets.
+
+Paths without a file extension fall back to index.html for the React router.
+"""
+import gzip
+import hashlib
+import mimetypes
+import pathlib
+import re
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Vite names build output like assets/index-BXy3k9aQ.js.
+HASHED_NAME = re.compile(r"^assets/.+[-.][A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/wasm")
+MIN_COMPRESS_SIZE = 1024
+VARIANT_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/javascript", ".mjs")
+mimetypes.add_type("image/svg+xml", ".svg")
+mimetypes.add_type("application/wasm", ".wasm")
+
+
+class Asset:
+    __slots__ = ("path", "body", "content_type", "etag", "last_modified", "mtime", "cache_control", "variants",
+                 "persist_variants")
+
+    def __init__(self, path: pathlib.Path, relative: str):
+        stat = path.stat()
+        self.path = path
+        self.body = path.read_bytes()
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        self.content_type = content_type
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self.mtime = int(stat.st_mtime)
+        self.last_modified = formatdate(self.mtime, usegmt=True)
+        self.cache_control = IMMUTABLE if HASHED_NAME.match(relative) else REVALIDATE
+        self.variants: Dict[str, bytes] = {}
+        self.persist_variants = True
+
+    def replace_body(self, body: bytes):
+        """Serve body instead of the file's contents (its variants are then kept in memory only)."""
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.persist_variants = False
+
+    @property
+    def compressible(self) -> bool:
+        return len(self.body) >= MIN_COMPRESS_SIZE and self.content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def compress(self):
+        """Fill in the gzip / br variants, reusing up-to-date ones from disk."""
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            if encoding == "br" and brotli is None:
+                continue
+            sibling = self.path.with_name(self.path.name + suffix)
+            if self.persist_variants:
+                try:
+                    if sibling.stat().st_mtime >= self.path.stat().st_mtime:
+                        self.variants[encoding] = sibling.read_bytes()
+                        continue
+                except OSError:
+                    pass
+            if encoding == "br":
+                data = brotli.compress(self.body, quality=11)
+            else:
+                data = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if len(data) >= len(self.body):
+                continue
+            self.variants[encoding] = data
+            if not self.persist_variants:
+                continue
+            try:
+                sibling.write_bytes(data)
+            except OSError:
+                pass  # read-only install: compress again next launch
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """{coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class AssetCache:
+    def __init__(self, root: pathlib.Path, head_html: Optional[str] = None):
+        """Load every file under root; head_html, if given, is inserted before index.html's </head>."""
+        self.root = root
+        self.assets: Dict[str, Asset] = {}
+        for path in sorted(root.rglob("*")):
+            if not path.is_file() or path.suffix in (".gz", ".br"):
+                continue
+            relative = path.relative_to(root).as_posix()
+            self.assets[relative] = Asset(path, relative)
+        index = self.assets.get("index.html")
+        if head_html and index is not None:
+            index.replace_body(index.body.replace(b"</head>", head_html.encode("utf-8") + b"</head>", 1))
+        self.compressed = threading.Event()
+
+    def start_compression(self):
+        def run():
+            for asset in self.assets.values():
+                if asset.compressible:
+                    asset.compress()
+            self.compressed.set()
+
+        threading.Thread(target=run, daemon=True, name="static-asset-compression").start()
+
+    def lookup(self, url_path: str) -> Optional[Asset]:
+        relative = unquote(urlsplit(url_path).path).lstrip("/") or "index.html"
+        if ".." in relative.split("/"):
+            return None
+        asset = self.assets.get(relative)
+        if asset is None and "." not in relative.rsplit("/", 1)[-1]:
+            asset = self.assets.get("index.html")
+        return asset
+
+
+def encoded_etag(asset: Asset, encoding: Optional[str]) -> str:
+    """The asset's ETag for one encoding; each encoded variant is a different representation."""
+    return asset.etag if not encoding else f'{asset.etag[:-1]}-{encoding}"'
+
+
+def is_not_modified(asset: Asset, headers, etag: Optional[str] = None) -> bool:
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or (etag or asset.etag) in tags
+    if_modified_since = headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            return asset.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def respond(cache: AssetCache, path: str, headers) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """(status, headers, body) for a GET of path; headers is the request's header mapping."""
+    asset = cache.lookup(path)
+    if asset is None:
+        return 404, [("Content-Type", "text/plain; charset=utf-8")], b"Not found"
+
+    body, encoding = asset.body, None
+    accepted = accepted_encodings(headers.get("Accept-Encoding", ""))
+    for candidate in ("br", "gzip"):
+        if accepted.get(candidate, 0) > 0 and candidate in asset.variants:
+            body, encoding = asset.variants[candidate], candidate
+            break
+
+    etag = encoded_etag(asset, encoding)
+    common = [
+        ("ETag", etag),
+        ("Last-Modified", asset.last_modified),
+        ("Cache-Control", asset.cache_control),
+        ("Vary", "Accept-Encoding"),
+    ]
+    if is_not_modified(asset, headers, etag):
+        return 304, common, b""
+
+    response_headers = [("Content-Type", asset.content_type)]
+    if encoding:
+        response_headers.append(("Content-Encoding", encoding))
+    return 200, response_headers + common, body
+
+
+def make_handler(cache: AssetCache):
+    class AssetRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_asset(include_body=True)
+
+        def do_HEAD(self):
+            self.send_asset(include_body=False)
+
+        def send_asset(self, include_body: bool):
+            status, headers, body = respond(cache, self.path, self.headers)
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if include_body:
+                self.wfile.write(body)
+
+        def log_message(self, format: str, *args):  # noqa: D401 - silence server logs
+            return
+
+    return AssetRequestHandler
+
+
+def make_wsgi_app(cache: AssetCache):
+    """The same responses as a WSGI application, for mounting next to the API."""
+
+    def application(environ, start_response):
+        method = environ["REQUEST_METHOD"]
+        if method not in ("GET", "HEAD"):
+            start_response("405 Method Not Allowed", [("Allow", "GET, HEAD"), ("Content-Length", "0")])
+            return [b""]
+        headers = {
+            key[5:].replace("_", "-").title(): value
+            for key, value in environ.items() if key.startswith("HTTP_")
+        }
+        status, response_headers, body = respond(cache, environ.get("PATH_INFO") or "/", headers)
+        if status != 304:
+            response_headers.append(("Content-Length", str(len(body))))
+        start_response(f"{status} {HTTPStatus(status).phrase}", response_headers)
+        return [body if method == "GET" else b""]
+
+    return application
+
+
+def serve(root: pathlib.Path, host: str, port: int) -> ThreadingHTTPServer:
+    """Load root into memory and serve it from a daemon thread."""
+    started = time.perf_counter()
+    cache = AssetCache(root)
+    httpd = ThreadingHTTPServer((host, port), make_handler(cache))
+    httpd.daemon_threads = True
+    httpd.asset_cache = cache
+    threading.Thread(target=httpd.serve_forever, daemon=True, name="static-asset-server").start()
+    cache.start_compression()
+    total = sum(len(asset.body) for asset in cache.assets.values())
+    print(
+        f"[static] {len(cache.assets)} files ({total / 1024:.0f} KiB) loaded and serving in "
+        f"{(time.perf_counter() - started) * 1000:.0f}ms",
+        flush=True,
+    )
+    return httpd